@@ -2,6 +2,8 @@ import streamlit as st
 import pandas as pd
 from etiquetas_nao_adaptadas import interface_nao_adaptadas
 from etiquetas_adaptadas import interface_adaptadas
+from diagnostico import coletar
+from etiquetas_correcoes import interface_correcoes
 
 st.set_page_config(page_title="Etiquetas de Provas", layout="wide")
 
@@ -16,10 +18,36 @@ st.sidebar.info(
     "e vá até **Formatar → Número → Formato de número personalizado**."
 )
 
-# --- INTERFACE ---
-if opcao == "Provas Não Adaptadas":
-    interface_nao_adaptadas()
+# --- CORREÇÕES ---
+st.sidebar.markdown("---")
+interface_correcoes()
 
-elif opcao == "Provas Adaptadas":
-    interface_adaptadas()
+# --- DIAGNÓSTICO ---
+st.sidebar.markdown("---")
+diagnostico_ativo = st.sidebar.checkbox("🩺 Diagnóstico de desempenho")
+medir_memoria = diagnostico_ativo and st.sidebar.checkbox(
+    "Medir memória",
+    help="Usa tracemalloc, que fica ligado até o servidor reiniciar e deixa o processamento mais lento. "
+         "O pico mostrado é o do processo inteiro (todas as sessões), não só o desta etapa."
+)
+
+def mostrar_diagnostico(registros):
+    with st.sidebar.expander("🩺 Tempo por etapa", expanded=True):
+        if not registros:
+            st.caption("Nenhuma etapa executada nesta atualização (resultados reaproveitados do cache).")
+            return
+        st.dataframe(pd.DataFrame(registros), hide_index=True, use_container_width=True)
+        st.caption(f"Total: {sum(r['segundos'] for r in registros):.3f} s")
+
+# --- INTERFACE ---
+with coletar(memoria=medir_memoria) as registros:
+    try:
+        if opcao == "Provas Não Adaptadas":
+            interface_nao_adaptadas()
 
+        elif opcao == "Provas Adaptadas":
+            interface_adaptadas()
+    finally:
+        # Também aparece quando a interface interrompe a execução com st.stop()
+        if diagnostico_ativo:
+            mostrar_diagnostico(registros)
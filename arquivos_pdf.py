@@ -0,0 +1,60 @@
+import tempfile
+import threading
+
+# Até este tamanho o PDF fica em memória; acima disso o arquivo temporário passa para o disco
+LIMITE_PDF_EM_MEMORIA = 8 * 1024 * 1024
+
+# Tamanho dos blocos usados para ler o PDF (download, gravação em arquivo)
+TAMANHO_BLOCO = 1024 * 1024
+
+
+class PDFTemporario:
+    """PDF gravado em um SpooledTemporaryFile, com tamanho em memória limitado.
+
+    Pode ser passado como destino de gerar_etiquetas (o reportlab só precisa de write)
+    e depois lido em blocos. As leituras são posicionais e protegidas por um lock,
+    então o mesmo PDF em cache pode ser lido por várias sessões ao mesmo tempo.
+    O arquivo temporário é apagado quando o objeto é fechado ou coletado.
+    Também guarda o ZIP do processamento em lote (zipfile só precisa de write e flush).
+    """
+
+    def __init__(self, limite_em_memoria=LIMITE_PDF_EM_MEMORIA):
+        self.arquivo = tempfile.SpooledTemporaryFile(max_size=limite_em_memoria, mode='w+b')
+        self._lock = threading.Lock()
+        self.tamanho = 0
+
+    def write(self, dados):
+        with self._lock:
+            self.arquivo.seek(0, 2)
+            escritos = self.arquivo.write(dados)
+            self.tamanho += escritos
+            return escritos
+
+    def flush(self):
+        with self._lock:
+            self.arquivo.flush()
+
+    def blocos(self, tamanho_bloco=TAMANHO_BLOCO):
+        """Gera o conteúdo do PDF em blocos, sem carregá-lo inteiro na memória"""
+        posicao = 0
+        while posicao < self.tamanho:
+            with self._lock:
+                self.arquivo.seek(posicao)
+                bloco = self.arquivo.read(tamanho_bloco)
+            if not bloco:
+                break
+            posicao += len(bloco)
+            yield bloco
+
+    def ler(self):
+        """Conteúdo completo em bytes (para APIs que exigem bytes, como o st.download_button)"""
+        return b''.join(self.blocos())
+
+    def salvar(self, caminho):
+        """Copia o PDF para um arquivo em disco, bloco a bloco"""
+        with open(caminho, 'wb') as f:
+            for bloco in self.blocos():
+                f.write(bloco)
+
+    def close(self):
+        self.arquivo.close()
@@ -0,0 +1,46 @@
+"""Benchmark da busca de escolas duplicadas com nomes realistas de redes municipais e estaduais.
+
+Mede o tempo de agrupar_duplicatas e quantos dos nomes com erro de digitação acrescentados
+caíram no grupo do nome original. Vocabulários menores deixam os nomes mais parecidos entre si
+(mais candidatos a comparar).
+
+Uso:
+    python benchmarks/benchmark_duplicatas.py --escolas 20000 --palavras 800 32
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from duplicatas import agrupar_duplicatas
+from planilhas_sinteticas import nomes_com_erros, nomes_escolas_realistas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--escolas', type=int, default=20000)
+    parser.add_argument('--palavras', type=int, nargs='+', default=[800, 32],
+                        help="Tamanhos do vocabulário dos nomes dos patronos")
+    parser.add_argument('--erros', type=int, default=300, help="Nomes com erro de digitação acrescentados")
+    args = parser.parse_args()
+
+    print(f"{args.escolas} escolas + {args.erros} nomes com erro")
+    print(f"{'palavras':>8} {'segundos':>9} {'grupos':>7} {'maior':>6} {'erros achados':>14}")
+    for palavras in args.palavras:
+        nomes = nomes_escolas_realistas(args.escolas, palavras)
+        pares = nomes_com_erros(nomes, args.erros)
+        inicio = time.perf_counter()
+        grupos = agrupar_duplicatas(nomes + [variante for _, variante in pares])
+        segundos = time.perf_counter() - inicio
+
+        grupo_de = {nome: i for i, grupo in enumerate(grupos) for nome in grupo}
+        achados = sum(1 for nome, variante in pares if nome in grupo_de and grupo_de[nome] == grupo_de.get(variante))
+        maior = max(map(len, grupos), default=0)
+        print(f"{palavras:>8} {segundos:>9.2f} {len(grupos):>7} {maior:>6} {achados:>7}/{len(pares)}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
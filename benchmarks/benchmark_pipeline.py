@@ -0,0 +1,236 @@
+"""Benchmark de cada etapa do processamento, com planilhas sintéticas nos dois formatos.
+
+Mede separadamente a leitura (CSV e Excel), detecção de colunas, reformatação, limpeza
+dos nomes, normalização dos anos, ordenação e renderização do PDF, com o tempo (melhor
+de N execuções) e o pico de memória (tracemalloc) de cada etapa.
+
+Uso:
+    python benchmarks/benchmark_pipeline.py                      # 100, 1.000 e 10.000 escolas
+    python benchmarks/benchmark_pipeline.py --completo           # inclui 100.000 escolas
+    python benchmarks/benchmark_pipeline.py --salvar-baseline    # grava benchmarks/baseline.json
+    python benchmarks/benchmark_pipeline.py --baseline outra.json --tolerancia 0.25
+
+Os resultados são comparados com a baseline (por padrão, benchmarks/baseline.json, que fica
+no repositório); o script termina com código 1 se alguma etapa ficar mais lenta (ou usar
+mais memória) do que a baseline multiplicada por (1 + tolerância), e com código 2 se o
+arquivo passado em --baseline não existir. A baseline depende da máquina: para comparar
+em outra máquina, grave uma nova com --salvar-baseline antes das alterações.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import criacao_adaptadas
+import criacao_nao_adaptadas
+from planilhas_sinteticas import logo_sintetica, planilha_adaptadas, planilha_nao_adaptadas
+from processamento import (
+    colunas_categoricas,
+    detectar_colunas_adaptadas,
+    detectar_colunas_nao_adaptadas,
+    ler_planilha,
+    limpar_nomes_escolas,
+    normalizar_anos_escolares,
+    ordenar_por_escola,
+    reformatar_adaptadas,
+    reformatar_nao_adaptadas,
+)
+
+TAMANHOS_PADRAO = [100, 1_000, 10_000]
+TAMANHO_COMPLETO = 100_000
+CAMINHO_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# Diferenças abaixo destes valores são ruído de medição e nunca contam como regressão
+FOLGA_SEGUNDOS = 0.01
+FOLGA_MB = 1.0
+
+ETAPAS = ['leitura_xlsx', 'leitura', 'deteccao', 'reformatacao', 'limpeza_nomes', 'anos_escolares', 'ordenacao', 'pdf']
+
+TIPOS = {
+    'nao-adaptadas': (planilha_nao_adaptadas, detectar_colunas_nao_adaptadas, reformatar_nao_adaptadas,
+                      criacao_nao_adaptadas),
+    'adaptadas': (planilha_adaptadas, detectar_colunas_adaptadas, reformatar_adaptadas, criacao_adaptadas),
+}
+
+
+def preparar_etapas(tipo, caminho_csv, caminho_xlsx, max_etiquetas_pdf):
+    """Lista (etapa, função) em que cada função recebe a saída da anterior.
+
+    As funções não alteram a entrada, então podem ser repetidas com o mesmo argumento.
+    As duas leituras ignoram a entrada; a do CSV é a que segue para as outras etapas.
+    """
+    _, detectar, reformatar, criacao = TIPOS[tipo]
+    logo = logo_sintetica()
+
+    def deteccao(df):
+        df = df.copy()  # detectar_colunas_adaptadas altera os nomes das colunas
+        mapeamento, erro = detectar(df)
+        assert not erro, erro
+        return df, mapeamento
+
+    def reformatacao(entrada):
+        df, erro = reformatar(*entrada)
+        assert not erro, erro
+        return df
+
+    def limpeza_nomes(df):
+        df = df.copy()
+        df['NOME ESCOLA'] = limpar_nomes_escolas(df['NOME ESCOLA'])
+        return df
+
+    def anos_escolares(df):
+        df = df.copy()
+        if tipo == 'adaptadas':
+            df['ANO ESCOLAR'] = normalizar_anos_escolares(df['ANO ESCOLAR'].astype(str), adaptadas=True)
+        else:
+            df['ANO ESCOLAR'] = normalizar_anos_escolares(df['ANO ESCOLAR'])
+        return df
+
+    def ordenacao(df):
+        # Como em processar_*: as colunas de texto viram category antes da ordenação
+        return ordenar_por_escola(colunas_categoricas(df.copy()))
+
+    def pdf(df):
+        return criacao.gerar_etiquetas(df.head(max_etiquetas_pdf), logo, "OLIMPÍADA SINTÉTICA", "1ª FASE")
+
+    return [
+        ('leitura_xlsx', lambda _: ler_planilha(caminho_xlsx, caminho_xlsx, detectar)),
+        ('leitura', lambda _: ler_planilha(caminho_csv, caminho_csv, detectar)),
+        ('deteccao', deteccao),
+        ('reformatacao', reformatacao),
+        ('limpeza_nomes', limpeza_nomes),
+        ('anos_escolares', anos_escolares),
+        ('ordenacao', ordenacao),
+        ('pdf', pdf),
+    ]
+
+def medir_tempos(etapas, repeticoes):
+    """Melhor tempo de cada etapa e a saída da última"""
+    tempos = {}
+    entrada = None
+    for nome, funcao in etapas:
+        melhor = float('inf')
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            saida = funcao(entrada)
+            melhor = min(melhor, time.perf_counter() - inicio)
+        tempos[nome] = melhor
+        entrada = saida
+    return tempos, entrada
+
+def medir_memoria(etapas):
+    """Pico de memória (MB) alocado por cada etapa, em uma execução separada.
+
+    O tracemalloc deixa o código bem mais lento, por isso não é usado na medição de tempo.
+    """
+    picos = {}
+    entrada = None
+    tracemalloc.start()
+    try:
+        for nome, funcao in etapas:
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            saida = funcao(entrada)
+            _, pico = tracemalloc.get_traced_memory()
+            picos[nome] = (pico - base) / 1e6
+            del entrada
+            entrada = saida
+    finally:
+        tracemalloc.stop()
+    return picos
+
+def executar(tipo, escolas, repeticoes, com_memoria, max_etiquetas_pdf, pasta):
+    gerar_planilha = TIPOS[tipo][0]
+    caminho_csv = os.path.join(pasta, f'{tipo}_{escolas}.csv')
+    caminho_xlsx = os.path.join(pasta, f'{tipo}_{escolas}.xlsx')
+    planilha = gerar_planilha(escolas)
+    planilha.to_csv(caminho_csv, index=False)
+    planilha.to_excel(caminho_xlsx, index=False)
+
+    etapas = preparar_etapas(tipo, caminho_csv, caminho_xlsx, max_etiquetas_pdf)
+    tempos, pdf = medir_tempos(etapas, repeticoes)
+    picos = medir_memoria(etapas) if com_memoria else {}
+
+    resultado = {etapa: {'segundos': round(tempos[etapa], 4)} for etapa in ETAPAS}
+    for etapa, pico in picos.items():
+        resultado[etapa]['pico_mb'] = round(pico, 2)
+    return resultado, len(pdf)
+
+def comparar(atual, baseline, tolerancia):
+    """Lista as etapas em que o resultado atual ultrapassa a baseline"""
+    regressoes = []
+    for chave, etapas in atual.items():
+        for etapa, medidas in etapas.items():
+            referencia = baseline.get(chave, {}).get(etapa, {})
+            for medida, folga in (('segundos', FOLGA_SEGUNDOS), ('pico_mb', FOLGA_MB)):
+                if medida not in medidas or medida not in referencia:
+                    continue
+                limite = referencia[medida] * (1 + tolerancia) + folga
+                if medidas[medida] > limite:
+                    regressoes.append(f"{chave} {etapa}: {medida} = {medidas[medida]} "
+                                      f"(baseline {referencia[medida]}, limite {limite:.4f})")
+    return regressoes
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tipo', choices=sorted(TIPOS), nargs='+', default=sorted(TIPOS))
+    parser.add_argument('--escolas', type=int, nargs='+', help="Tamanhos das planilhas (número de escolas)")
+    parser.add_argument('--completo', action='store_true', help=f"Inclui {TAMANHO_COMPLETO} escolas")
+    parser.add_argument('--repeticoes', type=int, default=3, help="Execuções por etapa (vale a melhor)")
+    parser.add_argument('--max-etiquetas-pdf', type=int, default=20_000,
+                        help="Limite de etiquetas renderizadas na etapa do PDF")
+    parser.add_argument('--sem-memoria', action='store_true', help="Não mede o pico de memória")
+    parser.add_argument('--baseline', help=f"Arquivo JSON da baseline (padrão: {CAMINHO_BASELINE})")
+    parser.add_argument('--salvar-baseline', action='store_true', help="Grava os resultados como nova baseline")
+    parser.add_argument('--tolerancia', type=float, default=0.25, help="Piora aceita em relação à baseline")
+    args = parser.parse_args(argv)
+    caminho_baseline = args.baseline or CAMINHO_BASELINE
+    # Uma baseline pedida explicitamente tem que existir (antes de gastar tempo com as medições)
+    if args.baseline and not args.salvar_baseline and not os.path.exists(args.baseline):
+        parser.error(f"baseline não encontrada: {args.baseline}")
+
+    tamanhos = args.escolas or TAMANHOS_PADRAO + ([TAMANHO_COMPLETO] if args.completo else [])
+    resultados = {}
+    with tempfile.TemporaryDirectory() as pasta:
+        for tipo in args.tipo:
+            for escolas in tamanhos:
+                chave = f"{tipo}/{escolas}"
+                resultado, tamanho_pdf = executar(tipo, escolas, args.repeticoes, not args.sem_memoria,
+                                                  args.max_etiquetas_pdf, pasta)
+                resultados[chave] = resultado
+                print(f"\n{chave} (PDF: {tamanho_pdf / 1e6:.2f} MB)")
+                print(f"{'etapa':>15} {'segundos':>9} {'pico MB':>8}")
+                for etapa, medidas in resultado.items():
+                    pico = medidas.get('pico_mb')
+                    print(f"{etapa:>15} {medidas['segundos']:>9.4f} {'-' if pico is None else f'{pico:.2f}':>8}")
+
+    if args.salvar_baseline:
+        with open(caminho_baseline, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, indent=2, ensure_ascii=False)
+            f.write('\n')
+        print(f"\nBaseline gravada em {caminho_baseline}")
+        return 0
+
+    if not os.path.exists(caminho_baseline):
+        print(f"\nSem baseline em {caminho_baseline}; use --salvar-baseline para criar uma.")
+        return 0
+
+    with open(caminho_baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressoes = comparar(resultados, baseline, args.tolerancia)
+    if regressoes:
+        print("\nRegressões em relação à baseline:")
+        for regressao in regressoes:
+            print(f"  {regressao}")
+        return 1
+    print("\nNenhuma regressão em relação à baseline.")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
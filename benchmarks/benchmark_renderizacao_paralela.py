@@ -0,0 +1,66 @@
+"""Benchmark da renderização paralela do PDF de etiquetas.
+
+Uso:
+    python benchmarks/benchmark_renderizacao_paralela.py --etiquetas 50000 --workers 1 2 4 8
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+import pandas as pd
+from pypdf import PdfReader
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import criacao_nao_adaptadas
+from planilhas_sinteticas import logo_sintetica
+from renderizacao_paralela import gerar_etiquetas_paralelo
+
+
+def tabela_sintetica(quantidade):
+    anos = [f"{n}º ANO {turno}" for n in range(1, 10) for turno in ("MANHÃ", "TARDE")]
+    return pd.DataFrame({
+        'NOME ESCOLA': [f"ESCOLA SINTÉTICA {i // len(anos):05d}" for i in range(quantidade)],
+        'ANO ESCOLAR': [anos[i % len(anos)] for i in range(quantidade)],
+        'TOTAL': [(i % 35) + 1 for i in range(quantidade)],
+    })
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--etiquetas', type=int, default=20000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    tabela = tabela_sintetica(args.etiquetas)
+    logo = logo_sintetica()
+    referencia = None
+    tempo_serial = None
+
+    print(f"{args.etiquetas} etiquetas, {os.cpu_count()} CPUs")
+    print(f"{'workers':>8} {'segundos':>9} {'speedup':>8} {'páginas':>8} {'MB':>7}")
+    for workers in sorted(set(args.workers)):
+        inicio = time.perf_counter()
+        pdf = gerar_etiquetas_paralelo(
+            criacao_nao_adaptadas.gerar_etiquetas, tabela, logo, "OLIMPÍADA SINTÉTICA", "1ª FASE",
+            workers=workers,
+        )
+        segundos = time.perf_counter() - inicio
+        tempo_serial = tempo_serial or segundos
+
+        # Confere se as páginas são as mesmas da primeira execução
+        paginas = PdfReader(io.BytesIO(pdf)).pages
+        textos = [paginas[0].extract_text(), paginas[-1].extract_text()]
+        if referencia is None:
+            referencia = (len(paginas), textos)
+        elif referencia != (len(paginas), textos):
+            print(f"ERRO: resultado com {workers} workers difere da referência")
+            return 1
+
+        print(f"{workers:>8} {segundos:>9.2f} {tempo_serial / segundos:>7.2f}x {len(paginas):>8} {len(pdf) / 1e6:>7.2f}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
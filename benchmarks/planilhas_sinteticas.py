@@ -0,0 +1,140 @@
+"""Geração de planilhas sintéticas nos dois formatos de entrada, para os benchmarks."""
+import io
+
+import numpy as np
+import pandas as pd
+from PIL import Image
+
+PREFIXOS = ["ESCOLA MUNICIPAL ", "E M E F ", "EMEIF ", "E.M.E.F. ", "ESC MUN ", "Escola ", "CMEI ", ""]
+NOMES = ["PEIXE-BOI", "SÃO JOSÉ", "MARIA DAS GRAÇAS", "TIRADENTES", "SANTA LUZIA", "BOA ESPERANÇA",
+         "PROFESSORA ANA NERY", "MONTEIRO LOBATO", "CASTRO ALVES", "DOM PEDRO II"]
+
+COLUNAS_NAO_ADAPTADAS = (
+    [f"Total de alunos do {ano}º ano da {turno}" for ano in range(1, 10) for turno in ("MANHÃ", "TARDE")]
+    + [f"Total de alunos da EJA {etapa}ª ETAPA" for etapa in range(1, 5)]
+    + [f"Total de alunos EJAI {etapa}" for etapa in range(1, 4)]
+)
+
+# Nomes de escolas como nas redes municipais e estaduais: tipo da escola, título e o nome do
+# patrono, com as palavras sorteadas com frequência de Zipf (poucas muito comuns, como MARIA e SILVA)
+TIPOS_ESCOLA = ["ESCOLA MUNICIPAL DE ENSINO FUNDAMENTAL", "ESCOLA ESTADUAL", "UNIDADE ESCOLAR",
+                "ESCOLA ESTADUAL DE ENSINO FUNDAMENTAL E MÉDIO", "CRECHE MUNICIPAL", "COLÉGIO ESTADUAL",
+                "CENTRO EDUCACIONAL", "ESCOLA MUNICIPAL", "CENTRO DE EDUCAÇÃO INFANTIL", "GRUPO ESCOLAR",
+                "ESCOLA DE ENSINO FUNDAMENTAL", "INSTITUTO ESTADUAL DE EDUCAÇÃO", ""]
+TITULOS = ["", "", "", "PROFESSORA", "PROFESSOR", "DOUTOR", "PADRE", "DOM", "SÃO", "SANTA", "MONSENHOR",
+           "GOVERNADOR", "PRESIDENTE", "VEREADOR", "DEPUTADO", "IRMÃ", "MADRE"]
+PALAVRAS_NOMES = (
+    "MARIA JOSÉ JOÃO ANTÔNIO FRANCISCO ANA PAULO PEDRO CARLOS LUIZ MANOEL RAIMUNDO SEBASTIÃO FRANCISCA "
+    "ANTÔNIA SILVA SANTOS OLIVEIRA SOUZA LIMA PEREIRA FERREIRA COSTA RODRIGUES ALMEIDA NASCIMENTO ALVES "
+    "CARVALHO ARAÚJO RIBEIRO GOMES MARTINS BARBOSA ROCHA DIAS MONTEIRO CAVALCANTI MELO FREITAS CORREIA "
+    "TEIXEIRA MOURA MENDES CASTRO ANDRADE NUNES MOREIRA LOPES VIEIRA BEZERRA CARDOSO SOARES FERNANDES "
+    "MACHADO GONÇALVES AZEVEDO CUNHA PINTO RAMOS"
+).split()
+CONECTIVOS = ["DE", "DA", "DOS", "DAS"]
+
+CATEGORIAS = ["TEA", "DV", "DA", "DI", "TDAH", "BAIXA VISÃO"]
+ANOS_ADAPTADAS = ["1", "2º", "3º ANO", "4", "5º", "6 ano", "7º", "8", "9º ANO", "EJAI 1", "EJAI 2ª",
+                  "EJA 1ª ETAPA"]
+
+
+def nomes_escolas(quantidade, rng):
+    """Nomes com siglas variadas, acentos e códigos INEP, como nas planilhas reais"""
+    prefixos = rng.choice(PREFIXOS, quantidade)
+    nomes = rng.choice(NOMES, quantidade)
+    inep = rng.integers(10_000_000, 99_999_999, quantidade)
+    com_inep = rng.random(quantidade) < 0.3
+    return [
+        f"{prefixo}{nome} {i}" + (f" (INEP: {codigo})" if tem_inep else "")
+        for i, (prefixo, nome, codigo, tem_inep) in enumerate(zip(prefixos, nomes, inep, com_inep))
+    ]
+
+def vocabulario_nomes(palavras, rng):
+    """"palavras" palavras de nomes próprios: as reais primeiro, completadas com inventadas"""
+    vocabulario = PALAVRAS_NOMES[:palavras]
+    letras = list("ABCDEFGILMNORSTUV")
+    while len(vocabulario) < palavras:
+        palavra = "".join(rng.choice(letras, rng.integers(4, 10)))
+        if palavra not in vocabulario:
+            vocabulario.append(palavra)
+    return vocabulario
+
+def nomes_escolas_realistas(quantidade, palavras=800, semente=0):
+    """"quantidade" nomes distintos de escolas, com o nome do patrono sorteado de um vocabulário
+    de "palavras" palavras (quanto menor o vocabulário, mais parecidos os nomes)"""
+    rng = np.random.default_rng(semente)
+    vocabulario = vocabulario_nomes(palavras, rng)
+    pesos = 1 / np.arange(1, len(vocabulario) + 1)
+    pesos /= pesos.sum()
+    nomes = set()
+    while len(nomes) < quantidade:
+        quantidade_palavras = int(rng.integers(2, 5))
+        patrono = list(rng.choice(vocabulario, quantidade_palavras, p=pesos))
+        if quantidade_palavras > 2 and rng.random() < 0.5:
+            patrono.insert(int(rng.integers(1, quantidade_palavras)), rng.choice(CONECTIVOS))
+        partes = [rng.choice(TIPOS_ESCOLA), rng.choice(TITULOS), *patrono]
+        if rng.random() < 0.1:
+            partes.append(str(rng.integers(1, 200)))
+        nomes.add(" ".join(parte for parte in partes if parte))
+    return sorted(nomes)
+
+def nomes_com_erros(nomes, quantidade, semente=0):
+    """Pares (nome, variante) com erros de digitação: letra trocada, invertida, a menos ou a
+    mais, e conectivo esquecido"""
+    rng = np.random.default_rng(semente)
+    pares = []
+    for nome in rng.choice(nomes, quantidade, replace=False):
+        posicao = int(rng.integers(1, len(nome) - 1))
+        erro = int(rng.integers(5))
+        if erro == 0:
+            variante = nome[:posicao] + rng.choice(list("ABCDEFGILMNORSTUV")) + nome[posicao + 1:]
+        elif erro == 1:
+            variante = nome[:posicao] + nome[posicao + 1] + nome[posicao] + nome[posicao + 2:]
+        elif erro == 2:
+            variante = nome[:posicao] + nome[posicao + 1:]
+        elif erro == 3 and any(f" {c} " in nome for c in CONECTIVOS):
+            conectivo = next(c for c in CONECTIVOS if f" {c} " in nome)
+            variante = nome.replace(f" {conectivo} ", " ", 1)
+        else:
+            variante = nome[:posicao] + rng.choice(list("AEIO")) + nome[posicao:]
+        if variante != nome:
+            pares.append((str(nome), variante))
+    return pares
+
+def planilha_nao_adaptadas(escolas, colunas_extras=0, semente=0):
+    """Formato largo do Google Forms: uma coluna por ano/turno ("Total de alunos do 1º ano da MANHÃ"...).
+
+    A maior parte das células fica vazia e ~5% das escolas só têm zeros. "colunas_extras"
+    acrescenta colunas de texto livre irrelevantes (carimbo de data, e-mail, observações).
+    """
+    rng = np.random.default_rng(semente)
+    dados = {"Carimbo de data/hora": pd.date_range("2026-03-01", periods=escolas, freq="min").astype(str)}
+    dados["Qual é o nome da sua escola?"] = nomes_escolas(escolas, rng)
+    for coluna in COLUNAS_NAO_ADAPTADAS:
+        valores = rng.integers(1, 40, escolas).astype(float)
+        valores[rng.random(escolas) < 0.7] = np.nan
+        dados[coluna] = valores
+    so_zeros = rng.random(escolas) < 0.05
+    for coluna in COLUNAS_NAO_ADAPTADAS:
+        dados[coluna][so_zeros] = 0
+    for i in range(colunas_extras):
+        dados[f"Observações {i + 1}"] = rng.choice(["", "Sem observações", "Turma com aluno novo"], escolas)
+    return pd.DataFrame(dados)
+
+def planilha_adaptadas(escolas, semente=0):
+    """Formato Escola/Categoria/Ano/Quantidade, com 1 a 4 linhas por escola"""
+    rng = np.random.default_rng(semente)
+    linhas_por_escola = rng.integers(1, 5, escolas)
+    nomes = np.repeat(np.array(nomes_escolas(escolas, rng), dtype=object), linhas_por_escola)
+    total = len(nomes)
+    return pd.DataFrame({
+        "Escola": nomes,
+        "Categoria": rng.choice(CATEGORIAS, total),
+        "Ano": rng.choice(ANOS_ADAPTADAS, total),
+        "Quantidade": rng.integers(0, 6, total),
+    })
+
+def logo_sintetica(largura=1200, altura=180):
+    """Logo JPEG em memória"""
+    buffer = io.BytesIO()
+    Image.new('RGB', (largura, altura), (30, 90, 160)).save(buffer, format='JPEG')
+    return buffer
@@ -0,0 +1,210 @@
+"""Cache persistente (SQLite) dos nomes de escola e anos escolares já padronizados.
+
+Os mesmos nomes voltam a cada rodada da olimpíada: em vez de limpar tudo de novo a cada
+upload, os valores distintos da coluna são consultados de uma vez no cache e só os que
+faltam passam pelas funções de limpeza. O cache também guarda correções manuais
+(valor original → valor correto), que têm prioridade e nunca são descartadas.
+
+Os valores originais são procurados sem diferenciar maiúsculas, minúsculas e espaços nas
+pontas (ver chave_original): "Escola X " na planilha encontra a correção feita para "ESCOLA X".
+
+Junto com os valores fica a versão das regras de limpeza (VERSAO_REGRAS): se as regras
+mudaram desde a última vez, os valores automáticos são descartados ao abrir o cache.
+"""
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+from processamento import VERSAO_REGRAS
+
+# Caminho padrão do arquivo (pode ser trocado pela variável de ambiente)
+CAMINHO_PADRAO = os.environ.get(
+    'ETIQUETAS_CACHE_NORMALIZACAO',
+    os.path.join(os.path.expanduser('~'), '.cache', 'etiquetas', 'normalizacao.sqlite3')
+)
+
+# Quantidade máxima de valores automáticos guardados (os usados há mais tempo são descartados)
+MAX_ENTRADAS = 200_000
+
+# O SQLite limita a quantidade de parâmetros por consulta
+TAMANHO_LOTE_CONSULTA = 500
+
+# Tipos de valor guardados no cache
+ESCOLA = 'escola'
+ANO = 'ano'
+ANO_ADAPTADAS = 'ano_adaptadas'
+TIPOS = (ESCOLA, ANO, ANO_ADAPTADAS)
+
+
+def chave_original(original):
+    """Chave com que um valor original é guardado e procurado no cache"""
+    return str(original).strip().casefold()
+
+
+class CacheNormalizacao:
+    """Valores originais → padronizados, por tipo, em um arquivo SQLite.
+
+    Cada operação abre a própria conexão, então o mesmo cache pode ser usado por várias
+    sessões do Streamlit (threads) e pelos processos do lote ao mesmo tempo.
+    """
+
+    def __init__(self, caminho=CAMINHO_PADRAO, max_entradas=MAX_ENTRADAS, versao_regras=VERSAO_REGRAS):
+        self.caminho = caminho
+        self.max_entradas = max_entradas
+        self._lock = threading.Lock()
+        self._versao = None
+        os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        with self._conectar() as conexao:
+            conexao.execute("""
+                CREATE TABLE IF NOT EXISTS normalizacoes (
+                    tipo TEXT NOT NULL,
+                    original TEXT NOT NULL,
+                    normalizado TEXT NOT NULL,
+                    manual INTEGER NOT NULL DEFAULT 0,
+                    usado REAL NOT NULL,
+                    PRIMARY KEY (tipo, original)
+                )
+            """)
+            conexao.execute("CREATE INDEX IF NOT EXISTS idx_usado ON normalizacoes (manual, usado)")
+            conexao.execute("CREATE TABLE IF NOT EXISTS metadados (chave TEXT PRIMARY KEY, valor TEXT NOT NULL)")
+            guardada = conexao.execute("SELECT valor FROM metadados WHERE chave = 'versao_regras'").fetchone()
+            if guardada is None or guardada[0] != str(versao_regras):
+                # Valores limpos com outras regras: só as correções manuais continuam valendo
+                # (com a chave refeita, para as gravadas antes de chave_original existir)
+                manuais = conexao.execute(
+                    "SELECT tipo, original, normalizado, usado FROM normalizacoes WHERE manual = 1"
+                ).fetchall()
+                conexao.execute("DELETE FROM normalizacoes")
+                conexao.executemany(
+                    "INSERT OR REPLACE INTO normalizacoes (tipo, original, normalizado, manual, usado) "
+                    "VALUES (?, ?, ?, 1, ?)",
+                    [(tipo, chave_original(original), normalizado, usado)
+                     for tipo, original, normalizado, usado in manuais]
+                )
+                conexao.execute("INSERT OR REPLACE INTO metadados (chave, valor) VALUES ('versao_regras', ?)",
+                                (str(versao_regras),))
+
+    @contextmanager
+    def _conectar(self):
+        """Conexão em uma transação: confirma no fim do bloco (ou desfaz, se der erro) e fecha"""
+        conexao = sqlite3.connect(self.caminho, timeout=30)
+        try:
+            conexao.execute("PRAGMA journal_mode=WAL")
+            with conexao:
+                yield conexao
+        finally:
+            conexao.close()
+
+    def consultar(self, tipo, originais):
+        """{original: normalizado} dos valores encontrados, em consultas em lote"""
+        chaves = {original: chave_original(original) for original in originais}
+        unicas = list(dict.fromkeys(chaves.values()))
+        encontrados = {}
+        agora = time.time()
+        with self._lock, self._conectar() as conexao:
+            for inicio in range(0, len(unicas), TAMANHO_LOTE_CONSULTA):
+                lote = unicas[inicio:inicio + TAMANHO_LOTE_CONSULTA]
+                marcadores = ','.join('?' * len(lote))
+                encontrados.update(conexao.execute(
+                    f"SELECT original, normalizado FROM normalizacoes WHERE tipo = ? AND original IN ({marcadores})",
+                    [tipo, *lote]
+                ))
+                # Marca os valores como usados agora (para o descarte dos mais antigos). Nas
+                # correções manuais "usado" guarda a data da correção (ver versao). O "+" evita
+                # que o SQLite troque a chave primária pelo índice de "manual" nessa busca
+                conexao.execute(
+                    f"UPDATE normalizacoes SET usado = ? WHERE tipo = ? AND original IN ({marcadores}) AND +manual = 0",
+                    [agora, tipo, *lote]
+                )
+        return {original: encontrados[chave] for original, chave in chaves.items() if chave in encontrados}
+
+    def guardar(self, tipo, valores):
+        """Guarda os pares (original, normalizado) calculados, sem sobrescrever correções manuais"""
+        agora = time.time()
+        with self._lock, self._conectar() as conexao:
+            conexao.executemany(
+                "INSERT INTO normalizacoes (tipo, original, normalizado, manual, usado) VALUES (?, ?, ?, 0, ?) "
+                "ON CONFLICT (tipo, original) DO UPDATE SET normalizado = excluded.normalizado, usado = excluded.usado "
+                "WHERE manual = 0",
+                [(tipo, chave_original(original), normalizado, agora) for original, normalizado in valores.items()]
+            )
+            self._descartar_antigos(conexao)
+
+    def _descartar_antigos(self, conexao):
+        automaticos = conexao.execute("SELECT COUNT(*) FROM normalizacoes WHERE manual = 0").fetchone()[0]
+        if automaticos > self.max_entradas:
+            conexao.execute(
+                "DELETE FROM normalizacoes WHERE rowid IN "
+                "(SELECT rowid FROM normalizacoes WHERE manual = 0 ORDER BY usado LIMIT ?)",
+                (automaticos - self.max_entradas,)
+            )
+
+    def corrigir(self, tipo, original, normalizado):
+        """Correção manual: "original" passa a virar "normalizado" em todos os uploads"""
+        with self._lock, self._conectar() as conexao:
+            conexao.execute(
+                "INSERT INTO normalizacoes (tipo, original, normalizado, manual, usado) VALUES (?, ?, ?, 1, ?) "
+                "ON CONFLICT (tipo, original) DO UPDATE SET normalizado = excluded.normalizado, manual = 1, "
+                "usado = excluded.usado",
+                (tipo, chave_original(original), str(normalizado), time.time())
+            )
+            self._versao = None
+
+    def remover_correcao(self, tipo, original):
+        """Remove a correção manual (o valor volta a ser limpo automaticamente)"""
+        with self._lock, self._conectar() as conexao:
+            conexao.execute("DELETE FROM normalizacoes WHERE tipo = ? AND original = ? AND manual = 1",
+                            (tipo, chave_original(original)))
+            self._versao = None
+
+    def correcoes(self):
+        """DataFrame com as correções manuais (tipo, original, normalizado)"""
+        with self._lock, self._conectar() as conexao:
+            linhas = conexao.execute(
+                "SELECT tipo, original, normalizado FROM normalizacoes WHERE manual = 1 ORDER BY tipo, original"
+            ).fetchall()
+        return pd.DataFrame(linhas, columns=['tipo', 'original', 'normalizado'])
+
+    def versao(self):
+        """Muda sempre que uma correção manual é incluída, alterada ou removida.
+
+        Consultada a cada atualização da página, por isso fica em memória até a próxima
+        correção feita por este objeto (as correções só são feitas pela interface).
+        """
+        with self._lock:
+            if self._versao is None:
+                with self._conectar() as conexao:
+                    self._versao = conexao.execute(
+                        "SELECT COUNT(*), COALESCE(MAX(usado), 0) FROM normalizacoes WHERE manual = 1"
+                    ).fetchone()
+            return self._versao
+
+    def normalizar(self, valores, tipo, funcao):
+        """Aplica "funcao" (vetorizada, Series → Series) usando o cache.
+
+        Só os valores distintos que não estão no cache passam por "funcao"; o resultado é
+        guardado e mapeado de volta para todas as linhas. Valores ausentes seguem por
+        "funcao", como sem cache.
+        """
+        codigos, unicos = pd.factorize(valores)
+        if len(unicos) == 0:
+            return funcao(valores)
+
+        textos = [str(valor) for valor in unicos.to_numpy(dtype=object)]
+        encontrados = self.consultar(tipo, textos)
+        faltando = [texto for texto in dict.fromkeys(textos) if texto not in encontrados]
+        if faltando:
+            calculados = funcao(pd.Series(faltando, dtype=object))
+            novos = dict(zip(faltando, calculados))
+            self.guardar(tipo, novos)
+            encontrados.update(novos)
+
+        resultado = pd.Series([encontrados[texto] for texto in textos], dtype=object).to_numpy().take(codigos)
+        ausentes = codigos == -1
+        if ausentes.any():
+            resultado[ausentes] = funcao(valores[ausentes]).to_numpy(dtype=object)
+        return pd.Series(resultado, index=valores.index, name=valores.name)
@@ -0,0 +1,109 @@
+"""Medição de tempo e memória das etapas do processamento e da geração do PDF.
+
+As etapas só são medidas quando há uma coleta ativa (painel de diagnóstico do app) ou
+quando o log JSON está ligado pela variável de ambiente ETIQUETAS_LOG_JSON=1. Fora
+disso, "etapa" não faz nada além de consultar uma variável de contexto.
+"""
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Contagens que também são reportadas por segundo (ex.: etiquetas/s e páginas/s no PDF)
+CONTAGENS_POR_SEGUNDO = ('linhas', 'etiquetas', 'paginas')
+
+logger = logging.getLogger('etiquetas.diagnostico')
+
+# Lista de registros da coleta ativa (por sessão/thread do Streamlit) e se mede memória
+_coleta = ContextVar('coleta_diagnostico', default=None)
+
+
+def configurar_log():
+    """Liga o log JSON (uma linha por etapa em stderr) se ETIQUETAS_LOG_JSON estiver definida"""
+    if os.environ.get('ETIQUETAS_LOG_JSON', '').lower() not in ('1', 'true', 'sim'):
+        return False
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return True
+
+LOG_JSON = configurar_log()
+
+def ligar_medicao_memoria():
+    """Liga o tracemalloc, uma única vez no processo (não é desligado depois: outras etapas,
+    de outras sessões ou aninhadas, podem estar medindo ao mesmo tempo)"""
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+@contextmanager
+def coletar(memoria=False):
+    """Coleta os registros das etapas executadas dentro do bloco.
+
+    Com memoria=True a memória de cada etapa é medida com tracemalloc, ligado na primeira
+    vez e mantido ligado, o que deixa todo o processo mais lento a partir daí.
+    """
+    if memoria:
+        ligar_medicao_memoria()
+    registros = []
+    token = _coleta.set((registros, memoria))
+    try:
+        yield registros
+    finally:
+        _coleta.reset(token)
+
+def medindo_memoria():
+    """Se a coleta ativa mede o pico de memória"""
+    coleta = _coleta.get()
+    return coleta is not None and coleta[1]
+
+def incluir_registros(registros):
+    """Acrescenta à coleta ativa registros medidos fora dela (ex.: tarefas em segundo plano)"""
+    coleta = _coleta.get()
+    if coleta is not None:
+        coleta[0].extend(registros)
+
+@contextmanager
+def etapa(nome, **dados):
+    """Mede o bloco como uma etapa. O dicionário devolvido pode receber contagens
+    (linhas, etiquetas, paginas...) que entram no registro.
+
+    Com medição de memória, o registro traz a variação da memória alocada durante a etapa
+    (memoria_mb) e o pico de memória do processo inteiro desde que o tracemalloc foi ligado
+    (pico_processo_mb). O tracemalloc é só lido aqui, nunca reiniciado nem desligado, por isso
+    as medidas incluem etapas aninhadas e o que outras threads alocaram no mesmo período.
+    """
+    coleta = _coleta.get()
+    if coleta is None and not LOG_JSON:
+        yield dados
+        return
+
+    registros, memoria = coleta if coleta is not None else (None, False)
+    memoria = memoria and tracemalloc.is_tracing()
+    if memoria:
+        memoria_inicial, _ = tracemalloc.get_traced_memory()
+    inicio = time.perf_counter()
+    try:
+        yield dados
+    finally:
+        segundos = time.perf_counter() - inicio
+        registro = {'etapa': nome, 'segundos': round(segundos, 4)}
+        if memoria:
+            atual, pico = tracemalloc.get_traced_memory()
+            registro['memoria_mb'] = round((atual - memoria_inicial) / 1e6, 2)
+            registro['pico_processo_mb'] = round(pico / 1e6, 2)
+        registro.update(dados)
+        for contagem in CONTAGENS_POR_SEGUNDO:
+            if contagem in dados and segundos > 0:
+                registro[f'{contagem}_por_segundo'] = round(dados[contagem] / segundos, 1)
+
+        if registros is not None:
+            registros.append(registro)
+        if LOG_JSON:
+            logger.info(json.dumps({'evento': 'etapa', **registro}, ensure_ascii=False, default=str))
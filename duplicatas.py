@@ -0,0 +1,184 @@
+"""Detecção de escolas duplicadas (mesmo nome escrito de formas diferentes).
+
+Os nomes são comparados por uma forma normalizada (sem acentos, pontuação e espaços
+repetidos). Nomes com a mesma forma são duplicatas certas ("PEIXE BOI" e "PEIXE-BOI").
+Para os demais, os nomes são separados pelos números que contêm e, dentro de cada grupo, os
+candidatos vêm de dois índices: um de trigramas de caracteres (filtragem por prefixo: só os
+trigramas mais raros de cada nome entram na busca, e os muito comuns, como "ESC" e "MUN",
+ficam de fora) e um das palavras (nomes que só diferem em uma palavra ou nos espaços).
+Apenas esses pares são comparados, em vez de todos contra todos.
+"""
+import math
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+from itertools import combinations
+
+import pandas as pd
+
+# Similaridade mínima (difflib, de 0 a 1) para considerar dois nomes a mesma escola
+SIMILARIDADE_MINIMA = 0.9
+
+# Semelhança mínima entre os conjuntos de trigramas usada na seleção de candidatos.
+# Mais baixa que SIMILARIDADE_MINIMA porque uma letra trocada muda até três trigramas.
+JACCARD_CANDIDATOS = 0.5
+
+TAMANHO_NGRAMA = 3
+
+# Trigramas e blocos de palavras presentes em mais nomes que isso (a maior das duas medidas)
+# não entram nos índices: "ESC", "MUN", "EST"... estão em quase todos os nomes, não distinguem
+# escola nenhuma e deixavam a busca quase quadrática
+FRACAO_NOMES_COMUNS = 0.01
+MINIMO_NOMES_COMUNS = 50
+
+PADRAO_NAO_ALFANUMERICO = re.compile(r'[^0-9A-Z]+')
+PADRAO_NUMEROS = re.compile(r'\d+')
+
+
+def normalizar_para_comparacao(nome):
+    """Nome sem acentos, pontuação e espaços repetidos, em maiúsculas"""
+    sem_acentos = unicodedata.normalize('NFKD', str(nome)).encode('ascii', 'ignore').decode('ascii')
+    return PADRAO_NAO_ALFANUMERICO.sub(' ', sem_acentos.upper()).strip()
+
+def ngramas(texto):
+    texto = f" {texto} "
+    return {texto[i:i + TAMANHO_NGRAMA] for i in range(len(texto) - TAMANHO_NGRAMA + 1)}
+
+def pares_candidatos(conjuntos, limiar=JACCARD_CANDIDATOS):
+    """Pares (j, i) cujos conjuntos de n-gramas têm Jaccard >= limiar.
+
+    Os n-gramas de cada conjunto são ordenados do mais raro para o mais comum e só os
+    primeiros |x| - ceil(limiar * |x|) + 1 vão para o índice: dois conjuntos com Jaccard
+    acima do limiar sempre têm um n-grama em comum nesses prefixos. Os conjuntos são
+    percorridos do menor para o maior: assim os candidatos nunca são maiores que o conjunto
+    atual, o índice só precisa do prefixo mais curto |x| - ceil(2 * limiar / (1 + limiar) * |x|) + 1
+    e os candidatos pequenos demais são descartados antes de calcular a interseção.
+    """
+    frequencia = Counter(g for conjunto in conjuntos for g in conjunto)
+    indice = defaultdict(list)
+    for i in sorted(range(len(conjuntos)), key=lambda i: len(conjuntos[i])):
+        conjunto = conjuntos[i]
+        tamanho = len(conjunto)
+        ordenados = sorted(conjunto, key=lambda g: (frequencia[g], g))
+        candidatos = set()
+        for g in ordenados[:tamanho - math.ceil(limiar * tamanho - 1e-9) + 1]:
+            candidatos.update(indice[g])
+        for g in ordenados[:tamanho - math.ceil(2 * limiar / (1 + limiar) * tamanho - 1e-9) + 1]:
+            indice[g].append(i)
+        minimo = limiar * tamanho
+        for j in candidatos:
+            outro = conjuntos[j]
+            if len(outro) < minimo:
+                continue
+            comuns = len(conjunto & outro)
+            if comuns >= limiar * (tamanho + len(outro) - comuns):
+                yield j, i
+
+def pares_por_palavras(chaves, limite):
+    """Pares (i, j) de nomes que só diferem em uma palavra (trocada ou digitada errado, a mais ou
+    a menos) ou nos espaços ("LUIZA NTONIO", "JOAOFERREIRA").
+
+    Cada nome entra no índice com as palavras, sem os espaços e, se tiver três palavras ou
+    mais, com cada versão sem uma das palavras (com e sem a posição marcada); dois nomes nesses
+    casos têm uma chave em comum. Chaves com mais de "limite" nomes são ignoradas.
+    """
+    blocos = defaultdict(list)
+    for i, chave in enumerate(chaves):
+        palavras = tuple(chave.split())
+        blocos[palavras].append(i)
+        blocos[''.join(palavras)].append(i)
+        if len(palavras) > 2:
+            for k in range(len(palavras)):
+                blocos[palavras[:k] + (None,) + palavras[k + 1:]].append(i)
+                blocos[palavras[:k] + palavras[k + 1:]].append(i)
+    pares = set()
+    for indices in blocos.values():
+        if 1 < len(indices) <= limite:
+            pares.update(combinations(indices, 2))
+    return pares
+
+def agrupar_duplicatas(nomes, similaridade_minima=SIMILARIDADE_MINIMA):
+    """Agrupa os nomes distintos que parecem ser a mesma escola.
+
+    Retorna uma lista de grupos (listas de nomes, do mais frequente para o menos
+    frequente em "nomes"), só com os grupos de dois ou mais nomes.
+    """
+    contagem = pd.Series(nomes).dropna().value_counts()
+    contagem = contagem[contagem > 0]  # numa coluna category, value_counts inclui as categorias sem linhas
+    distintos = list(contagem.index)
+
+    # Nomes com a mesma forma normalizada são o mesmo grupo de saída
+    por_chave = defaultdict(list)
+    for nome in distintos:
+        por_chave[normalizar_para_comparacao(nome)].append(nome)
+    chaves = list(por_chave)
+
+    # Union-find sobre as chaves normalizadas
+    pai = list(range(len(chaves)))
+
+    def raiz(i):
+        while pai[i] != i:
+            pai[i] = pai[pai[i]]
+            i = pai[i]
+        return i
+
+    # Trigramas comuns demais ficam fora do índice (ver FRACAO_NOMES_COMUNS)
+    limite = max(MINIMO_NOMES_COMUNS, FRACAO_NOMES_COMUNS * len(chaves))
+    conjuntos = [ngramas(chave) for chave in chaves]
+    frequencia = Counter(g for conjunto in conjuntos for g in conjunto)
+    comuns = {g for g, quantidade in frequencia.items() if quantidade > limite}
+    conjuntos = [conjunto - comuns for conjunto in conjuntos]
+
+    # "ESCOLA 1" e "ESCOLA 2" são escolas diferentes, por mais parecidos que sejam os nomes: só
+    # nomes com os mesmos números são comparados, cada grupo com os próprios índices
+    # (senão "E M E F 12", "E M E F 13"... viram candidatos todos contra todos)
+    por_numeros = defaultdict(list)
+    for i, chave in enumerate(chaves):
+        por_numeros[tuple(PADRAO_NUMEROS.findall(chave))].append(i)
+    comparador = SequenceMatcher(None)
+    for indices in por_numeros.values():
+        if len(indices) < 2:
+            continue
+        pares = set(pares_candidatos([conjuntos[i] for i in indices]))
+        pares.update(pares_por_palavras([chaves[i] for i in indices], limite))
+        vizinhos = defaultdict(list)
+        for a, b in pares:
+            vizinhos[indices[a]].append(indices[b])
+
+        # O SequenceMatcher guarda o índice do segundo nome: cada nome é preparado uma vez
+        for i, outros in vizinhos.items():
+            comparador.set_seq2(chaves[i])
+            for j in outros:
+                if raiz(i) == raiz(j):
+                    continue
+                comparador.set_seq1(chaves[j])
+                # real_quick_ratio e quick_ratio são limites superiores baratos do ratio
+                if (comparador.real_quick_ratio() >= similaridade_minima
+                        and comparador.quick_ratio() >= similaridade_minima
+                        and comparador.ratio() >= similaridade_minima):
+                    pai[raiz(i)] = raiz(j)
+
+    grupos = defaultdict(list)
+    for i, chave in enumerate(chaves):
+        grupos[raiz(i)].extend(por_chave[chave])
+    resultado = [
+        sorted(grupo, key=lambda nome: (-contagem[nome], str(nome)))
+        for grupo in grupos.values() if len(grupo) > 1
+    ]
+    return sorted(resultado, key=lambda grupo: str(grupo[0]))
+
+def duplicatas_certas(grupo):
+    """Todos os nomes do grupo têm a mesma forma normalizada (só mudam acentos/pontuação)"""
+    return len({normalizar_para_comparacao(nome) for nome in grupo}) == 1
+
+def mesclar_escolas(df, mapeamento):
+    """Substitui os nomes duplicados pelo nome escolhido e reordena as etiquetas.
+
+    A ordenação é estável, então as linhas de cada escola mantêm a ordem original.
+    """
+    if not mapeamento:
+        return df
+    df = df.copy()
+    df['NOME ESCOLA'] = df['NOME ESCOLA'].astype(object).replace(mapeamento).astype('category')
+    return df.sort_values(by='NOME ESCOLA', kind='stable').reset_index(drop=True)
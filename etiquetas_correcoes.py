@@ -0,0 +1,59 @@
+import sqlite3
+
+import streamlit as st
+
+from cache_normalizacao import TIPOS, CacheNormalizacao
+
+ROTULOS_TIPOS = {
+    'escola': "Nome da escola",
+    'ano': "Ano escolar (não adaptadas)",
+    'ano_adaptadas': "Ano escolar (adaptadas)",
+}
+
+@st.cache_resource(show_spinner=False)
+def cache_normalizacao():
+    """Cache persistente dos nomes e anos padronizados, compartilhado entre as sessões.
+
+    Retorna None se o arquivo não puder ser criado (ex.: disco somente leitura); nesse
+    caso a limpeza é feita sem cache, como antes.
+    """
+    try:
+        return CacheNormalizacao()
+    except (OSError, sqlite3.Error):
+        return None
+
+def versao_correcoes(cache):
+    """Entra na chave do cache das planilhas processadas: uma correção nova invalida o resultado"""
+    return None if cache is None else cache.versao()
+
+@st.cache_data(max_entries=1, show_spinner=False)
+def correcoes_cache(versao, _cache):
+    """Correções manuais lidas do SQLite só quando mudam (a barra lateral aparece a cada atualização)"""
+    return _cache.correcoes()
+
+def interface_correcoes():
+    """Correções manuais (barra lateral): valor da planilha → valor usado nas etiquetas"""
+    cache = cache_normalizacao()
+    if cache is None:
+        return
+    with st.sidebar.expander("✏️ Correções de nomes"):
+        with st.form('form_correcao', clear_on_submit=True):
+            tipo = st.selectbox("Tipo", TIPOS, format_func=ROTULOS_TIPOS.get)
+            original = st.text_input("Como aparece na planilha")
+            normalizado = st.text_input("Como deve sair na etiqueta").upper().strip()
+            if st.form_submit_button("💾 Salvar correção") and original and normalizado:
+                cache.corrigir(tipo, original, normalizado)
+                st.success("Correção salva.")
+
+        correcoes = correcoes_cache(cache.versao(), cache)
+        if correcoes.empty:
+            st.caption("Nenhuma correção salva.")
+            return
+        st.dataframe(correcoes, hide_index=True, use_container_width=True)
+        remover = st.selectbox(
+            "Remover correção", [None] + list(correcoes.itertuples(index=False, name=None)),
+            format_func=lambda c: "" if c is None else f"{c[1]} → {c[2]}"
+        )
+        if remover is not None and st.button("🗑️ Remover"):
+            cache.remover_correcao(remover[0], remover[1])
+            st.rerun()
@@ -0,0 +1,61 @@
+import streamlit as st
+
+from duplicatas import agrupar_duplicatas, duplicatas_certas, mesclar_escolas
+from processamento import hash_dataframe
+
+# Quantidade máxima de grupos exibidos para revisão (os demais não são mesclados)
+MAX_GRUPOS_EXIBIDOS = 200
+
+@st.cache_data(max_entries=16, show_spinner="Procurando escolas duplicadas...")
+def grupos_duplicatas(hash_escolas, _escolas):
+    """Agrupa os nomes parecidos uma única vez por conjunto de escolas"""
+    return agrupar_duplicatas(_escolas)
+
+def revisar_duplicatas(df, tipo):
+    """Mostra as escolas com nomes parecidos e aplica as mesclagens escolhidas pelo usuário.
+
+    Os grupos que só diferem em acentos e pontuação já vêm mesclados (com o nome mais
+    frequente); os demais precisam ser confirmados. As escolhas só valem depois de "Aplicar", para não gerar o PDF a cada clique.
+    Retorna o DataFrame com os nomes mesclados (ou o original, se não houver mesclagem).
+    """
+    hash_escolas = hash_dataframe(df[['NOME ESCOLA']])
+    grupos = grupos_duplicatas(hash_escolas, df['NOME ESCOLA'])
+    if not grupos:
+        return df
+
+    chave_sessao = f'mesclagem_{tipo}'
+    prefixo = f'{tipo}_{hash_escolas[:8]}'
+    aplicado = st.session_state.get(chave_sessao)
+    if aplicado and aplicado[0] == hash_escolas:
+        mapeamento = aplicado[1]
+    else:
+        mapeamento = {
+            outro: grupo[0]
+            for grupo in grupos[:MAX_GRUPOS_EXIBIDOS] if duplicatas_certas(grupo)
+            for outro in grupo[1:]
+        }
+
+    with st.expander(f"🔍 {len(grupos)} grupo(s) de escolas com nomes parecidos", expanded=aplicado is None):
+        st.caption("Marque os grupos que são a mesma escola e escolha o nome que vai nas etiquetas.")
+        if len(grupos) > MAX_GRUPOS_EXIBIDOS:
+            st.warning(f"⚠️ Mostrando só os primeiros {MAX_GRUPOS_EXIBIDOS} grupos.")
+        with st.form(f'form_duplicatas_{prefixo}'):
+            escolhas = []
+            for i, grupo in enumerate(grupos[:MAX_GRUPOS_EXIBIDOS]):
+                col1, col2 = st.columns([1, 4])
+                with col1:
+                    mesclar = st.checkbox("Mesclar", value=duplicatas_certas(grupo), key=f'mesclar_{prefixo}_{i}')
+                with col2:
+                    nome = st.selectbox(" | ".join(map(str, grupo)), grupo, key=f'nome_{prefixo}_{i}')
+                escolhas.append((mesclar, nome, grupo))
+            if st.form_submit_button("✅ Aplicar mesclagens"):
+                mapeamento = {
+                    outro: nome
+                    for mesclar, nome, grupo in escolhas if mesclar
+                    for outro in grupo if outro != nome
+                }
+                st.session_state[chave_sessao] = (hash_escolas, mapeamento)
+
+    if mapeamento:
+        st.caption(f"🔗 {len(mapeamento)} nome(s) de escola mesclado(s).")
+    return mesclar_escolas(df, mapeamento)
@@ -0,0 +1,214 @@
+import io
+
+import pandas as pd
+import streamlit as st
+
+from arquivos_pdf import PDFTemporario
+from etiquetas_correcoes import cache_normalizacao, versao_correcoes
+from etiquetas_duplicatas import revisar_duplicatas
+from etiquetas_lote import interface_lote
+from etiquetas_previa import mostrar_previa
+from etiquetas_tarefas import gerar_sob_demanda
+from gerar_lote import TIPOS
+from processamento import calcular_hash, dividir_em_envelopes, hash_dataframe, ler_planilha
+from renderizacao import DPI_LOGO, LAYOUTS, QUALIDADE_LOGO
+from renderizacao_incremental import CachePaginas, escolas_alteradas
+from renderizacao_zpl import FORMATOS_SAIDA, RESOLUCOES_ZPL
+
+# Por variante da interface: tipo de planilha (ver gerar_lote.TIPOS) e nome dos arquivos gerados
+VARIANTES = {
+    'nao_adaptadas': ('nao-adaptadas', 'etiquetas'),
+    'adaptadas': ('adaptadas', 'etiquetas_adaptadas'),
+}
+
+@st.cache_data
+def convert_df(df: pd.DataFrame):
+    return df.to_csv(index=False).encode('utf-8')
+
+# Quantidade máxima de planilhas mantidas em cache entre as reexecuções do Streamlit
+MAX_ENTRADAS_CACHE = 16
+
+@st.cache_data(max_entries=MAX_ENTRADAS_CACHE, show_spinner=False)
+def processar_planilha_cache(variante, hash_planilha, nome_arquivo, versao_correcoes, _conteudo):
+    """Lê (só as colunas usadas) e processa a planilha uma única vez por variante e conteúdo de arquivo.
+
+    Nomes e anos já vistos em outros uploads vêm do cache persistente; "versao_correcoes"
+    faz a planilha ser processada de novo quando uma correção manual muda.
+    """
+    detectar, processar, _ = TIPOS[VARIANTES[variante][0]]
+    df = ler_planilha(io.BytesIO(_conteudo), nome_arquivo, detectar)
+    return processar(df, cache=cache_normalizacao())
+
+@st.cache_resource(show_spinner=False)
+def cache_paginas():
+    """Páginas já renderizadas, compartilhadas entre as sessões e reaproveitadas ao recarregar a planilha
+    (as duas variantes usam o mesmo cache: o modelo de conteúdo faz parte da chave de cada página)"""
+    return CachePaginas()
+
+def gerar_pdf(variante, tabela, logo_bytes, championship, stage, layout, capacidade_envelope, qualidade_logo, cache,
+              progresso=None):
+    """Gera o PDF (executado em segundo plano pela fila de tarefas). Retorna (pdf, relatorio).
+
+    O PDF fica em um arquivo temporário limitado em memória (vai para o disco quando cresce),
+    compartilhado entre as sessões. Só as páginas que mudaram desde PDFs anteriores são renderizadas.
+    """
+    criacao = TIPOS[VARIANTES[variante][0]][2]
+    return criacao.gerar_etiquetas_incremental(tabela, io.BytesIO(logo_bytes), championship, stage, cache,
+                                               destino=PDFTemporario(), layout=LAYOUTS[layout], progresso=progresso,
+                                               capacidade_envelope=capacidade_envelope, qualidade_logo=qualidade_logo)
+
+def gerar_zpl(variante, tabela, logo_bytes, championship, stage, layout, capacidade_envelope, dpi, progresso=None):
+    """Gera o arquivo ZPL para impressoras térmicas (em segundo plano, como o PDF)"""
+    criacao = TIPOS[VARIANTES[variante][0]][2]
+    return criacao.gerar_etiquetas_zpl(tabela, io.BytesIO(logo_bytes), championship, stage, destino=PDFTemporario(),
+                                       layout=LAYOUTS[layout], progresso=progresso,
+                                       capacidade_envelope=capacidade_envelope, dpi=dpi)
+
+def mostrar_alteracoes(variante, relatorio):
+    """Informa as páginas reaproveitadas e as escolas alteradas desde a última planilha da sessão"""
+    renderizadas = relatorio['paginas_renderizadas']
+    total = relatorio['total_paginas']
+    anteriores = st.session_state.get(f'assinaturas_{variante}')
+    if anteriores is not None and anteriores != relatorio['assinaturas']:
+        alteradas = escolas_alteradas(anteriores, relatorio['assinaturas'])
+        st.info(f"🔄 {len(alteradas)} escola(s) alterada(s) desde a última planilha. "
+                f"{len(renderizadas)} de {total} página(s) renderizada(s) novamente.")
+        with st.expander("Ver escolas e páginas alteradas"):
+            st.markdown("**Escolas:** " + ", ".join(map(str, alteradas)))
+            st.markdown("**Páginas:** " + (", ".join(str(p + 1) for p in renderizadas) or "nenhuma"))
+    elif len(renderizadas) < total:
+        st.caption(f"♻️ {total - len(renderizadas)} de {total} página(s) reaproveitada(s) de PDFs anteriores.")
+    st.session_state[f'assinaturas_{variante}'] = relatorio['assinaturas']
+
+def interface_geracao(variante, arquivos):
+    """Parte comum das interfaces de provas adaptadas e não adaptadas ("variante"): processa a planilha
+    carregada (ou passa o lote para interface_lote), mostra o resumo e gera o PDF ou o ZPL"""
+    tipo, nome_arquivos = VARIANTES[variante]
+    if len(arquivos) > 1 or any(a.name.lower().endswith('.zip') for a in arquivos):
+        interface_lote(tipo, arquivos)
+        return
+    if not arquivos:
+        return
+    uploaded_file = arquivos[0]
+
+    try:
+        # Carregar arquivo, detectar colunas, padronizar anos e limpar nomes
+        # (em cache pelo conteúdo do arquivo, para não reprocessar a cada tecla digitada)
+        conteudo = uploaded_file.getvalue()
+        df_processado, erro = processar_planilha_cache(
+            variante, calcular_hash(conteudo), uploaded_file.name, versao_correcoes(cache_normalizacao()), conteudo
+        )
+
+        if erro:
+            st.error(f"❌ {erro}")
+            st.info("💡 Verifique se sua planilha contém uma coluna com nome da escola")
+            st.stop()
+
+        # Verificar se há dados válidos
+        if df_processado.empty:
+            st.warning("⚠️ Não foram encontrados dados válidos na planilha!")
+            st.stop()
+
+        # Nomes parecidos da mesma escola (ex.: "PEIXE BOI" e "PEIXE-BOI")
+        df_processado = revisar_duplicatas(df_processado, variante)
+
+        # Mostrar resumo dos dados processados
+        st.markdown("### 📊 Resumo dos Dados Processados:")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("🏫 Escolas", df_processado['NOME ESCOLA'].nunique())
+        with col2:
+            st.metric("📚 Turmas/Anos", df_processado['ANO ESCOLAR'].nunique())
+        with col3:
+            st.metric("👥 Total Alunos", df_processado['TOTAL'].sum())
+
+        st.markdown("### 📋 Dados Processados:")
+        st.dataframe(df_processado, use_container_width=True, hide_index=True)
+
+        st.download_button(
+            "📥 Baixar Planilha Tratada (CSV)",
+            convert_df(df_processado),
+            "dados_processados.csv",
+            "text/csv"
+        )
+
+        # Seção para gerar PDF
+        st.markdown("### 🏷️ Gerar Etiquetas (PDF ou ZPL)")
+        logo_file = st.file_uploader("Carregar logo (JPEG)", type=["jpg", "jpeg"])
+        championship = st.text_input("Nome do Campeonato/Prova").upper()
+        stage = st.text_input("Etapa/Fase").upper()
+        layout = st.selectbox(
+            "Folha de etiquetas", list(LAYOUTS),
+            format_func=lambda chave: LAYOUTS[chave].descricao
+        )
+        capacidade_envelope = st.number_input(
+            "Provas por envelope (0 = uma etiqueta por linha)", min_value=0, value=0, step=1,
+            help="Turmas maiores que a capacidade recebem uma etiqueta por envelope, com 'ENVELOPE k/n'."
+        )
+        if capacidade_envelope:
+            st.caption(f"✉️ {len(dividir_em_envelopes(df_processado, capacidade_envelope))} etiquetas "
+                       f"(uma por envelope de até {capacidade_envelope} provas)")
+        formato = st.radio(
+            "Formato de saída", list(FORMATOS_SAIDA), format_func=FORMATOS_SAIDA.get, horizontal=True,
+            help="ZPL: arquivo de comandos para impressoras térmicas (Zebra), uma etiqueta do rolo por "
+                 "etiqueta, no tamanho das etiquetas da folha escolhida acima."
+        )
+        if formato == 'zpl':
+            dpi_zpl = st.selectbox("Resolução da impressora (dpi)", RESOLUCOES_ZPL)
+        else:
+            qualidade_logo = st.slider(
+                "Qualidade da logo (JPEG)", min_value=50, max_value=95, value=QUALIDADE_LOGO, step=5,
+                help=f"A logo é reduzida para a resolução de impressão ({DPI_LOGO} dpi) da etiqueta antes de entrar no PDF."
+            )
+
+        if logo_file and championship and stage:
+            try:
+                logo_bytes = logo_file.getvalue()
+                if formato == 'zpl':
+                    # Sem prévia: o arquivo é gerado rápido e só a impressora mostra o resultado
+                    chave = (variante, hash_dataframe(df_processado), calcular_hash(logo_bytes), championship, stage,
+                             layout, capacidade_envelope, dpi_zpl)
+                    arquivo = gerar_sob_demanda(
+                        f'tarefa_zpl_{variante}', chave, gerar_zpl,
+                        variante, df_processado, logo_bytes, championship, stage, layout, capacidade_envelope,
+                        dpi_zpl, rotulo="🏷️ Gerar arquivo ZPL"
+                    )
+                    if arquivo is not None:
+                        st.download_button(
+                            "📥 Baixar arquivo ZPL",
+                            data=arquivo.ler,
+                            file_name=f'{nome_arquivos}.zpl',
+                            mime='text/plain'
+                        )
+                else:
+                    chave = (variante, hash_dataframe(df_processado), calcular_hash(logo_bytes), championship, stage,
+                             layout, capacidade_envelope, qualidade_logo)
+                    # Prévia rápida (só as etiquetas da primeira página) para conferir a disposição
+                    mostrar_previa(chave, TIPOS[tipo][2].gerar_etiquetas, df_processado, logo_bytes, championship,
+                                   stage, LAYOUTS[layout], capacidade_envelope, qualidade_logo)
+                    # Gerado em segundo plano e só quando pedido: a página continua respondendo e
+                    # o resultado é reaproveitado por qualquer sessão com os mesmos dados
+                    resultado = gerar_sob_demanda(
+                        f'tarefa_pdf_{variante}', chave, gerar_pdf,
+                        variante, df_processado, logo_bytes, championship, stage, layout, capacidade_envelope,
+                        qualidade_logo, cache_paginas()
+                    )
+                    if resultado is not None:
+                        pdf, relatorio = resultado
+                        mostrar_alteracoes(variante, relatorio)
+                        tamanho_original, tamanho_final = relatorio['logo']
+                        if tamanho_final < tamanho_original:
+                            st.caption(f"🖼️ Logo reduzida para a resolução de impressão: "
+                                       f"{tamanho_original / 1024:.0f} KB → {tamanho_final / 1024:.0f} KB")
+                        st.download_button(
+                            "📥 Baixar PDF das Etiquetas",
+                            data=pdf.ler,  # lido só quando o usuário clica em baixar
+                            file_name=f'{nome_arquivos}.pdf',
+                            mime='application/pdf'
+                        )
+            except Exception as e:
+                st.error(f"❌ Erro ao gerar PDF: {str(e)}")
+
+    except Exception as e:
+        st.error(f"❌ Erro ao processar planilha: {str(e)}")
+        st.info("💡 Verifique se o arquivo está no formato correto e tente novamente.")
@@ -0,0 +1,104 @@
+import os
+import tempfile
+
+import pandas as pd
+import streamlit as st
+
+from arquivos_pdf import PDFTemporario
+from etiquetas_correcoes import cache_normalizacao
+from gerar_lote import compactar_resultados, extrair_planilhas, processar_lote
+from processamento import calcular_hash
+from renderizacao import LAYOUTS
+
+# Quantidade máxima de planilhas processadas ao mesmo tempo (um processo por planilha)
+MAX_PROCESSOS_LOTE = 4
+
+def resumo_lote(resultados):
+    """Tabela com a situação de cada planilha do lote"""
+    return pd.DataFrame([
+        {
+            "Arquivo": os.path.basename(r['arquivo']),
+            "Escolas": r['escolas'],
+            "Etiquetas": r['etiquetas'],
+            "Segundos": r['segundos'],
+            "Situação": f"❌ {r['erro']}" if r['erro'] else "✅ OK",
+        }
+        for r in resultados
+    ])
+
+def interface_lote(tipo, arquivos):
+    """Gera as etiquetas de várias planilhas (ou de um ZIP) com a mesma logo, campeonato e etapa,
+    e devolve um único ZIP com os PDFs e as planilhas tratadas"""
+    st.markdown("### 📦 Várias planilhas")
+    st.write(f"{len(arquivos)} arquivo(s) carregado(s). Cada planilha gera um PDF e um CSV tratado.")
+
+    logo_file = st.file_uploader("Carregar logo (JPEG)", type=["jpg", "jpeg"], key=f"logo_lote_{tipo}")
+    championship = st.text_input("Nome do Campeonato/Prova", key=f"campeonato_lote_{tipo}").upper()
+    stage = st.text_input("Etapa/Fase", key=f"etapa_lote_{tipo}").upper()
+    layout = st.selectbox(
+        "Folha de etiquetas", list(LAYOUTS),
+        format_func=lambda chave: LAYOUTS[chave].descricao, key=f"layout_lote_{tipo}"
+    )
+
+    # O ZIP gerado fica na sessão enquanto os arquivos e os dados das etiquetas não mudarem. O
+    # conteúdo das planilhas é identificado pelo hash calculado na cópia (ver extrair_planilhas),
+    # guardado pelo file_id de cada upload; uploads ainda não copiados não têm hash
+    chave_sessao = f"lote_{tipo}"
+    hashes_por_upload = st.session_state[chave_sessao][3] if chave_sessao in st.session_state else {}
+    logo_hash = logo_file and calcular_hash(logo_file.getvalue())
+
+    def assinatura_lote():
+        return (tuple((a.name, hashes_por_upload.get(a.file_id)) for a in arquivos), logo_hash, championship,
+                stage, layout)
+
+    pronto = bool(logo_file and championship and stage)
+    if st.button("🏷️ Gerar etiquetas de todas as planilhas", disabled=not pronto, key=f"gerar_lote_{tipo}"):
+        with tempfile.TemporaryDirectory() as pasta:
+            pasta_entrada = os.path.join(pasta, 'planilhas')
+            pasta_saida = os.path.join(pasta, 'etiquetas')
+            os.makedirs(pasta_entrada)
+            os.makedirs(pasta_saida)
+
+            hashes = []
+            planilhas = extrair_planilhas(((a.name, a) for a in arquivos), pasta_entrada, hashes)
+            hashes_por_upload = {a.file_id: h for a, h in zip(arquivos, hashes)}
+            if not planilhas:
+                st.warning("⚠️ Nenhuma planilha CSV/XLSX encontrada nos arquivos enviados!")
+                return
+
+            barra = st.progress(0.0, text=f"0/{len(planilhas)} planilhas processadas")
+            tabela = st.empty()
+            resultados = []
+            workers = min(MAX_PROCESSOS_LOTE, os.cpu_count() or 1)
+            # Cada processo abre o mesmo arquivo do cache de nomes/anos (e das correções manuais)
+            cache = cache_normalizacao()
+            for resultado in processar_lote(planilhas, tipo, logo_file.getvalue(), championship, stage, pasta_saida,
+                                            workers, layout=layout, salvar_csv=True,
+                                            caminho_cache=cache and cache.caminho):
+                resultados.append(resultado)
+                barra.progress(len(resultados) / len(planilhas),
+                               text=f"{len(resultados)}/{len(planilhas)} planilhas processadas")
+                tabela.dataframe(resumo_lote(resultados), hide_index=True, use_container_width=True)
+            barra.empty()
+            tabela.empty()
+
+            # O ZIP é montado a partir dos arquivos em disco, direto em um arquivo temporário
+            resultados.sort(key=lambda r: r['arquivo'])
+            arquivo_zip = compactar_resultados(resultados, PDFTemporario())
+        st.session_state[chave_sessao] = (assinatura_lote(), arquivo_zip, resumo_lote(resultados), hashes_por_upload)
+
+    if chave_sessao in st.session_state and st.session_state[chave_sessao][0] == assinatura_lote():
+        _, arquivo_zip, resumo, _ = st.session_state[chave_sessao]
+        falhas = int(resumo["Situação"].str.startswith("❌").sum())
+        if falhas:
+            st.error(f"❌ {falhas} de {len(resumo)} planilha(s) com erro (detalhes na tabela e no relatorio.csv).")
+        else:
+            st.success(f"{len(resumo)} planilha(s) processada(s) com sucesso!")
+        st.dataframe(resumo, hide_index=True, use_container_width=True)
+        st.download_button(
+            "📥 Baixar ZIP (PDFs e planilhas tratadas)",
+            data=arquivo_zip.ler,
+            file_name='etiquetas_lote.zip',
+            mime='application/zip',
+            key=f"baixar_lote_{tipo}"
+        )
@@ -0,0 +1,26 @@
+import io
+
+import streamlit as st
+
+from previa import gerar_previa
+
+@st.cache_data(max_entries=16, show_spinner="Gerando prévia da primeira página...")
+def previa_cache(chave, _gerar_etiquetas, _tabela, _logo_bytes, championship, stage, _layout, capacidade_envelope,
+                 qualidade_logo):
+    """Prévia (pdf, png) calculada uma vez por tabela/logo/campeonato/etapa/folha (todos na chave)"""
+    return gerar_previa(_gerar_etiquetas, _tabela, io.BytesIO(_logo_bytes), championship, stage, layout=_layout,
+                        capacidade_envelope=capacidade_envelope, qualidade_logo=qualidade_logo)
+
+def mostrar_previa(chave, gerar_etiquetas, tabela, logo_bytes, championship, stage, layout, capacidade_envelope,
+                   qualidade_logo):
+    """Mostra a primeira página renderizada (só as etiquetas dela), para conferir a disposição
+    antes de gerar o documento inteiro"""
+    pdf, png = previa_cache(chave, gerar_etiquetas, tabela, logo_bytes, championship, stage, layout,
+                            capacidade_envelope, qualidade_logo)
+    st.markdown("#### 👀 Prévia da primeira página")
+    if png is not None:
+        st.image(png, width=450)
+    else:
+        st.download_button("📄 Baixar prévia da primeira página (PDF)", pdf, "previa_etiquetas.pdf",
+                           "application/pdf", key=f"previa_{chave[0]}")
+        st.caption("Instale o pacote opcional pymupdf para ver a prévia direto na tela.")
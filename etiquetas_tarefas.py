@@ -0,0 +1,97 @@
+import uuid
+
+import streamlit as st
+
+from diagnostico import incluir_registros
+from processamento import calcular_hash
+from tarefas_pdf import CANCELADA, CONCLUIDA, ERRO, FilaTarefas
+
+# Intervalo (segundos) entre as atualizações da barra de progresso
+INTERVALO_ATUALIZACAO = 1
+
+@st.cache_resource(show_spinner=False)
+def fila_tarefas():
+    """Fila de geração de PDFs compartilhada entre as sessões (número limitado de threads)"""
+    return FilaTarefas()
+
+def id_sessao():
+    """Identificador desta sessão do navegador, com que ela se inscreve nas tarefas da fila"""
+    if 'id_sessao' not in st.session_state:
+        st.session_state['id_sessao'] = uuid.uuid4().hex
+    return st.session_state['id_sessao']
+
+@st.fragment(run_every=INTERVALO_ATUALIZACAO)
+def painel_progresso(chave_sessao, chave, chave_widget):
+    """Barra de progresso atualizada sozinha; a página inteira só é recarregada quando a tarefa termina"""
+    tarefa = fila_tarefas().obter(chave)
+    if tarefa is None or tarefa.terminada:
+        st.rerun()
+    if tarefa.total:
+        st.progress(tarefa.fracao, text=f"⏳ Gerando etiquetas: {tarefa.feitas} de {tarefa.total}")
+    else:
+        st.progress(0.0, text="⏳ Aguardando na fila...")
+    if st.button("⏹️ Cancelar", key=f"cancelar_{chave_widget}"):
+        # Só esta sessão desiste: a tarefa continua para outras sessões que pediram o mesmo PDF
+        fila_tarefas().sair(chave, id_sessao())
+        st.session_state.pop(chave_sessao, None)
+        st.rerun()
+
+def gerar_em_segundo_plano(chave_sessao, chave, funcao, *args, **kwargs):
+    """Gera o PDF em segundo plano e mostra o andamento.
+
+    A tarefa continua rodando entre as reexecuções do script (interações com outros campos
+    não a reiniciam). Retorna o resultado de "funcao" quando pronto, ou None enquanto a
+    tarefa está na fila, em andamento, cancelada ou com erro.
+    """
+    fila = fila_tarefas()
+    sessao = id_sessao()
+
+    # Se os dados mudaram, esta sessão sai da tarefa anterior (interrompida se ninguém mais a espera)
+    anterior = st.session_state.get(chave_sessao)
+    if anterior is not None and anterior != chave:
+        fila.sair(anterior, sessao)
+    st.session_state[chave_sessao] = chave
+
+    tarefa = fila.enviar(sessao, chave, funcao, *args, **kwargs)
+    chave_widget = calcular_hash(repr(chave).encode('utf-8'))[:16]
+
+    if tarefa.status == CONCLUIDA:
+        # As etapas da geração em segundo plano entram no painel de diagnóstico uma vez por sessão
+        chave_diagnostico = f"{chave_sessao}_diagnostico"
+        if st.session_state.get(chave_diagnostico) != chave:
+            st.session_state[chave_diagnostico] = chave
+            incluir_registros(tarefa.registros)
+        return tarefa.resultado
+
+    if tarefa.status in (CANCELADA, ERRO):
+        if tarefa.status == CANCELADA:
+            st.warning("⏹️ Geração do PDF cancelada.")
+        else:
+            st.error(f"❌ Erro ao gerar PDF: {tarefa.erro}")
+        if st.button("🔄 Gerar novamente", key=f"reiniciar_{chave_widget}"):
+            fila.descartar(chave)
+            st.rerun()
+        return None
+
+    painel_progresso(chave_sessao, chave, chave_widget)
+    return None
+
+def gerar_sob_demanda(chave_sessao, chave, funcao, *args, rotulo="🏷️ Gerar PDF completo", **kwargs):
+    """Como gerar_em_segundo_plano, mas a geração só começa quando o usuário clica no botão.
+
+    Se outra sessão já gerou o PDF com a mesma chave, o resultado pronto é usado direto.
+    Quando os dados mudam (ou a sessão cancela), ela sai da tarefa anterior e o botão volta a
+    aparecer. Retorna o resultado de "funcao" quando pronto, ou None.
+    """
+    fila = fila_tarefas()
+    anterior = st.session_state.get(chave_sessao)
+    if anterior != chave:
+        if anterior is not None:
+            fila.sair(anterior, id_sessao())
+            del st.session_state[chave_sessao]
+        tarefa = fila.obter(chave)
+        pronta = tarefa is not None and tarefa.status == CONCLUIDA
+        chave_widget = calcular_hash(repr(chave).encode('utf-8'))[:16]
+        if not pronta and not st.button(rotulo, key=f"gerar_{chave_widget}"):
+            return None
+    return gerar_em_segundo_plano(chave_sessao, chave, funcao, *args, **kwargs)
@@ -0,0 +1,256 @@
+"""Geração de etiquetas em lote, sem Streamlit.
+
+Exemplo:
+    python gerar_lote.py planilhas/ --tipo nao-adaptadas --logo logo.jpg \\
+        --campeonato "OLIMPÍADA DE MATEMÁTICA" --etapa "1ª FASE" --saida pdfs/ --workers 4
+
+Com --formato zpl, cada planilha gera um arquivo ZPL para impressoras térmicas em vez do PDF.
+"""
+import argparse
+import csv
+import glob
+import hashlib
+import io
+import os
+import sys
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import criacao_adaptadas
+import criacao_nao_adaptadas
+from cache_normalizacao import CAMINHO_PADRAO, CacheNormalizacao
+from processamento import (
+    detectar_colunas_adaptadas,
+    detectar_colunas_nao_adaptadas,
+    ler_planilha,
+    processar_adaptadas,
+    processar_nao_adaptadas,
+    voltar_ao_inicio,
+)
+from renderizacao import LAYOUTS, QUALIDADE_LOGO
+from renderizacao_paralela import gerar_etiquetas_paralelo
+from renderizacao_zpl import DPI_ZPL, FORMATOS_SAIDA, RESOLUCOES_ZPL
+
+EXTENSOES_ACEITAS = ('.csv', '.xlsx')
+
+# Sufixo do CSV tratado: a saída pode ser a própria pasta das planilhas, e "a.csv" não pode
+# ser sobrescrito pela versão tratada de si mesmo
+SUFIXO_CSV = '_tratada'
+
+# Tamanho dos blocos na cópia das planilhas enviadas
+TAMANHO_BLOCO_COPIA = 1024 * 1024
+
+TIPOS = {
+    'nao-adaptadas': (detectar_colunas_nao_adaptadas, processar_nao_adaptadas, criacao_nao_adaptadas),
+    'adaptadas': (detectar_colunas_adaptadas, processar_adaptadas, criacao_adaptadas),
+}
+
+def listar_planilhas(entrada):
+    """Aceita um diretório ou um padrão glob e retorna as planilhas encontradas"""
+    if os.path.isdir(entrada):
+        caminhos = [os.path.join(entrada, nome) for nome in os.listdir(entrada)]
+    else:
+        caminhos = glob.glob(entrada)
+    return sorted(c for c in caminhos if c.lower().endswith(EXTENSOES_ACEITAS) and os.path.isfile(c))
+
+def nome_disponivel(nome, usados):
+    """Evita que dois arquivos com o mesmo nome base (em pastas diferentes do ZIP, ou .csv e
+    .xlsx) gerem o mesmo PDF. "usados" guarda os nomes já escolhidos, em minúsculas"""
+    base, extensao = os.path.splitext(nome)
+    candidato, n = base, 1
+    while candidato.lower() in usados:
+        n += 1
+        candidato = f"{base}_{n}"
+    usados.add(candidato.lower())
+    return candidato + extensao
+
+def extrair_planilhas(arquivos, pasta, hashes=None):
+    """Grava em "pasta" as planilhas enviadas e as de dentro dos ZIPs, e retorna os caminhos.
+
+    "arquivos" é uma sequência de (nome, arquivo aberto). Os membros dos ZIPs são copiados
+    em blocos (sem carregar o ZIP inteiro) e só o nome do arquivo é usado, sem as pastas.
+    Se "hashes" (lista) for informado, recebe para cada arquivo o SHA-256 das planilhas
+    copiadas dele (nomes e conteúdo), calculado durante a própria cópia.
+    """
+    usados = set()
+    caminhos = []
+
+    def copiar(nome, origem, conteudo):
+        caminho = os.path.join(pasta, nome_disponivel(os.path.basename(nome), usados))
+        conteudo.update(nome.encode('utf-8') + b'\0')
+        with open(caminho, 'wb') as destino:
+            for bloco in iter(lambda: origem.read(TAMANHO_BLOCO_COPIA), b''):
+                conteudo.update(bloco)
+                destino.write(bloco)
+        caminhos.append(caminho)
+
+    for nome, arquivo in arquivos:
+        voltar_ao_inicio(arquivo)
+        conteudo = hashlib.sha256()
+        if nome.lower().endswith('.zip'):
+            with zipfile.ZipFile(arquivo) as zip_entrada:
+                for membro in zip_entrada.infolist():
+                    nome_membro = membro.filename
+                    if (membro.is_dir() or nome_membro.startswith('__MACOSX/')
+                            or os.path.basename(nome_membro).startswith('.')
+                            or not nome_membro.lower().endswith(EXTENSOES_ACEITAS)):
+                        continue
+                    with zip_entrada.open(membro) as origem:
+                        copiar(nome_membro, origem, conteudo)
+        elif nome.lower().endswith(EXTENSOES_ACEITAS):
+            copiar(nome, arquivo, conteudo)
+        if hashes is not None:
+            hashes.append(conteudo.hexdigest())
+    return caminhos
+
+def processar_arquivo(caminho, tipo, logo_bytes, campeonato, etapa, pasta_saida, workers_pdf=1, layout='padrao',
+                      salvar_csv=False, caminho_cache=None, qualidade_logo=QUALIDADE_LOGO, formato='pdf',
+                      dpi_zpl=DPI_ZPL, nome_saida=None):
+    """Processa uma planilha e grava o PDF (e, opcionalmente, o CSV tratado). Executado nos workers.
+
+    "caminho_cache" é o arquivo do cache persistente de nomes/anos (None = sem cache).
+    Com formato='zpl' é gravado um arquivo ZPL (campo 'pdf' do resultado) no lugar do PDF.
+    "nome_saida" é o nome (sem extensão) dos arquivos gravados; o padrão é o nome da planilha.
+    O CSV tratado é gravado como "<nome>_tratada.csv", para não sobrescrever a planilha de entrada.
+    """
+    detectar, processar, criacao = TIPOS[tipo]
+    inicio = time.perf_counter()
+    resultado = {'arquivo': caminho, 'pdf': '', 'csv': '', 'escolas': 0, 'etiquetas': 0, 'erro': ''}
+
+    try:
+        cache = CacheNormalizacao(caminho_cache) if caminho_cache else None
+        df, erro = processar(ler_planilha(caminho, caminho, detectar), cache=cache)
+        if erro:
+            resultado['erro'] = erro
+        elif df.empty:
+            resultado['erro'] = "Não há dados válidos na planilha!"
+        else:
+            nome_base = nome_saida or os.path.splitext(os.path.basename(caminho))[0]
+            caminho_pdf = os.path.join(pasta_saida, f"{nome_base}.{formato}")
+            # O PDF é gravado direto no arquivo de saída, sem cópia intermediária em bytes
+            with open(caminho_pdf, 'wb') as f:
+                if formato == 'zpl':
+                    criacao.gerar_etiquetas_zpl(df, io.BytesIO(logo_bytes), campeonato, etapa, destino=f,
+                                                layout=LAYOUTS[layout], dpi=dpi_zpl)
+                else:
+                    gerar_etiquetas_paralelo(
+                        criacao.gerar_etiquetas, df, io.BytesIO(logo_bytes), campeonato, etapa,
+                        workers=workers_pdf, layout=LAYOUTS[layout], destino=f, qualidade_logo=qualidade_logo
+                    )
+            if salvar_csv:
+                resultado['csv'] = os.path.join(pasta_saida, f"{nome_base}{SUFIXO_CSV}.csv")
+                df.to_csv(resultado['csv'], index=False)
+            resultado.update(pdf=caminho_pdf, escolas=df['NOME ESCOLA'].nunique(), etiquetas=len(df))
+    except Exception as e:
+        resultado['erro'] = str(e)
+
+    resultado['segundos'] = round(time.perf_counter() - inicio, 3)
+    return resultado
+
+def processar_lote(planilhas, tipo, logo_bytes, campeonato, etapa, pasta_saida, workers, workers_pdf=1,
+                   layout='padrao', salvar_csv=False, caminho_cache=None, qualidade_logo=QUALIDADE_LOGO,
+                   formato='pdf', dpi_zpl=DPI_ZPL):
+    """Processa as planilhas em até "workers" processos e gera os resultados à medida que ficam prontos"""
+    # Nomes de saída escolhidos antes de enviar as planilhas: "a.csv" e "a.xlsx" geram "a" e "a_2"
+    usados = set()
+    nomes_saida = [
+        os.path.splitext(nome_disponivel(f"{os.path.splitext(os.path.basename(caminho))[0]}.{formato}", usados))[0]
+        for caminho in planilhas
+    ]
+    with ProcessPoolExecutor(max_workers=max(1, min(workers, len(planilhas)))) as executor:
+        futuros = [
+            executor.submit(processar_arquivo, caminho, tipo, logo_bytes, campeonato, etapa, pasta_saida,
+                            workers_pdf, layout, salvar_csv, caminho_cache, qualidade_logo, formato, dpi_zpl,
+                            nome_saida)
+            for caminho, nome_saida in zip(planilhas, nomes_saida)
+        ]
+        for futuro in as_completed(futuros):
+            yield futuro.result()
+
+def gravar_relatorio(resultados, destino):
+    """Grava o resumo do lote em CSV (em um caminho ou em um arquivo de texto aberto)"""
+    campos = ['arquivo', 'pdf', 'csv', 'escolas', 'etiquetas', 'segundos', 'erro']
+    if isinstance(destino, str):
+        with open(destino, 'w', newline='', encoding='utf-8') as f:
+            gravar_relatorio(resultados, f)
+        return
+    writer = csv.DictWriter(destino, fieldnames=campos)
+    writer.writeheader()
+    writer.writerows(resultados)
+
+def compactar_resultados(resultados, destino):
+    """Grava em "destino" um ZIP com os PDFs, os CSVs tratados e o relatório do lote.
+
+    Os arquivos são copiados do disco em blocos; "destino" só precisa de write (ex.:
+    PDFTemporario), então o ZIP também nunca fica inteiro na memória.
+    """
+    with zipfile.ZipFile(destino, 'w', compression=zipfile.ZIP_DEFLATED) as zip_saida:
+        for resultado in resultados:
+            for chave in ('pdf', 'csv'):
+                if resultado.get(chave):
+                    zip_saida.write(resultado[chave], os.path.basename(resultado[chave]))
+        relatorio = io.StringIO()
+        gravar_relatorio(
+            [{**r, 'arquivo': os.path.basename(r['arquivo']), 'pdf': os.path.basename(r['pdf']),
+              'csv': os.path.basename(r.get('csv', ''))} for r in resultados],
+            relatorio
+        )
+        zip_saida.writestr('relatorio.csv', relatorio.getvalue())
+    return destino
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera um PDF de etiquetas para cada planilha de uma pasta.")
+    parser.add_argument('entrada', help="Pasta com planilhas CSV/XLSX ou padrão glob (ex.: 'dados/*.csv')")
+    parser.add_argument('--tipo', choices=sorted(TIPOS), default='nao-adaptadas', help="Tipo de etiqueta")
+    parser.add_argument('--logo', required=True, help="Imagem da logo (JPEG)")
+    parser.add_argument('--campeonato', required=True, help="Nome do campeonato/prova")
+    parser.add_argument('--etapa', required=True, help="Etapa/fase")
+    parser.add_argument('--layout', choices=list(LAYOUTS), default='padrao',
+                        help="Folha de etiquetas: " + "; ".join(f"{k} = {v.descricao}" for k, v in LAYOUTS.items()))
+    parser.add_argument('--saida', default='etiquetas_pdf', help="Pasta onde os PDFs serão gravados")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Número de processos")
+    parser.add_argument('--workers-pdf', type=int, default=1,
+                        help="Processos por PDF (divide planilhas muito grandes em lotes de páginas)")
+    parser.add_argument('--csv', action='store_true',
+                        help=f"Grava também a planilha tratada de cada arquivo (<nome>{SUFIXO_CSV}.csv)")
+    parser.add_argument('--qualidade-logo', type=int, default=QUALIDADE_LOGO,
+                        help="Qualidade JPEG (1 a 95) da logo reduzida para a resolução de impressão")
+    parser.add_argument('--formato', choices=list(FORMATOS_SAIDA), default='pdf',
+                        help="Formato de saída: " + "; ".join(f"{k} = {v}" for k, v in FORMATOS_SAIDA.items()))
+    parser.add_argument('--dpi-zpl', type=int, choices=RESOLUCOES_ZPL, default=DPI_ZPL,
+                        help="Resolução da impressora térmica (só com --formato zpl)")
+    parser.add_argument('--cache-nomes', nargs='?', const=CAMINHO_PADRAO, default=None, metavar='ARQUIVO',
+                        help="Usa o cache persistente de nomes/anos padronizados (e as correções manuais) "
+                             f"[padrão: {CAMINHO_PADRAO}]")
+    args = parser.parse_args(argv)
+
+    planilhas = listar_planilhas(args.entrada)
+    if not planilhas:
+        print(f"Nenhuma planilha encontrada em {args.entrada}", file=sys.stderr)
+        return 1
+
+    with open(args.logo, 'rb') as f:
+        logo_bytes = f.read()
+    os.makedirs(args.saida, exist_ok=True)
+    campeonato = args.campeonato.upper()
+    etapa = args.etapa.upper()
+
+    resultados = []
+    for resultado in processar_lote(planilhas, args.tipo, logo_bytes, campeonato, etapa, args.saida, args.workers,
+                                    args.workers_pdf, args.layout, args.csv, args.cache_nomes,
+                                    args.qualidade_logo, args.formato, args.dpi_zpl):
+        resultados.append(resultado)
+        status = f"ERRO: {resultado['erro']}" if resultado['erro'] else f"{resultado['etiquetas']} etiquetas"
+        print(f"[{len(resultados)}/{len(planilhas)}] {resultado['arquivo']}: {status}")
+
+    resultados.sort(key=lambda r: r['arquivo'])
+    caminho_relatorio = os.path.join(args.saida, 'relatorio.csv')
+    gravar_relatorio(resultados, caminho_relatorio)
+
+    falhas = sum(1 for r in resultados if r['erro'])
+    print(f"{len(resultados) - falhas} arquivos {args.formato.upper()} gerados, {falhas} com erro. Relatório: {caminho_relatorio}")
+    return 1 if falhas else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,41 @@
+import importlib.util
+import io
+
+from processamento import dividir_em_envelopes
+from renderizacao import LAYOUT_PADRAO
+
+# PyMuPDF é opcional (pip install pymupdf): com ele a prévia aparece como imagem na tela;
+# sem ele, é oferecida para baixar como PDF de uma página
+PYMUPDF_DISPONIVEL = importlib.util.find_spec('pymupdf') is not None
+
+# Resolução da imagem da prévia (suficiente para conferir a disposição na tela)
+DPI_PREVIA = 100
+
+
+def etiquetas_primeira_pagina(tabela, layout=None, capacidade_envelope=None):
+    """Etiquetas que ocupam a primeira página (já divididas em envelopes, se for o caso).
+
+    Cada linha gera ao menos uma etiqueta, então só as primeiras linhas precisam ser divididas.
+    """
+    por_pagina = (layout or LAYOUT_PADRAO).etiquetas_por_pagina
+    return dividir_em_envelopes(tabela.head(por_pagina), capacidade_envelope).head(por_pagina)
+
+def pagina_png(pdf, dpi=DPI_PREVIA):
+    """Primeira página do PDF como PNG, ou None se o PyMuPDF não estiver instalado"""
+    if not PYMUPDF_DISPONIVEL:
+        return None
+    import pymupdf
+
+    with pymupdf.open(stream=pdf, filetype='pdf') as documento:
+        return documento[0].get_pixmap(dpi=dpi).tobytes('png')
+
+def gerar_previa(gerar_etiquetas, tabela, logo, championship, stage, layout=None, capacidade_envelope=None,
+                 **kwargs):
+    """(pdf, png) só com as etiquetas da primeira página; png é None sem o PyMuPDF.
+
+    "gerar_etiquetas" é a função de criacao_adaptadas ou criacao_nao_adaptadas; os demais
+    argumentos são repassados a ela (ex.: qualidade_logo).
+    """
+    primeira = etiquetas_primeira_pagina(tabela, layout, capacidade_envelope)
+    pdf = gerar_etiquetas(primeira, io.BytesIO(logo.getvalue()), championship, stage, layout=layout, **kwargs)
+    return pdf, pagina_png(pdf)
@@ -0,0 +1,593 @@
+import numpy as np
+import pandas as pd
+import hashlib
+import importlib.util
+import re
+from pandas.io.parsers import TextParser
+
+from diagnostico import etapa
+
+
+# Motor de leitura de CSV do pyarrow (multithread), usado quando o pacote está instalado
+PYARROW_DISPONIVEL = importlib.util.find_spec('pyarrow') is not None
+
+
+def voltar_ao_inicio(arquivo):
+    """Permite ler de novo um arquivo carregado (os caminhos são apenas reabertos)"""
+    if hasattr(arquivo, 'seek'):
+        arquivo.seek(0)
+
+def colunas_usadas(colunas, detectar):
+    """Posições das colunas que a detecção usa, a partir apenas dos nomes do cabeçalho.
+
+    Retorna (posições, posição da coluna da escola) ou (None, None) se a detecção falhar;
+    nesse caso a planilha é lida inteira e o erro aparece no processamento.
+    """
+    cabecalho = pd.DataFrame(columns=list(colunas))
+    mapeamento, erro = detectar(cabecalho)  # pode renomear as colunas (ex.: maiúsculas)
+    if erro:
+        return None, None
+    posicoes = [i for i, col in enumerate(cabecalho.columns) if col in mapeamento]
+    escola = next(i for i in posicoes if mapeamento[cabecalho.columns[i]] == 'NOME ESCOLA')
+    return posicoes, escola
+
+def valor_celula(valor):
+    """Mesma conversão do leitor openpyxl do pandas: vazio vira "" e número inteiro vira int"""
+    if valor is None:
+        return ""
+    if isinstance(valor, float) and valor.is_integer():
+        return int(valor)
+    return valor
+
+def ler_csv_colunas(arquivo, detectar):
+    """Lê o cabeçalho, detecta as colunas e carrega só as usadas (com o motor do pyarrow, se houver)"""
+    colunas = pd.read_csv(arquivo, nrows=0).columns
+    voltar_ao_inicio(arquivo)
+    posicoes, escola = colunas_usadas(colunas, detectar)
+    if posicoes is None:
+        return pd.read_csv(arquivo)
+
+    # O nome da escola é sempre texto; as quantidades são convertidas depois (aceitam texto)
+    opcoes = {'usecols': posicoes, 'dtype': {colunas[escola]: str}}
+    if PYARROW_DISPONIVEL:
+        try:
+            return pd.read_csv(arquivo, engine='pyarrow', **opcoes)
+        except Exception:
+            # Cabeçalhos repetidos, linhas irregulares...: o motor padrão do pandas é mais tolerante
+            voltar_ao_inicio(arquivo)
+    return pd.read_csv(arquivo, **opcoes)
+
+def ler_xlsx_colunas(arquivo, detectar):
+    """Lê um XLSX linha a linha (openpyxl em modo somente leitura), guardando só as colunas usadas.
+
+    O pd.read_excel monta a lista com todas as células da planilha antes de escolher as
+    colunas; aqui as demais são descartadas enquanto as linhas são lidas.
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(arquivo, read_only=True, data_only=True, keep_links=False)
+    try:
+        linhas = workbook.worksheets[0].iter_rows(values_only=True)
+        cabecalho = [valor_celula(v) for v in next(linhas, ())]
+        while cabecalho and cabecalho[-1] == "":
+            cabecalho.pop()
+        if not cabecalho:
+            return pd.DataFrame()
+
+        # Mesmos nomes do pd.read_excel ("Unnamed: 3", colunas repetidas com ".1"...)
+        colunas = TextParser([cabecalho], header=0).read().columns
+        posicoes, escola = colunas_usadas(colunas, detectar)
+        if posicoes is None:
+            posicoes, dtype = range(len(colunas)), None
+        else:
+            dtype = {colunas[escola]: str}
+
+        dados = [[valor_celula(linha[i]) if i < len(linha) else "" for i in posicoes] for linha in linhas]
+        while dados and all(v == "" for v in dados[-1]):
+            dados.pop()
+        return TextParser(dados, names=[colunas[i] for i in posicoes], header=None, dtype=dtype).read()
+    finally:
+        workbook.close()
+
+def ler_planilha(arquivo, nome_arquivo, detectar=None):
+    """Lê uma planilha CSV ou Excel a partir de um caminho ou arquivo carregado.
+
+    Com "detectar" (detectar_colunas_nao_adaptadas ou detectar_colunas_adaptadas), a
+    detecção roda só sobre o cabeçalho e apenas as colunas usadas são carregadas; as
+    colunas de texto livre dos formulários nem chegam a ser convertidas.
+    """
+    nome = str(nome_arquivo).lower()
+    with etapa('leitura') as dados:
+        if detectar is not None and nome.endswith('.csv'):
+            df = ler_csv_colunas(arquivo, detectar)
+        elif detectar is not None and nome.endswith('.xlsx'):
+            df = ler_xlsx_colunas(arquivo, detectar)
+        elif nome.endswith('.csv'):
+            df = pd.read_csv(arquivo)
+        else:
+            df = pd.read_excel(arquivo)
+        dados['linhas'] = len(df)
+    return df
+
+def calcular_hash(conteudo):
+    """Hash do conteúdo de um arquivo, usado como chave dos caches"""
+    return hashlib.sha256(conteudo).hexdigest()
+
+def hash_dataframe(df):
+    """Hash estável do conteúdo de um DataFrame (ignora o índice)"""
+    return calcular_hash(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+
+# Códigos INEP em qualquer formato: (INEP: 123), (INEP 123), INEP: 123, INEP 123
+PADRAO_INEP = re.compile(r"\(?\bINEP:?\s*\d+\)?")
+
+# Lista completa de siglas para remover - apenas remove do início (a ordem importa)
+SIGLAS_PARA_REMOVER = [
+    "E.M.E.F. ",
+    "E.M.E.I.F. ",
+    "M.E.I.F ",
+    "E M E I F ",
+    "E M E F I ",
+    "E M E F ",
+    "E M E I ",
+    "C M E I ",
+    "ESC EST ",
+    "ESC ",
+    "EMEF ",
+    "EMEI ",
+    "EMEIF ",
+    "CMEI ",
+    "CMEF ",
+    "CMEIF ",
+    "ESCOLA MUNICIPAL DE ENSINO FUNDAMENTAL E INFANTIL ",
+    "ESCOLA MUNICIPAL DE ENSINO FUNDAMENTAL ",
+    "ESCOLA MUNICIPAL DE ENSINO INFANTIL ",
+    "ESCOLA MUNICIPAL ",
+    "CENTRO MUNICIPAL DE EDUCACAO INFANTIL ",
+    "CENTRO MUNICIPAL ",
+    "ESCOLA ",
+    "ESC MUNICIPAL ",
+    "ESC MUN ",
+    "E I F ",
+    "E F ",
+]
+
+# Uma única alternação compilada, na ordem da lista: o regex sempre escolhe a primeira
+# sigla da lista que é prefixo do nome
+PADRAO_SIGLAS = re.compile("^(?:" + "|".join(re.escape(sigla) for sigla in SIGLAS_PARA_REMOVER) + ")")
+
+def remover_sigla(nome):
+    """Remove a primeira sigla da lista que deixa um nome com mais de 3 caracteres"""
+    if PADRAO_SIGLAS.match(nome):
+        for sigla in SIGLAS_PARA_REMOVER:
+            if nome.startswith(sigla):
+                nome_sem_sigla = nome[len(sigla):].strip()
+                if len(nome_sem_sigla) > 3:  # Só aceita se sobrar um nome
+                    return nome_sem_sigla
+    return nome
+
+def textos_em_maiusculas(valores):
+    """Converte valores para texto em maiúsculas e sem espaços nas pontas.
+
+    O resultado fica com dtype object para que os regex das operações .str
+    usem o módulo re do Python (mesma semântica de \\b e \\d das funções escalares).
+    """
+    return pd.Series(valores, dtype=object).map(str).astype(object).str.upper().str.strip()
+
+def limpar_nome_escola_simples(nome):
+    """Função SUPER SIMPLES para limpar nomes - SEM PERDER ESCOLAS"""
+    if pd.isna(nome):
+        return nome
+
+    nome = str(nome).upper().strip()
+    nome = PADRAO_INEP.sub("", nome).strip()
+
+    # Remover apenas se começar com a sigla E sobrar nome decente
+    nome_original = nome
+    nome = remover_sigla(nome)
+
+    # Se deu algo errado, volta pro original
+    if len(nome) < 3:
+        nome = nome_original
+
+    return nome
+
+def limpar_nomes_escolas(nomes):
+    """Versão vetorizada de limpar_nome_escola_simples para uma coluna inteira.
+
+    Depois do melt o mesmo nome se repete uma vez por ano/turno, então apenas os
+    nomes distintos são limpos (com operações de string do pandas) e o resultado
+    é mapeado de volta para todas as linhas. Valores ausentes são mantidos.
+    """
+    codigos, unicos = pd.factorize(nomes)
+    if len(unicos) == 0:
+        return nomes.copy()
+
+    originais = textos_em_maiusculas(unicos)
+    originais = originais.str.replace(PADRAO_INEP, "", regex=True).str.strip()
+
+    # Remove de uma vez a primeira sigla da lista que é prefixo do nome
+    limpos = originais.str.replace(PADRAO_SIGLAS, "", n=1, regex=True).str.strip()
+
+    # Onde a primeira sigla deixaria um nome curto demais, a função original tenta as
+    # siglas seguintes da lista; esses casos são raros e seguem pelo caminho escalar
+    rejeitados = originais.str.match(PADRAO_SIGLAS) & (limpos.str.len() <= 3)
+    if rejeitados.any():
+        limpos[rejeitados] = originais[rejeitados].map(remover_sigla)
+
+    # Se deu algo errado, volta pro original
+    curtos = limpos.str.len() < 3
+    limpos[curtos] = originais[curtos]
+
+    resultado = limpos.to_numpy(dtype=object).take(codigos)
+    resultado[codigos == -1] = nomes.to_numpy(dtype=object)[codigos == -1]
+    return pd.Series(resultado, index=nomes.index, name=nomes.name)
+
+# ---------------------------------------------------------------------------
+# Provas não adaptadas
+# ---------------------------------------------------------------------------
+
+def detectar_colunas_nao_adaptadas(df):
+    """Detecta automaticamente as colunas da planilha e cria mapeamento dinâmico"""
+
+    # Coluna obrigatória (nome da escola)
+    coluna_escola = None
+    for col in df.columns:
+        if 'escola' in col.lower():
+            coluna_escola = col
+            break
+
+    if not coluna_escola:
+        return None, "Coluna com nome da escola não encontrada!"
+
+    # Detectar colunas de alunos automaticamente
+    colunas_alunos = []
+    for col in df.columns:
+        col_lower = col.lower()
+        # Procura por padrões como "total", "aluno", números, "manhã", "tarde", "eja", etc.
+        if any(palavra in col_lower for palavra in ['total', 'aluno', '1º', '2º', '3º', '4º', '5º',
+                                                    '6º', '7º', '8º', '9º', 'eja', 'manhã', 'tarde']):
+            if col != coluna_escola:  # Não incluir a coluna da escola
+                colunas_alunos.append(col)
+
+    # Criar mapeamento dinâmico
+    mapeamento = {coluna_escola: 'NOME ESCOLA'}
+
+    # Para cada coluna de alunos, criar um nome mais limpo
+    for col in colunas_alunos:
+        nome_limpo = col.replace('Total de alunos do ', '').replace('Total de alunos da ', '')
+        nome_limpo = nome_limpo.replace('Total de alunos ', '')  # cobre "Total de alunos EJAI 1"
+        nome_limpo = nome_limpo.replace(' da ', ' ').replace(' do ', ' ')
+        nome_limpo = nome_limpo.upper().strip()
+        mapeamento[col] = nome_limpo
+
+    return mapeamento, None
+
+def ajustar_nome_ano_escolar(ano_escolar):
+    """Ajusta nomes dos anos escolares:
+    - EJAI + número → 'EJA 1', 'EJA 2', etc.
+    - EJA (sem I) → mantém como está
+    - Anos normais → mantém como está
+    """
+    if pd.isna(ano_escolar):
+        return ano_escolar
+
+    ano_str = str(ano_escolar).upper().strip()
+
+    # EJAI com número → formatar como "EJA 1", "EJA 2", etc.
+    if 'EJAI' in ano_str:
+        match = re.search(r'\d+', ano_str)
+        if match:
+            return f"EJAI {match.group()}"
+        return ano_str  # fallback se não tiver número
+
+    # EJA sem I: manter como está
+    elif 'EJA' in ano_str:
+        return ano_str
+
+    # Anos normais: manter como está
+    else:
+        return ano_str
+
+# Padrões usados na padronização dos anos escolares
+PADRAO_NUMERO = re.compile(r'\b\d+\b')
+PADRAO_NUMERO_GRUPO = re.compile(r'\b(\d+)\b')
+PADRAO_ORDINAL = re.compile(r'\d+[ªº°]')
+
+def normalizar_anos_escolares(anos, adaptadas=False):
+    """Versão vetorizada da padronização dos anos escolares para uma coluna inteira.
+
+    Apenas os valores distintos são processados, com operações de string do pandas,
+    e o resultado é mapeado de volta para todas as linhas.
+    - adaptadas=False: mesmas regras de ajustar_nome_ano_escolar (valores ausentes são mantidos)
+    - adaptadas=True: regras das provas adaptadas
+        - EJAI: garante ª no número e ETAPA no final
+        - EJA (sem I): mantém como está
+        - Anos normais: garante º no número e ANO no final
+    """
+    # Nas provas adaptadas valores ausentes também são convertidos para texto, como str(valor)
+    codigos, unicos = pd.factorize(anos, use_na_sentinel=not adaptadas)
+    if len(unicos) == 0:
+        return anos.copy()
+
+    textos = textos_em_maiusculas(unicos)
+    ejai = textos.str.contains('EJAI', regex=False)
+
+    if not adaptadas:
+        # EJAI com número → "EJAI 1", "EJAI 2", etc.
+        numero = textos.str.extract(r'(\d+)', expand=False)
+        com_numero = ejai & numero.notna()
+        textos[com_numero] = 'EJAI ' + numero[com_numero]
+    else:
+        eja = textos.str.contains('EJA', regex=False) & ~ejai
+        normais = ~ejai & ~eja
+        sem_ordinal = textos.str.contains(PADRAO_NUMERO) & ~textos.str.contains(PADRAO_ORDINAL)
+
+        # EJAI: adicionar ª e ETAPA
+        etapa_escolar = ejai & ~textos.str.contains('ETAPA', regex=False)
+        textos[etapa_escolar & sem_ordinal] = textos[etapa_escolar & sem_ordinal].str.replace(
+            PADRAO_NUMERO_GRUPO, r'\1ª', regex=True
+        )
+        textos[etapa_escolar] = textos[etapa_escolar] + ' ETAPA'
+
+        # Anos normais: garantir º no número e ANO no final
+        textos[normais & sem_ordinal] = textos[normais & sem_ordinal].str.replace(PADRAO_NUMERO_GRUPO, r'\1º', regex=True)
+        sem_ano = normais & ~textos.str.contains('ANO', regex=False)
+        textos[sem_ano] = textos[sem_ano] + ' ANO'
+
+    resultado = textos.to_numpy(dtype=object).take(codigos)
+    resultado[codigos == -1] = anos.to_numpy(dtype=object)[codigos == -1]
+    return pd.Series(resultado, index=anos.index, name=anos.name)
+
+def normalizar_anos_escolares_adaptadas(anos):
+    return normalizar_anos_escolares(anos, adaptadas=True)
+
+# Versão das regras de limpeza dos nomes e anos (siglas, padrões e funções acima). Aumente a
+# cada mudança nessas regras: o cache persistente descarta os valores limpos com a versão
+# anterior (ver CacheNormalizacao)
+VERSAO_REGRAS = 1
+
+def reformatar_nao_adaptadas(df, mapeamento):
+    """Aplica o mapeamento e transforma a planilha larga para o formato longo.
+
+    Mantém uma linha por escola e ano/turno com alunos e uma linha para cada escola
+    que só tem zeros. Retorna (df_longo, erro).
+
+    Em vez de fazer o melt de todas as células (a maioria vazia), os totais viram uma
+    matriz NumPy escola x ano/turno e só as células com alunos geram linhas, na mesma
+    ordem (e com o mesmo índice) que o melt produziria.
+    """
+    # Aplicar mapeamento
+    df_mapeado = df.rename(columns=mapeamento)
+    colunas_finais = list(mapeamento.values())
+    df_final = df_mapeado[colunas_finais]
+
+    # Colunas de alunos, pela posição (duas colunas podem ter o mesmo nome depois do mapeamento)
+    posicoes_anos = [i for i, col in enumerate(df_final.columns) if col != 'NOME ESCOLA']
+    if not posicoes_anos:
+        return None, "Nenhuma coluna de alunos foi detectada!"
+    colunas_anos = df_final.columns[posicoes_anos]
+
+    # Limpeza cuidadosa dos dados: só as linhas com nome de escola
+    escolas = df_final['NOME ESCOLA']
+    com_escola = escolas.notna().to_numpy()
+    posicoes_linhas = np.flatnonzero(com_escola)
+    escolas = escolas[com_escola]
+    totais = np.column_stack([
+        pd.to_numeric(df_final.iloc[com_escola, i], errors='coerce').fillna(0).astype(int).to_numpy()
+        for i in posicoes_anos
+    ]) if len(posicoes_linhas) else np.zeros((0, len(posicoes_anos)), dtype=int)
+
+    # Estratégia para NÃO perder escolas:
+    # 1. Manter todas as células com TOTAL > 0, na ordem do melt (coluna por coluna)
+    positivos = totais > 0
+    coluna, linha = np.nonzero(positivos.T)
+    linhas_com_alunos = pd.DataFrame({
+        'NOME ESCOLA': escolas.array.take(linha),
+        'ANO ESCOLAR': colunas_anos.array.take(coluna),
+        'TOTAL': totais[linha, coluna],
+    }, index=coluna * len(df_final) + posicoes_linhas[linha])
+
+    # 2. Para escolas que só têm TOTAL = 0, manter pelo menos uma linha: a primeira do melt,
+    # que é a da primeira coluna de alunos na primeira linha da escola
+    # (por código da escola, para contar as linhas repetidas da mesma escola sem isin)
+    codigos, _ = pd.factorize(escolas)
+    com_alunos = np.bincount(codigos, weights=positivos.any(axis=1), minlength=codigos.max(initial=-1) + 1) > 0
+    sem_alunos = ~com_alunos[codigos]
+    if sem_alunos.any():
+        primeira_coluna = pd.DataFrame({
+            'NOME ESCOLA': escolas[sem_alunos],
+            'ANO ESCOLAR': pd.Series(colunas_anos[0], index=escolas.index[sem_alunos], dtype=colunas_anos.dtype),
+            'TOTAL': totais[sem_alunos, 0],
+        })
+        linhas_sem_alunos = primeira_coluna.groupby('NOME ESCOLA').first().reset_index()
+        return pd.concat([linhas_com_alunos, linhas_sem_alunos], ignore_index=True), None
+    return linhas_com_alunos, None
+
+def ordenar_por_escola(df):
+    """Ordena as etiquetas pelo nome da escola, mantendo a ordem dos anos dentro de cada escola.
+
+    Com NOME ESCOLA categórica a ordenação usa os códigos, e só a ordenação estável preserva
+    a ordem original das linhas empatadas.
+    """
+    return df.sort_values(by='NOME ESCOLA', kind='stable').reset_index(drop=True)
+
+# Colunas de texto que se repetem em muitas etiquetas (a mesma escola em cada ano, poucos anos
+# e categorias distintos)
+COLUNAS_CATEGORICAS = ['NOME ESCOLA', 'ANO ESCOLAR', 'CATEGORIA']
+
+def colunas_categoricas(df):
+    """Guarda as colunas de texto repetido como category: códigos inteiros mais uma tabela
+    com os textos distintos, em vez de uma referência a string por etiqueta"""
+    for coluna in COLUNAS_CATEGORICAS:
+        if coluna in df:
+            df[coluna] = df[coluna].astype('category')
+    return df
+
+def normalizar_com_cache(valores, funcao, cache=None, tipo=None):
+    """Aplica a função de limpeza vetorizada, consultando antes o cache persistente (se houver)"""
+    if cache is None:
+        return funcao(valores)
+    return cache.normalizar(valores, tipo, funcao)
+
+def processar_nao_adaptadas(df, cache=None):
+    """Transforma a planilha larga (uma coluna por ano/turno) no formato de etiquetas.
+
+    Retorna (df_processado, erro). Um DataFrame vazio indica que não há dados válidos.
+    "cache" (CacheNormalizacao, opcional) reaproveita os nomes e anos já padronizados.
+    """
+    # Detectar colunas automaticamente
+    with etapa('deteccao'):
+        mapeamento, erro = detectar_colunas_nao_adaptadas(df)
+    if erro:
+        return None, erro
+
+    with etapa('reformatacao') as dados:
+        df_final_processado, erro = reformatar_nao_adaptadas(df, mapeamento)
+        dados['linhas'] = 0 if df_final_processado is None else len(df_final_processado)
+    if erro or df_final_processado.empty:
+        return df_final_processado, erro
+
+    # Aplicar limpeza automática dos nomes das escolas (sempre ativa)
+    with etapa('limpeza_nomes'):
+        df_final_processado['NOME ESCOLA'] = normalizar_com_cache(
+            df_final_processado['NOME ESCOLA'], limpar_nomes_escolas, cache, 'escola'
+        )
+
+    # Ajustar nomes dos anos escolares
+    with etapa('anos_escolares'):
+        df_final_processado['ANO ESCOLAR'] = normalizar_com_cache(
+            df_final_processado['ANO ESCOLAR'], normalizar_anos_escolares, cache, 'ano'
+        )
+
+    # Já limpas, as colunas de texto viram category: a ordenação (e depois a revisão de
+    # duplicatas e a divisão em envelopes) trabalha com os códigos inteiros
+    df_final_processado = colunas_categoricas(df_final_processado)
+
+    with etapa('ordenacao'):
+        return ordenar_por_escola(df_final_processado), None
+
+# ---------------------------------------------------------------------------
+# Provas adaptadas
+# ---------------------------------------------------------------------------
+
+def detectar_colunas_adaptadas(df):
+    """Detecta automaticamente as colunas da planilha adaptadas"""
+
+    # Normalizar nomes das colunas
+    df.columns = [col.upper().strip() for col in df.columns]
+
+    # Mapear colunas conhecidas
+    mapeamento = {}
+
+    # Detectar coluna da escola
+    for col in df.columns:
+        if any(palavra in col.upper() for palavra in ['ESCOLA', 'NOME']):
+            mapeamento[col] = 'NOME ESCOLA'
+            break
+
+    # Detectar outras colunas
+    for col in df.columns:
+        col_upper = col.upper()
+        if 'CATEGORIA' in col_upper or 'DEFICIENCIA' in col_upper:
+            mapeamento[col] = 'CATEGORIA'
+        elif 'ANO' in col_upper and col not in mapeamento:
+            mapeamento[col] = 'ANO ESCOLAR'
+        elif any(palavra in col_upper for palavra in ['QUANTIDADE', 'TOTAL', 'QTD']):
+            mapeamento[col] = 'TOTAL'
+
+    # Se não encontrou escola
+    if 'NOME ESCOLA' not in mapeamento.values():
+        return None, "Coluna com nome da escola não encontrada!"
+
+    return mapeamento, None
+
+def reformatar_adaptadas(df, mapeamento):
+    """Aplica o mapeamento, cria as colunas que faltam e descarta as linhas sem provas.
+
+    Retorna (df_mapeado, erro).
+    """
+    # Aplicar mapeamento
+    df_mapeado = df.rename(columns=mapeamento)
+
+    # Verificar colunas obrigatórias
+    required_columns = ['NOME ESCOLA']
+    missing_columns = [col for col in required_columns if col not in df_mapeado.columns]
+    if missing_columns:
+        return None, f"Colunas obrigatórias não encontradas: {', '.join(missing_columns)}"
+
+    # Criar colunas padrão se não existirem
+    if 'CATEGORIA' not in df_mapeado.columns:
+        df_mapeado['CATEGORIA'] = 'GERAL'
+    if 'ANO ESCOLAR' not in df_mapeado.columns:
+        df_mapeado['ANO ESCOLAR'] = 'NÃO INFORMADO'
+    if 'TOTAL' not in df_mapeado.columns:
+        df_mapeado['TOTAL'] = 1
+
+    # Processar coluna TOTAL
+    df_mapeado['TOTAL'] = pd.to_numeric(df_mapeado['TOTAL'], errors='coerce').fillna(1).astype(int)
+    return df_mapeado[df_mapeado['TOTAL'] > 0].copy(), None
+
+def processar_adaptadas(df, cache=None):
+    """Padroniza a planilha de provas adaptadas (Escola/Categoria/Ano/Quantidade).
+
+    Retorna (df_processado, erro). Um DataFrame vazio indica que não há dados válidos.
+    "cache" (CacheNormalizacao, opcional) reaproveita os nomes e anos já padronizados.
+    """
+    # Detectar colunas automaticamente
+    with etapa('deteccao'):
+        mapeamento, erro = detectar_colunas_adaptadas(df)
+    if erro:
+        return None, erro
+
+    with etapa('reformatacao') as dados:
+        df_transformado, erro = reformatar_adaptadas(df, mapeamento)
+        dados['linhas'] = 0 if df_transformado is None else len(df_transformado)
+    if erro:
+        return None, erro
+
+    # Padronizar anos escolares (EJAI → ª e ETAPA, EJA mantido, anos normais → º e ANO)
+    with etapa('anos_escolares'):
+        df_transformado['ANO ESCOLAR'] = normalizar_com_cache(
+            df_transformado['ANO ESCOLAR'].astype(str), normalizar_anos_escolares_adaptadas, cache, 'ano_adaptadas'
+        )
+
+    # Limpar nomes das escolas
+    with etapa('limpeza_nomes'):
+        df_transformado["NOME ESCOLA"] = normalizar_com_cache(
+            df_transformado['NOME ESCOLA'], limpar_nomes_escolas, cache, 'escola'
+        )
+
+    # Category antes de ordenar, como em processar_nao_adaptadas
+    df_transformado = colunas_categoricas(df_transformado)
+
+    with etapa('ordenacao'):
+        return ordenar_por_escola(df_transformado), None
+
+# ---------------------------------------------------------------------------
+# Divisão em envelopes
+# ---------------------------------------------------------------------------
+
+def dividir_em_envelopes(tabela, capacidade):
+    """Divide cada linha em ceil(TOTAL / capacidade) etiquetas, uma por envelope.
+
+    Cada envelope recebe "capacidade" provas, e o último recebe o restante. As colunas
+    ENVELOPE (k) e ENVELOPES (n) identificam o envelope. Linhas com TOTAL 0 continuam
+    com uma etiqueta. A expansão é vetorizada (repeat/cumsum), sem laço por linha.
+    """
+    if capacidade is None or capacidade <= 0:
+        return tabela
+
+    totais = tabela['TOTAL'].to_numpy(dtype=np.int64)
+    envelopes = np.maximum(1, -(-totais // capacidade))  # ceil sem passar por float
+
+    # Índice da linha de origem e posição (1..n) de cada etiqueta dentro da linha
+    origem = np.repeat(np.arange(len(tabela)), envelopes)
+    inicio = np.repeat(np.cumsum(envelopes) - envelopes, envelopes)
+    envelope = np.arange(len(origem)) - inicio + 1
+
+    n = envelopes[origem]
+    expandida = tabela.iloc[origem].reset_index(drop=True)
+    expandida['TOTAL'] = np.where(envelope < n, capacidade, totais[origem] - (n - 1) * capacidade)
+    expandida['ENVELOPE'] = envelope
+    expandida['ENVELOPES'] = n
+    return expandida
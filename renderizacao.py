@@ -0,0 +1,390 @@
+import copy
+import math
+from dataclasses import dataclass
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+from PIL import Image
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+from reportlab.lib.units import inch, mm
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.platypus import Paragraph
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.utils import ImageReader
+import io
+
+from diagnostico import etapa
+from processamento import dividir_em_envelopes
+
+# Estilo do texto nas etiquetas
+paragraph_label_style = ParagraphStyle(
+    'paragraph labels style',
+    fontSize=11,
+    borderPadding=5,
+    alignment=TA_CENTER
+)
+
+# Tamanhos de fonte usados no ajuste automático (o texto só diminui quando não cabe na etiqueta)
+TAMANHO_FONTE = paragraph_label_style.fontSize
+TAMANHO_FONTE_MINIMO = 6
+PASSO_FONTE = 0.5
+
+# Quantidade máxima de textos já quebrados em linhas mantidos em cache
+MAX_TEXTOS_EM_CACHE = 20000
+
+# Nome do recurso (XObject) com as partes fixas da etiqueta, compartilhado por todas as etiquetas do PDF
+NOME_FORM_MODELO = 'modelo_etiqueta'
+
+# Altura da logo em relação à altura da etiqueta (14,9 mm numa etiqueta de 55 mm)
+# e espaço entre a logo e o texto
+PROPORCAO_LOGO = 14.9 / 55
+espaco_texto = 3 * mm
+
+# Resolução de impressão da logo: imagens maiores são reduzidas para o tamanho que ocupam
+# na etiqueta, nessa resolução, antes de entrar no PDF
+DPI_LOGO = 300
+
+# Qualidade JPEG da logo reduzida (1 a 95)
+QUALIDADE_LOGO = 85
+
+# Resolução padrão das impressoras térmicas na saída ZPL (ver renderizacao_zpl): 203 é a mais
+# comum; 300 e 600 também existem
+DPI_ZPL = 203
+
+
+@dataclass(frozen=True)
+class LayoutFolha:
+    """Descrição de uma folha de etiquetas: página, tamanho das etiquetas, margens, grade e espaçamentos.
+
+    As etiquetas são preenchidas da esquerda para a direita e de cima para baixo.
+    """
+    descricao: str
+    largura_etiqueta: float
+    altura_etiqueta: float
+    linhas: int
+    colunas: int
+    margem_topo: float
+    margem_esquerda: float
+    espaco_horizontal: float = 0  # entre as colunas
+    espaco_vertical: float = 0  # entre as linhas
+    tamanho_pagina: tuple = A4
+
+    @property
+    def etiquetas_por_pagina(self):
+        return self.linhas * self.colunas
+
+    @property
+    def tamanho_logo(self):
+        """Largura e altura (em pontos) da caixa da logo na etiqueta"""
+        return self.largura_etiqueta - 2 * mm, self.altura_etiqueta * PROPORCAO_LOGO
+
+    def posicoes_pagina(self):
+        """Canto inferior esquerdo (x, y) de cada etiqueta de uma página, na ordem de preenchimento"""
+        _, altura_pagina = self.tamanho_pagina
+        return [
+            (self.margem_esquerda + coluna * (self.largura_etiqueta + self.espaco_horizontal),
+             altura_pagina - self.margem_topo - self.altura_etiqueta
+             - linha * (self.altura_etiqueta + self.espaco_vertical))
+            for linha in range(self.linhas)
+            for coluna in range(self.colunas)
+        ]
+
+    def posicoes(self, total_etiquetas):
+        """Tabela (página, x, y) de todas as etiquetas do documento"""
+        posicoes_pagina = self.posicoes_pagina()
+        por_pagina = len(posicoes_pagina)
+        return [(i // por_pagina, *posicoes_pagina[i % por_pagina]) for i in range(total_etiquetas)]
+
+
+# Folhas disponíveis. A padrão reproduz o layout original (2 x 5 etiquetas de 99 x 55 mm);
+# as demais seguem as medidas das folhas A4 Pimaco/Avery equivalentes.
+LAYOUTS = {
+    'padrao': LayoutFolha("Padrão - 10 por folha (99 x 55 mm)", 99 * mm, 55 * mm, linhas=5, colunas=2,
+                          margem_topo=10 * mm, margem_esquerda=5 * mm, espaco_horizontal=2.5 * mm),
+    'pimaco-a4365': LayoutFolha("Pimaco A4365 / Avery L7165 - 8 por folha (99,1 x 67,7 mm)", 99.1 * mm, 67.7 * mm,
+                                linhas=4, colunas=2, margem_topo=13.1 * mm, margem_esquerda=4.65 * mm,
+                                espaco_horizontal=2.5 * mm),
+    'pimaco-a4363': LayoutFolha("Pimaco A4363 / Avery L7163 - 14 por folha (99,1 x 38,1 mm)", 99.1 * mm, 38.1 * mm,
+                                linhas=7, colunas=2, margem_topo=15.15 * mm, margem_esquerda=4.65 * mm,
+                                espaco_horizontal=2.5 * mm),
+    'pimaco-a4362': LayoutFolha("Pimaco A4362 / Avery L7162 - 16 por folha (99,1 x 33,9 mm)", 99.1 * mm, 33.9 * mm,
+                                linhas=8, colunas=2, margem_topo=12.9 * mm, margem_esquerda=4.65 * mm,
+                                espaco_horizontal=2.5 * mm),
+    'pimaco-a4360': LayoutFolha("Pimaco A4360 / Avery L7160 - 21 por folha (63,5 x 38,1 mm)", 63.5 * mm, 38.1 * mm,
+                                linhas=7, colunas=3, margem_topo=15.15 * mm, margem_esquerda=7.25 * mm,
+                                espaco_horizontal=2.5 * mm),
+}
+LAYOUT_PADRAO = LAYOUTS['padrao']
+
+
+@lru_cache(maxsize=8)
+def reamostrar_logo(conteudo, largura_px, altura_px, qualidade):
+    """JPEG da logo com no máximo largura_px x altura_px, ou o original se já for menor (ou menor em bytes)"""
+    imagem = Image.open(io.BytesIO(conteudo))
+    if imagem.width <= largura_px and imagem.height <= altura_px:
+        return conteudo
+    # A logo é desenhada esticada na caixa, então cada eixo é reduzido separadamente;
+    # draft() decodifica o JPEG já em escala reduzida, bem mais rápido em fotos grandes
+    tamanho = (min(imagem.width, largura_px), min(imagem.height, altura_px))
+    imagem.draft('RGB', tamanho)
+    if imagem.mode not in ('RGB', 'L'):
+        imagem = imagem.convert('RGB')
+    saida = io.BytesIO()
+    imagem.resize(tamanho, Image.LANCZOS).save(saida, 'JPEG', quality=qualidade, optimize=True)
+    reduzida = saida.getvalue()
+    return reduzida if len(reduzida) < len(conteudo) else conteudo
+
+def reduzir_logo(logo, layout=None, dpi=DPI_LOGO, qualidade=QUALIDADE_LOGO):
+    """Logo (BytesIO) reduzida para a resolução de impressão da caixa onde é desenhada.
+
+    Fotos de celular com vários megapixels deixam o PDF grande e lento para imprimir sem
+    nenhum ganho visível. A redução é feita uma vez por logo/folha/qualidade (em cache);
+    os bytes antes e depois vão para o diagnóstico.
+    """
+    layout = layout or LAYOUT_PADRAO
+    largura, altura = layout.tamanho_logo
+    conteudo = logo.getvalue()
+    with etapa('logo') as dados:
+        reduzida = reamostrar_logo(conteudo, math.ceil(largura / inch * dpi), math.ceil(altura / inch * dpi),
+                                   qualidade)
+        dados.update(bytes_original=len(conteudo), bytes_final=len(reduzida))
+    return io.BytesIO(reduzida)
+
+@lru_cache(maxsize=None)
+def estilo_fonte(tamanho):
+    """Estilo das etiquetas com outro tamanho de fonte (entrelinha proporcional)"""
+    if tamanho == TAMANHO_FONTE:
+        return paragraph_label_style
+    return ParagraphStyle(
+        f'{paragraph_label_style.name} {tamanho}',
+        parent=paragraph_label_style,
+        fontSize=tamanho,
+        leading=paragraph_label_style.leading * tamanho / TAMANHO_FONTE
+    )
+
+@lru_cache(maxsize=MAX_TEXTOS_EM_CACHE)
+def paragrafo(texto, tamanho, largura):
+    """Paragraph já quebrado em linhas para a largura da etiqueta, com a altura ocupada.
+
+    As linhas quebradas servem para todas as etiquetas com o mesmo texto (nome da escola
+    repetido em cada ano, "CATEGORIA: TEA", campeonato, etapa...), então cada texto
+    distinto é quebrado uma única vez. O objeto em cache não deve ser desenhado direto:
+    o drawOn guarda o canvas nele durante o desenho (ver desenhar_linhas).
+    """
+    p = Paragraph(texto, estilo_fonte(tamanho))
+    _, altura = p.wrap(largura, 10000)
+    return p, altura
+
+@lru_cache(maxsize=MAX_TEXTOS_EM_CACHE)
+def tamanho_ajustado(texto, largura, altura_maxima):
+    """Maior tamanho de fonte (até TAMANHO_FONTE) em que o texto cabe na caixa largura x altura_maxima"""
+    tamanho = TAMANHO_FONTE
+    while tamanho > TAMANHO_FONTE_MINIMO:
+        p, altura = paragrafo(texto, tamanho, largura)
+        if altura <= altura_maxima and p.minWidth() <= largura:
+            break
+        tamanho -= PASSO_FONTE
+    return tamanho
+
+@lru_cache(maxsize=MAX_TEXTOS_EM_CACHE)
+def tamanhos_ajustados(linhas, largura, altura_maxima):
+    """Tamanhos de fonte das linhas para que, empilhadas, caibam na caixa largura x altura_maxima.
+
+    Cada linha começa no maior tamanho em que cabe sozinha na caixa; enquanto a pilha passa
+    da altura, a linha mais alta (ainda acima do tamanho mínimo) diminui um passo.
+    """
+    tamanhos = [tamanho_ajustado(linha, largura, altura_maxima) for linha in linhas]
+    alturas = [paragrafo(linha, tamanho, largura)[1] for linha, tamanho in zip(linhas, tamanhos)]
+    while sum(alturas) > altura_maxima:
+        redutiveis = [i for i, tamanho in enumerate(tamanhos) if tamanho > TAMANHO_FONTE_MINIMO]
+        if not redutiveis:
+            break
+        i = max(redutiveis, key=lambda i: (alturas[i], tamanhos[i]))
+        tamanhos[i] -= PASSO_FONTE
+        alturas[i] = paragrafo(linhas[i], tamanhos[i], largura)[1]
+    return tuple(tamanhos)
+
+def desenhar_linhas(c, x, topo, largura, linhas, altura_maxima=None):
+    """Desenha as linhas de texto empilhadas a partir de "topo" e retorna a altura usada.
+
+    Com altura_maxima, as fontes são ajustadas para que as linhas, juntas, caibam nessa altura.
+    """
+    if altura_maxima:
+        tamanhos = tamanhos_ajustados(tuple(linhas), largura, altura_maxima)
+    else:
+        tamanhos = [TAMANHO_FONTE] * len(linhas)
+    y = topo
+    for linha, tamanho in zip(linhas, tamanhos):
+        p, altura = paragrafo(linha, tamanho, largura)
+        y -= altura
+        # Cópia rasa (compartilha as linhas já quebradas): o drawOn grava e apaga "canv" no
+        # objeto, então o Paragraph em cache não pode ser desenhado por duas threads ao mesmo tempo
+        copy.copy(p).drawOn(c, x, y)
+    return topo - y
+
+# Função para registrar o modelo da etiqueta uma única vez no PDF
+# "reserva" é a altura mantida livre abaixo do campeonato e da etapa para o texto variável
+def registrar_modelo(c, largura, altura, logo, championship, stage, ajustar_fonte=True, reserva=0):
+    # As partes que se repetem em todas as etiquetas (borda, logo, campeonato e etapa) são
+    # desenhadas uma vez dentro de um form; cada etiqueta apenas carimba esse form.
+    # A logo é decodificada em memória (sem arquivo temporário) e incorporada uma única vez.
+    imagem = ImageReader(io.BytesIO(logo.getvalue()))
+    largura_logo = largura - 2 * mm
+    altura_logo = altura * PROPORCAO_LOGO
+    c.beginForm(NOME_FORM_MODELO, 0, 0, largura, altura)
+
+    # Definir a cor da borda para branco
+    c.setStrokeColorRGB(1, 1, 1)  # Branco
+    c.rect(0, 0, largura, altura)
+
+    # Inserção do logo
+    c.drawImage(imagem, 1 * mm, altura - altura_logo, width=largura_logo, height=altura_logo)
+
+    # Campeonato e etapa logo abaixo da logo (juntos, no máximo quatro linhas no ajuste automático,
+    # sem invadir a reserva do texto variável)
+    topo_texto = altura - altura_logo - espaco_texto
+    altura_maxima = min(4 * paragraph_label_style.leading, topo_texto - reserva) if ajustar_fonte else None
+    altura_texto = desenhar_linhas(c, 0, topo_texto, largura, [championship, f"<b>{stage}</b>"], altura_maxima)
+    c.endForm()
+
+    # Retorna o nome do form e a altura (relativa à etiqueta) onde começa o texto variável
+    return NOME_FORM_MODELO, topo_texto - altura_texto
+
+# Função para desenhar uma única etiqueta
+def desenhar_etiqueta(c, x, y, largura, linhas, modelo, topo_texto, altura_maxima):
+    # Carimbo das partes fixas (borda, logo, campeonato e etapa)
+    c.saveState()
+    c.translate(x, y)
+    c.doForm(modelo)
+    c.restoreState()
+
+    # Texto variável, logo abaixo do campeonato e da etapa
+    desenhar_linhas(c, x, y + topo_texto, largura, linhas, altura_maxima)
+
+def lote_etiquetas(tabela):
+    """Colunas da tabela em forma compacta: {coluna: (códigos, textos)}.
+
+    "códigos" é um array NumPy com uma posição por etiqueta e "textos" a lista dos valores
+    distintos já convertidos para texto (valores ausentes viram "nan", como em f"{valor}").
+    Nas colunas category os códigos já existem, então a conversão é praticamente gratuita.
+    """
+    lote = {}
+    for coluna in tabela.columns:
+        codigos, valores = pd.factorize(tabela[coluna], use_na_sentinel=False)
+        lote[coluna] = (codigos, [f"{valor}" for valor in valores])
+    return lote
+
+def textos_combinados(formato, *colunas):
+    """Linha de texto montada a partir de colunas do lote, como (códigos, textos).
+
+    formato(*textos) é chamado uma vez por combinação distinta de valores das colunas,
+    e não uma vez por etiqueta.
+    """
+    if len(colunas) == 1:
+        codigos, textos = colunas[0]
+        return codigos, [formato(texto) for texto in textos]
+    combinacoes, codigos = np.unique(np.column_stack([c for c, _ in colunas]), axis=0, return_inverse=True)
+    return codigos.ravel(), [
+        formato(*(textos[i] for (_, textos), i in zip(colunas, combinacao)))
+        for combinacao in combinacoes.tolist()
+    ]
+
+def textos_etiquetas(linhas):
+    """Tupla com as linhas de texto de cada etiqueta, na ordem, a partir de [(códigos, textos), ...]"""
+    return zip(*[map(textos.__getitem__, codigos.tolist()) for codigos, textos in linhas])
+
+# Função principal para gerar o PDF com as etiquetas
+# "linhas_etiqueta" recebe o lote de etiquetas (lote_etiquetas) e devolve as linhas de texto variável de
+# todas as etiquetas, cada uma como (códigos, textos) (modelo de conteúdo; ver textos_combinados).
+# Com "ajustar_fonte", textos que não cabem na etiqueta são desenhados com uma fonte menor.
+# Se "destino" for informado (arquivo aberto, PDFTemporario...), o PDF é gravado direto nele
+# e nenhuma cópia em bytes é devolvida
+# "progresso", se informado, é chamado a cada página com (etiquetas feitas, total); uma exceção
+# lançada por ele interrompe a renderização (cancelamento)
+def renderizar_etiquetas(tabela, logo, championship, stage, linhas_etiqueta, layout=None, destino=None,
+                         ajustar_fonte=True, progresso=None):
+    layout = layout or LAYOUT_PADRAO
+    buffer = destino if destino is not None else io.BytesIO()
+
+    with etapa('pdf') as dados:
+        # Configuração do PDF (conteúdo das páginas comprimido)
+        c = canvas.Canvas(buffer, pagesize=layout.tamanho_pagina, pageCompression=1)
+
+        # Texto de cada etiqueta a partir dos códigos das colunas (sem criar uma linha do pandas por etiqueta)
+        linhas = linhas_etiqueta(lote_etiquetas(tabela))
+
+        # Registro das partes fixas da etiqueta (desenhadas uma única vez), deixando espaço para
+        # ao menos uma linha de cada texto variável no tamanho mínimo de fonte, mais uma para um
+        # nome de escola longo que quebre mesmo assim
+        reserva = (len(linhas) + 1) * estilo_fonte(TAMANHO_FONTE_MINIMO).leading
+        modelo, topo_texto = registrar_modelo(c, layout.largura_etiqueta, layout.altura_etiqueta,
+                                              logo, championship, stage, ajustar_fonte, reserva)
+
+        # O texto variável de cada etiqueta ocupa, no total, no máximo o que sobra abaixo do
+        # campeonato e da etapa (as etiquetas das folhas ficam encostadas umas nas outras)
+        altura_maxima = topo_texto if ajustar_fonte else None
+
+        # Posições (página, x, y) de todas as etiquetas, calculadas uma única vez
+        posicoes = layout.posicoes(len(tabela))
+
+        pagina_atual = 0
+        for (pagina, x, y), textos in zip(posicoes, textos_etiquetas(linhas)):
+            if pagina != pagina_atual:
+                c.showPage()
+                pagina_atual = pagina
+                if progresso is not None:
+                    progresso(pagina * layout.etiquetas_por_pagina, len(tabela))
+            desenhar_etiqueta(c, x, y, layout.largura_etiqueta, textos, modelo, topo_texto, altura_maxima)
+
+        c.save()
+        if progresso is not None:
+            progresso(len(tabela), len(tabela))
+        dados.update(etiquetas=len(tabela), paginas=pagina_atual + 1)
+
+    if destino is not None:
+        return destino
+    pdf_data = buffer.getvalue()
+    buffer.close()
+    return pdf_data
+
+# Geração das etiquetas de uma variante (provas adaptadas ou não adaptadas) a partir do seu
+# modelo de conteúdo "linhas_etiqueta"; criacao_adaptadas e criacao_nao_adaptadas só definem o
+# modelo e fixam este argumento (functools.partial, que continua podendo ir para outros processos).
+# Com "capacidade_envelope", cada linha vira uma etiqueta por envelope de até essa quantidade de provas
+# A logo é reduzida para a resolução de impressão (JPEG com "qualidade_logo") antes de entrar no PDF
+def gerar_etiquetas_modelo(linhas_etiqueta, tabela, logo, championship, stage, destino=None, layout=None,
+                           ajustar_fonte=True, progresso=None, capacidade_envelope=None,
+                           qualidade_logo=QUALIDADE_LOGO):
+    tabela = dividir_em_envelopes(tabela, capacidade_envelope)
+    logo = reduzir_logo(logo, layout, qualidade=qualidade_logo)
+    return renderizar_etiquetas(tabela, logo, championship, stage, linhas_etiqueta, layout=layout,
+                                destino=destino, ajustar_fonte=ajustar_fonte, progresso=progresso)
+
+# Mesmo PDF de gerar_etiquetas_modelo, reaproveitando do cache as páginas que não mudaram.
+# Retorna (pdf, relatorio) com as páginas renderizadas novamente, as assinaturas das escolas
+# e o tamanho da logo antes e depois da redução.
+def gerar_etiquetas_incremental_modelo(linhas_etiqueta, tabela, logo, championship, stage, cache, destino=None,
+                                       layout=None, ajustar_fonte=True, progresso=None, capacidade_envelope=None,
+                                       qualidade_logo=QUALIDADE_LOGO):
+    # Importado aqui porque renderizacao_incremental importa este módulo
+    from renderizacao_incremental import renderizar_incremental
+
+    tabela = dividir_em_envelopes(tabela, capacidade_envelope)
+    logo_reduzida = reduzir_logo(logo, layout, qualidade=qualidade_logo)
+    pdf, relatorio = renderizar_incremental(tabela, logo_reduzida, championship, stage, linhas_etiqueta, cache,
+                                            layout=layout, destino=destino, ajustar_fonte=ajustar_fonte,
+                                            progresso=progresso)
+    relatorio['logo'] = (len(logo.getvalue()), len(logo_reduzida.getvalue()))
+    return pdf, relatorio
+
+# Mesmas etiquetas em ZPL, para impressoras térmicas (uma etiqueta do rolo por etiqueta, no
+# tamanho das etiquetas do layout). A logo vira um gráfico monocromático na resolução "dpi".
+def gerar_etiquetas_zpl_modelo(linhas_etiqueta, tabela, logo, championship, stage, destino=None, layout=None,
+                               progresso=None, capacidade_envelope=None, dpi=DPI_ZPL):
+    # Importado aqui porque renderizacao_zpl importa este módulo
+    from renderizacao_zpl import renderizar_zpl
+
+    tabela = dividir_em_envelopes(tabela, capacidade_envelope)
+    return renderizar_zpl(tabela, logo, championship, stage, linhas_etiqueta, layout=layout, destino=destino,
+                          dpi=dpi, progresso=progresso)
@@ -0,0 +1,163 @@
+import io
+import threading
+from collections import OrderedDict
+
+from pypdf import PdfReader, PdfWriter
+
+from diagnostico import etapa
+from processamento import calcular_hash
+from renderizacao import LAYOUT_PADRAO, lote_etiquetas, renderizar_etiquetas, textos_etiquetas
+
+# Tamanho máximo (aproximado) das páginas guardadas no cache
+LIMITE_CACHE_PAGINAS = 64 * 1024 * 1024
+
+# Separador entre os textos que entram no hash (não aparece no conteúdo das etiquetas)
+SEPARADOR = '\x1f'
+
+
+class CachePaginas:
+    """Cache LRU de páginas já renderizadas, limitado pelo tamanho em bytes.
+
+    Cada entrada aponta para o PDF do trecho em que a página foi renderizada e para a
+    posição dela nesse trecho; as páginas de um mesmo trecho compartilham os bytes, e
+    cada uma conta no limite com a sua parte do tamanho do trecho. Pode ser compartilhado
+    entre sessões (o acesso é protegido por um lock).
+    """
+
+    def __init__(self, limite_bytes=LIMITE_CACHE_PAGINAS):
+        self.limite_bytes = limite_bytes
+        self._paginas = OrderedDict()  # chave -> (pdf do trecho, índice da página, tamanho)
+        self._lock = threading.Lock()
+        self.tamanho = 0
+
+    def __len__(self):
+        return len(self._paginas)
+
+    def obter(self, chave):
+        """(pdf do trecho, índice da página) ou None, marcando a página como usada recentemente"""
+        with self._lock:
+            item = self._paginas.get(chave)
+            if item is None:
+                return None
+            self._paginas.move_to_end(chave)
+            return item[:2]
+
+    def guardar(self, chave, pdf, indice, tamanho):
+        with self._lock:
+            anterior = self._paginas.pop(chave, None)
+            if anterior is not None:
+                self.tamanho -= anterior[2]
+            self._paginas[chave] = (pdf, indice, tamanho)
+            self.tamanho += tamanho
+            # Descarta as páginas usadas há mais tempo (mantém ao menos a última guardada)
+            while self.tamanho > self.limite_bytes and len(self._paginas) > 1:
+                _, (_, _, tamanho_descartado) = self._paginas.popitem(last=False)
+                self.tamanho -= tamanho_descartado
+
+
+def assinaturas_escolas(tabela, linhas):
+    """Hash do conteúdo das etiquetas de cada escola, para comparar duas versões da planilha"""
+    textos = {}
+    for escola, linhas_etiqueta in zip(tabela['NOME ESCOLA'], linhas):
+        textos.setdefault(escola, []).append(SEPARADOR.join(linhas_etiqueta))
+    return {escola: calcular_hash('\n'.join(t).encode('utf-8')) for escola, t in textos.items()}
+
+def escolas_alteradas(anteriores, atuais):
+    """Escolas incluídas, removidas ou com etiquetas diferentes entre duas versões"""
+    return sorted(
+        (escola for escola in anteriores.keys() | atuais.keys()
+         if anteriores.get(escola) != atuais.get(escola)),
+        key=str
+    )
+
+def trechos_consecutivos(paginas):
+    """Agrupa índices de página crescentes em intervalos (primeira, última)"""
+    trechos = []
+    for pagina in paginas:
+        if trechos and trechos[-1][1] == pagina - 1:
+            trechos[-1][1] = pagina
+        else:
+            trechos.append([pagina, pagina])
+    return [tuple(t) for t in trechos]
+
+def montar_pdf(paginas, destino):
+    """Escreve o documento com as páginas (pdf do trecho, índice) na ordem informada"""
+    pdfs = {id(pdf): pdf for pdf, _ in paginas}
+    if len(pdfs) == 1:
+        pdf = next(iter(pdfs.values()))
+        # Todas as páginas vêm, na ordem, de um único trecho completo: copia o PDF direto
+        if [indice for _, indice in paginas] == list(range(len(PdfReader(io.BytesIO(pdf)).pages))):
+            destino.write(pdf)
+            return
+
+    leitores = {chave: PdfReader(io.BytesIO(pdf)) for chave, pdf in pdfs.items()}
+    writer = PdfWriter()
+    for pdf, indice in paginas:
+        writer.add_page(leitores[id(pdf)].pages[indice])
+    # Cada trecho tem a própria cópia da logo e do modelo da etiqueta: mantém só uma
+    writer.compress_identical_objects(remove_identicals=True, remove_orphans=True)
+    writer.write(destino)
+
+def renderizar_incremental(tabela, logo, championship, stage, linhas_etiqueta, cache, layout=None,
+                           destino=None, ajustar_fonte=True, progresso=None):
+    """Gera o PDF reaproveitando do cache as páginas que não mudaram.
+
+    A chave de cada página é o hash do texto das etiquetas dela mais a folha, a logo,
+    o campeonato, a etapa e o modelo de conteúdo. Só as páginas sem entrada no cache são
+    renderizadas, em trechos de páginas consecutivas. Retorna (pdf, relatorio), em que
+    pdf segue a convenção de renderizar_etiquetas (destino ou bytes) e relatorio traz
+    as páginas renderizadas novamente e a assinatura de cada escola. "progresso" recebe
+    (etiquetas renderizadas, total a renderizar), sem contar as páginas reaproveitadas.
+    """
+    layout = layout or LAYOUT_PADRAO
+    por_pagina = layout.etiquetas_por_pagina
+    linhas = list(textos_etiquetas(linhas_etiqueta(lote_etiquetas(tabela))))
+    total_paginas = -(-len(linhas) // por_pagina)
+
+    contexto = SEPARADOR.join([
+        repr(layout), calcular_hash(logo.getvalue()), championship, stage, str(ajustar_fonte),
+        f"{linhas_etiqueta.__module__}.{linhas_etiqueta.__qualname__}",
+    ])
+    chaves = [
+        calcular_hash(SEPARADOR.join(
+            [contexto] + ['\n'.join(l) for l in linhas[pagina * por_pagina:(pagina + 1) * por_pagina]]
+        ).encode('utf-8'))
+        for pagina in range(total_paginas)
+    ]
+
+    paginas = [cache.obter(chave) for chave in chaves]
+    faltando = [pagina for pagina, item in enumerate(paginas) if item is None]
+
+    with etapa('pdf_incremental') as dados:
+        trechos = trechos_consecutivos(faltando)
+        total_renderizar = sum(min((u + 1) * por_pagina, len(tabela)) - p * por_pagina for p, u in trechos)
+        feitas = 0
+        for primeira, ultima in trechos:
+            trecho = tabela.iloc[primeira * por_pagina:(ultima + 1) * por_pagina]
+            progresso_trecho = None
+            if progresso is not None:
+                progresso_trecho = lambda n, _, base=feitas: progresso(base + n, total_renderizar)
+            pdf = renderizar_etiquetas(trecho, logo, championship, stage, linhas_etiqueta, layout=layout,
+                                       ajustar_fonte=ajustar_fonte, progresso=progresso_trecho)
+            feitas += len(trecho)
+            tamanho = len(pdf) // (ultima - primeira + 1)
+            for indice, pagina in enumerate(range(primeira, ultima + 1)):
+                cache.guardar(chaves[pagina], pdf, indice, tamanho)
+                paginas[pagina] = (pdf, indice)
+
+        buffer = destino if destino is not None else io.BytesIO()
+        if paginas:
+            montar_pdf(paginas, buffer)
+        else:
+            buffer.write(renderizar_etiquetas(tabela, logo, championship, stage, linhas_etiqueta,
+                                              layout=layout, ajustar_fonte=ajustar_fonte))
+        dados.update(paginas=total_paginas, paginas_renderizadas=len(faltando))
+
+    relatorio = {
+        'total_paginas': total_paginas,
+        'paginas_renderizadas': faltando,
+        'assinaturas': assinaturas_escolas(tabela, linhas),
+    }
+    if destino is not None:
+        return destino, relatorio
+    return buffer.getvalue(), relatorio
@@ -0,0 +1,66 @@
+import io
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from pypdf import PdfReader, PdfWriter
+
+from renderizacao import LAYOUT_PADRAO, QUALIDADE_LOGO, reduzir_logo
+
+# Abaixo desta quantidade de etiquetas o custo de iniciar os processos não compensa
+MIN_ETIQUETAS_PARALELO = 2000
+
+
+def dividir_em_lotes(total_etiquetas, etiquetas_por_pagina, workers):
+    """Divide as etiquetas em intervalos (inicio, fim) alinhados às páginas, um por worker"""
+    total_paginas = math.ceil(total_etiquetas / etiquetas_por_pagina)
+    paginas_por_lote = max(1, math.ceil(total_paginas / workers))
+    tamanho_lote = paginas_por_lote * etiquetas_por_pagina
+    return [(inicio, min(inicio + tamanho_lote, total_etiquetas))
+            for inicio in range(0, total_etiquetas, tamanho_lote)]
+
+def renderizar_lote(gerar_etiquetas, tabela, logo_bytes, championship, stage, layout):
+    """Renderiza um lote de etiquetas em um PDF próprio. Executado nos workers."""
+    return gerar_etiquetas(tabela, io.BytesIO(logo_bytes), championship, stage, layout=layout)
+
+def juntar_pdfs(pdfs, destino):
+    """Junta os PDFs dos lotes, na ordem, em um único documento"""
+    writer = PdfWriter()
+    for pdf in pdfs:
+        writer.append(PdfReader(io.BytesIO(pdf)))
+    # Cada lote incorpora a própria cópia da logo e do modelo da etiqueta: mantém só uma
+    writer.compress_identical_objects(remove_identicals=True, remove_orphans=True)
+    writer.write(destino)
+
+def gerar_etiquetas_paralelo(gerar_etiquetas, tabela, logo, championship, stage, workers=None,
+                             layout=None, destino=None, qualidade_logo=QUALIDADE_LOGO):
+    """Renderiza as etiquetas em vários processos e junta o resultado em um único PDF.
+
+    As linhas são divididas em lotes com um número inteiro de páginas, então a ordem
+    e o conteúdo das páginas são os mesmos da renderização serial. "gerar_etiquetas" é a
+    função de criacao_adaptadas ou criacao_nao_adaptadas. Para poucas etiquetas (ou
+    workers=1) a renderização é feita no próprio processo. A logo é reduzida uma única vez,
+    antes de ser enviada aos workers.
+    """
+    layout = layout or LAYOUT_PADRAO
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(tabela) < MIN_ETIQUETAS_PARALELO:
+        return gerar_etiquetas(tabela, logo, championship, stage, destino=destino, layout=layout,
+                               qualidade_logo=qualidade_logo)
+
+    # Nos workers a logo já reduzida passa pela redução sem mudar (já está no tamanho da caixa)
+    logo_bytes = reduzir_logo(logo, layout, qualidade=qualidade_logo).getvalue()
+    lotes = dividir_em_lotes(len(tabela), layout.etiquetas_por_pagina, workers)
+    with ProcessPoolExecutor(max_workers=min(workers, len(lotes))) as executor:
+        futuros = [
+            executor.submit(renderizar_lote, gerar_etiquetas, tabela.iloc[inicio:fim],
+                            logo_bytes, championship, stage, layout)
+            for inicio, fim in lotes
+        ]
+        pdfs = [futuro.result() for futuro in futuros]
+
+    buffer = destino if destino is not None else io.BytesIO()
+    juntar_pdfs(pdfs, buffer)
+    if destino is not None:
+        return destino
+    return buffer.getvalue()
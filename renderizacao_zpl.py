@@ -0,0 +1,176 @@
+"""Saída em ZPL para impressoras térmicas (Zebra e compatíveis), sem passar por PDF.
+
+Cada etiqueta da tabela vira uma etiqueta do rolo, com o tamanho das etiquetas do layout
+escolhido. A logo é convertida uma única vez em um gráfico monocromático guardado na
+impressora (~DG) e as partes fixas (logo, campeonato e etapa) num formato guardado (^DF);
+cada etiqueta só chama esse formato (^XF) e acrescenta as linhas de texto variável.
+O arquivo é gravado em blocos, à medida que as etiquetas são montadas.
+"""
+import html
+import io
+import math
+import re
+from functools import lru_cache
+
+from PIL import Image, ImageOps
+from reportlab.lib.units import inch, mm
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+from diagnostico import etapa
+from renderizacao import (
+    DPI_ZPL, LAYOUT_PADRAO, MAX_TEXTOS_EM_CACHE, PASSO_FONTE, TAMANHO_FONTE, TAMANHO_FONTE_MINIMO,
+    espaco_texto, lote_etiquetas, paragraph_label_style, textos_etiquetas
+)
+
+# Formatos de saída das etiquetas (interface e linha de comando)
+FORMATOS_SAIDA = {
+    'pdf': "PDF (folhas de etiquetas)",
+    'zpl': "ZPL (impressora térmica Zebra)",
+}
+
+# Resoluções de impressora (pontos por polegada) aceitas; a padrão (DPI_ZPL) é a mais comum
+RESOLUCOES_ZPL = (203, 300, 600)
+
+# Nomes dos recursos guardados na memória da impressora (R: = RAM, apagada ao desligar)
+NOME_GRAFICO_LOGO = 'R:LOGO.GRF'
+NOME_FORMATO = 'R:ETIQUETA.ZPL'
+
+# Quantidade de etiquetas montadas antes de cada gravação no destino (e de cada aviso de progresso)
+ETIQUETAS_POR_BLOCO = 2000
+
+# Fonte usada para estimar a largura dos textos (a fonte 0 da impressora é um pouco mais estreita)
+FONTE_MEDIDA = 'Helvetica-Bold'
+
+PADRAO_MARCACAO = re.compile(r'<[^>]+>')
+PADRAO_CARACTERES_COMANDO = re.compile(r'[\^~\\]')
+
+
+def pontos(medida, dpi):
+    """Medida do reportlab (pontos de 1/72") em pontos da impressora"""
+    return round(medida / inch * dpi)
+
+def lote_zpl(tabela):
+    """lote_etiquetas com os valores escapados como em HTML: depois de aplicado o modelo de
+    conteúdo, texto_sem_marcacao tira só a marcação do modelo e os valores voltam exatamente
+    como estão na tabela (mesmo com "<", ">" ou "&" no nome da escola)"""
+    return {
+        coluna: (codigos, [html.escape(texto, quote=False) for texto in textos])
+        for coluna, (codigos, textos) in lote_etiquetas(tabela).items()
+    }
+
+def texto_sem_marcacao(texto):
+    """Texto de uma linha do modelo de conteúdo sem a marcação do reportlab (<b>...)"""
+    return html.unescape(PADRAO_MARCACAO.sub('', texto))
+
+def texto_zpl(texto):
+    """Texto com os caracteres de comando do ZPL (^, ~ e \\) escritos em hexadecimal (usado com ^FH)"""
+    return PADRAO_CARACTERES_COMANDO.sub(lambda m: f"\\{ord(m.group()):02X}", texto)
+
+@lru_cache(maxsize=MAX_TEXTOS_EM_CACHE)
+def texto_ajustado_zpl(texto, largura):
+    """(texto, tamanho) com o maior tamanho de fonte (até TAMANHO_FONTE) em que o texto cabe em
+    uma linha da etiqueta. Se não couber nem no tamanho mínimo, o texto é cortado com "...":
+    cada linha ocupa uma faixa de altura fixa e uma segunda linha invadiria a faixa seguinte."""
+    largura_texto = stringWidth(texto, FONTE_MEDIDA, 1)
+    tamanho = TAMANHO_FONTE
+    while tamanho > TAMANHO_FONTE_MINIMO and largura_texto * tamanho > largura:
+        tamanho -= PASSO_FONTE
+    if largura_texto * tamanho <= largura:
+        return texto, tamanho
+    # Maior começo do texto que cabe junto com as reticências (busca binária no tamanho)
+    menor, maior = 0, len(texto)
+    while menor < maior:
+        meio = (menor + maior + 1) // 2
+        if stringWidth(texto[:meio].rstrip() + "...", FONTE_MEDIDA, tamanho) <= largura:
+            menor = meio
+        else:
+            maior = meio - 1
+    return texto[:menor].rstrip() + "...", tamanho
+
+def campo_texto(texto, y, largura, dpi):
+    """Comandos de um campo de texto (sem marcação) centralizado em uma linha da etiqueta, com o
+    topo em y (pontos da impressora)"""
+    texto, tamanho = texto_ajustado_zpl(texto, largura)
+    convertido = texto_zpl(texto)
+    altura = pontos(tamanho, dpi)
+    # ^FH só nos textos que têm caracteres escritos em hexadecimal (toda barra vem deles)
+    hexadecimal = "^FH\\" if "\\" in convertido else ""
+    return f"^FO0,{y}^A0N,{altura},{altura}^FB{pontos(largura, dpi)},1,0,C{hexadecimal}^FD{convertido}^FS"
+
+@lru_cache(maxsize=8)
+def grafico_logo(conteudo, largura_px, altura_px):
+    """Comando ~DG com a logo em preto e branco (pontilhada), esticada na caixa como no PDF"""
+    imagem = Image.open(io.BytesIO(conteudo))
+    imagem.draft('L', (largura_px, altura_px))
+    imagem = imagem.convert('L').resize((largura_px, altura_px), Image.LANCZOS)
+    # No ZPL o bit 1 é um ponto preto; no modo "1" do PIL é o branco, daí a inversão
+    bits = ImageOps.invert(imagem).convert('1').tobytes()
+    bytes_por_linha = math.ceil(largura_px / 8)
+    return f"~DG{NOME_GRAFICO_LOGO},{len(bits)},{bytes_por_linha},{bits.hex().upper()}\n"
+
+def cabecalho_zpl(layout, logo, championship, stage, dpi):
+    """Gráfico da logo e formato com as partes fixas, enviados uma vez no início do arquivo.
+
+    Retorna os comandos e a altura (em pontos do reportlab) onde começa o texto variável.
+    """
+    largura, altura = layout.largura_etiqueta, layout.altura_etiqueta
+    largura_logo, altura_logo = layout.tamanho_logo
+    grafico = grafico_logo(logo.getvalue(), pontos(largura_logo, dpi), pontos(altura_logo, dpi))
+
+    topo = altura_logo + espaco_texto
+    linhas_fixas = []
+    for texto in (championship, stage):
+        linhas_fixas.append(campo_texto(texto, pontos(topo, dpi), largura, dpi))
+        topo += paragraph_label_style.leading
+    formato = (
+        f"^XA^DF{NOME_FORMATO}^FS\n"
+        f"^CI28^PW{pontos(largura, dpi)}^LL{pontos(altura, dpi)}^LH0,0\n"
+        f"^FO{pontos(1 * mm, dpi)},0^XG{NOME_GRAFICO_LOGO},1,1^FS\n"
+        + "\n".join(linhas_fixas) +
+        "\n^XZ\n"
+    )
+    return grafico + formato, topo
+
+# Geração do arquivo ZPL com as etiquetas (uma etiqueta do rolo por linha da tabela)
+# "linhas_etiqueta" é a mesma função usada no PDF (ver renderizar_etiquetas); cada linha de texto
+# variável ocupa uma faixa fixa da etiqueta e a fonte diminui (ou o texto é cortado) quando o texto
+# não cabe na largura.
+# Se "destino" for informado (arquivo binário aberto, PDFTemporario...), o ZPL é gravado direto nele
+# "progresso", se informado, é chamado a cada bloco com (etiquetas feitas, total)
+def renderizar_zpl(tabela, logo, championship, stage, linhas_etiqueta, layout=None, destino=None, dpi=DPI_ZPL,
+                   progresso=None):
+    layout = layout or LAYOUT_PADRAO
+    buffer = destino if destino is not None else io.BytesIO()
+    largura = layout.largura_etiqueta
+
+    with etapa('zpl') as dados:
+        cabecalho, topo_texto = cabecalho_zpl(layout, logo, championship, stage, dpi)
+        buffer.write(cabecalho.encode('utf-8'))
+
+        # Campos de cada linha de texto variável, montados uma vez por texto distinto
+        linhas = []
+        for numero, (codigos, textos) in enumerate(linhas_etiqueta(lote_zpl(tabela))):
+            y = pontos(topo_texto + numero * paragraph_label_style.leading, dpi)
+            linhas.append((codigos, [campo_texto(texto_sem_marcacao(texto), y, largura, dpi) for texto in textos]))
+
+        inicio_etiqueta = f"^XA^XF{NOME_FORMATO}^FS"
+        bloco = []
+        feitas = 0
+        for campos in textos_etiquetas(linhas):
+            bloco.append(inicio_etiqueta + "".join(campos) + "^XZ\n")
+            if len(bloco) == ETIQUETAS_POR_BLOCO:
+                buffer.write("".join(bloco).encode('utf-8'))
+                feitas += len(bloco)
+                bloco = []
+                if progresso is not None:
+                    progresso(feitas, len(tabela))
+        buffer.write("".join(bloco).encode('utf-8'))
+        if progresso is not None:
+            progresso(len(tabela), len(tabela))
+        dados.update(etiquetas=len(tabela))
+
+    if destino is not None:
+        return destino
+    zpl = buffer.getvalue()
+    buffer.close()
+    return zpl
@@ -0,0 +1,438 @@
+"""Serviço HTTP local para gerar etiquetas a partir de outros programas, sem o Streamlit.
+
+Exemplo:
+    python servidor_etiquetas.py --porta 8502 --workers 2
+
+    curl --data-binary @logo.jpg http://localhost:8502/logos
+        → {"logo": "<hash>"}
+    curl --data-binary @escolas.csv -o etiquetas.pdf \\
+        "http://localhost:8502/etiquetas?tipo=nao-adaptadas&arquivo=escolas.csv&logo=<hash>&campeonato=OBM&etapa=1%C2%AA%20FASE"
+
+Rotas (o corpo dos POST é o próprio arquivo; "arquivo" informa o nome, para saber se é CSV ou XLSX):
+    GET  /saude       situação do serviço e da fila (JSON)
+    POST /logos       guarda a logo (JPEG) e devolve a chave usada nos pedidos de etiquetas
+    POST /detectar    colunas detectadas na planilha (?tipo=&arquivo=), em JSON
+    POST /processar   planilha tratada, em CSV (?tipo=&arquivo=)
+    POST /etiquetas   PDF ou ZPL das etiquetas (?tipo=&arquivo=&logo=&campeonato=&etapa=, e opcionais
+                      layout, envelope, formato, qualidade_logo e dpi)
+
+O processo continua no ar entre os pedidos: logos já reduzidas para cada folha, planilhas já tratadas, textos já
+quebrados em linhas e páginas já renderizadas ficam em memória e são reaproveitados. No máximo
+"workers" pedidos são processados ao mesmo tempo, até "fila" esperam a vez e os demais recebem
+503. Cada resposta informa o tempo de cada etapa no cabeçalho Server-Timing (em milissegundos).
+"""
+import argparse
+import io
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from PIL import Image
+
+from arquivos_pdf import PDFTemporario
+from cache_normalizacao import CAMINHO_PADRAO, CacheNormalizacao
+from diagnostico import coletar
+from gerar_lote import EXTENSOES_ACEITAS, TIPOS
+from processamento import calcular_hash, ler_planilha
+from renderizacao import LAYOUTS, QUALIDADE_LOGO, reduzir_logo
+from renderizacao_incremental import CachePaginas
+from renderizacao_zpl import DPI_ZPL, FORMATOS_SAIDA, RESOLUCOES_ZPL
+from tarefas_pdf import MAX_TAREFAS_SIMULTANEAS
+
+# Pedidos que podem esperar por um worker livre (além dos que estão sendo processados)
+MAX_FILA = 8
+
+# Quantidade de logos (originais e já reduzidas) e de planilhas tratadas mantidas em memória
+MAX_LOGOS = 32
+MAX_LOGOS_REDUZIDAS = 64
+MAX_PLANILHAS = 16
+
+# Tamanho máximo do corpo dos pedidos (planilha ou logo)
+MAX_TAMANHO_CORPO = 64 * 1024 * 1024
+
+TIPOS_CONTEUDO = {
+    'pdf': 'application/pdf',
+    'zpl': 'text/plain; charset=utf-8',
+}
+
+
+class ErroPedido(Exception):
+    """Erro respondido ao cliente com o status HTTP indicado"""
+
+    def __init__(self, status, mensagem):
+        super().__init__(mensagem)
+        self.status = status
+
+
+class CacheLRU:
+    """Dicionário limitado pela quantidade de entradas (descarta a usada há mais tempo), com lock"""
+
+    def __init__(self, max_entradas):
+        self.max_entradas = max_entradas
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._itens)
+
+    def obter(self, chave):
+        with self._lock:
+            if chave not in self._itens:
+                return None
+            self._itens.move_to_end(chave)
+            return self._itens[chave]
+
+    def guardar(self, chave, valor):
+        with self._lock:
+            self._itens[chave] = valor
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_entradas:
+                self._itens.popitem(last=False)
+
+
+def tempos_etapas(registros):
+    """Segundos por etapa registrada (etapas repetidas, como os trechos do PDF, são somadas)"""
+    tempos = {}
+    for registro in registros:
+        tempos[registro['etapa']] = tempos.get(registro['etapa'], 0) + registro['segundos']
+    return tempos
+
+def server_timing(tempos):
+    """Valor do cabeçalho Server-Timing a partir de {etapa: segundos}"""
+    return ", ".join(f"{nome};dur={segundos * 1000:.1f}" for nome, segundos in tempos.items())
+
+
+class ServicoEtiquetas:
+    """Estado compartilhado entre os pedidos: caches e o pool de workers.
+
+    Os pedidos chegam em threads do servidor HTTP, mas o trabalho pesado (leitura,
+    limpeza e renderização) roda no pool, com no máximo "workers" ao mesmo tempo.
+    """
+
+    def __init__(self, workers=MAX_TAREFAS_SIMULTANEAS, max_fila=MAX_FILA, caminho_cache=None):
+        self.workers = workers
+        self.max_fila = max_fila
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='servico-etiquetas')
+        self._vagas = threading.BoundedSemaphore(workers + max_fila)
+        self._lock = threading.Lock()
+        self.pedidos = 0  # na fila ou em andamento
+        self.executando = 0
+        self.logos = CacheLRU(MAX_LOGOS)
+        self.logos_reduzidas = CacheLRU(MAX_LOGOS_REDUZIDAS)
+        self.planilhas = CacheLRU(MAX_PLANILHAS)
+        self.paginas = CachePaginas()
+        self.cache_nomes = CacheNormalizacao(caminho_cache) if caminho_cache else None
+
+    def situacao(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'executando': self.executando,
+                'na_fila': self.pedidos - self.executando,
+                'max_fila': self.max_fila,
+                'logos_em_cache': len(self.logos),
+                'logos_reduzidas_em_cache': len(self.logos_reduzidas),
+                'planilhas_em_cache': len(self.planilhas),
+                'paginas_em_cache': len(self.paginas),
+            }
+
+    def _contar(self, atributo, delta):
+        with self._lock:
+            setattr(self, atributo, getattr(self, atributo) + delta)
+
+    def executar(self, funcao, *args):
+        """Executa funcao(*args) no pool e retorna (resultado, {etapa: segundos}).
+
+        Sem vaga no pool nem na fila, o pedido é recusado na hora (503).
+        """
+        if not self._vagas.acquire(blocking=False):
+            raise ErroPedido(503, "Serviço ocupado: fila cheia, tente novamente em instantes.")
+        recebido = time.perf_counter()
+
+        def tarefa():
+            inicio = time.perf_counter()
+            self._contar('executando', 1)
+            try:
+                with coletar() as registros:
+                    resultado = funcao(*args)
+            finally:
+                self._contar('executando', -1)
+            return resultado, {'fila': inicio - recebido, **tempos_etapas(registros)}
+
+        self._contar('pedidos', 1)
+        try:
+            resultado, tempos = self.executor.submit(tarefa).result()
+        finally:
+            self._contar('pedidos', -1)
+            self._vagas.release()
+        tempos['total'] = time.perf_counter() - recebido
+        return resultado, tempos
+
+    # --- Etapas do processamento (executadas no pool) ---
+
+    def guardar_logo(self, conteudo):
+        """Confere a imagem e guarda a logo; retorna a chave usada nos pedidos de etiquetas"""
+        try:
+            formato = Image.open(io.BytesIO(conteudo)).format
+        except Exception:
+            formato = None
+        if formato != 'JPEG':
+            raise ErroPedido(400, "A logo deve ser uma imagem JPEG.")
+        chave = calcular_hash(conteudo)
+        self.logos.guardar(chave, conteudo)
+        return chave
+
+    def logo_original(self, logo):
+        """JPEG enviado em POST /logos (usado no ZPL, que converte a logo para a resolução da impressora)"""
+        conteudo = self.logos.obter(logo)
+        if conteudo is None:
+            raise ErroPedido(404, "Logo não encontrada: envie a imagem em POST /logos e use a chave devolvida.")
+        return conteudo
+
+    def logo_reduzida(self, logo, layout, qualidade_logo):
+        """JPEG da logo já decodificado e reduzido para a caixa da folha, uma vez por logo, folha e qualidade.
+
+        Na renderização a redução não muda mais nada (a imagem já cabe na caixa) e o reportlab
+        só lê o cabeçalho do JPEG. O ImageReader em si não é guardado: ele envolve um arquivo
+        que o reportlab posiciona e lê durante o desenho, e os pedidos rodam em threads.
+        """
+        chave = (logo, layout, qualidade_logo)
+        reduzida = self.logos_reduzidas.obter(chave)
+        if reduzida is None:
+            original = self.logo_original(logo)
+            reduzida = reduzir_logo(io.BytesIO(original), LAYOUTS[layout], qualidade=qualidade_logo).getvalue()
+            self.logos_reduzidas.guardar(chave, reduzida)
+        return reduzida
+
+    def detectar(self, tipo, nome_arquivo, conteudo):
+        """Mapeamento {coluna da planilha: coluna das etiquetas}"""
+        detectar, _, _ = TIPOS[tipo]
+        mapeamento, erro = detectar(ler_planilha(io.BytesIO(conteudo), nome_arquivo))
+        if erro:
+            raise ErroPedido(422, erro)
+        return mapeamento
+
+    def processar(self, tipo, nome_arquivo, conteudo):
+        """Planilha tratada, em cache pelo conteúdo (e pela versão das correções manuais)"""
+        detectar, processar, _ = TIPOS[tipo]
+        versao = self.cache_nomes.versao() if self.cache_nomes is not None else None
+        chave = (tipo, calcular_hash(conteudo), versao)
+        df = self.planilhas.obter(chave)
+        if df is None:
+            df, erro = processar(ler_planilha(io.BytesIO(conteudo), nome_arquivo, detectar), cache=self.cache_nomes)
+            if erro:
+                raise ErroPedido(422, erro)
+            if df.empty:
+                raise ErroPedido(422, "Não há dados válidos na planilha!")
+            self.planilhas.guardar(chave, df)
+        return df
+
+    def gerar(self, tipo, nome_arquivo, conteudo, logo, championship, stage, layout, capacidade_envelope,
+              formato, qualidade_logo, dpi):
+        """(arquivo, cabeçalhos extras) com o PDF ou o ZPL das etiquetas, em um PDFTemporario"""
+        if formato == 'zpl':
+            logo_bytes = self.logo_original(logo)
+        else:
+            logo_bytes = self.logo_reduzida(logo, layout, qualidade_logo)
+        df = self.processar(tipo, nome_arquivo, conteudo)
+        criacao = TIPOS[tipo][2]
+        if formato == 'zpl':
+            arquivo = criacao.gerar_etiquetas_zpl(df, io.BytesIO(logo_bytes), championship, stage,
+                                                  destino=PDFTemporario(), layout=LAYOUTS[layout],
+                                                  capacidade_envelope=capacidade_envelope, dpi=dpi)
+            return arquivo, {'X-Escolas': df['NOME ESCOLA'].nunique()}
+        # Só as páginas que mudaram desde pedidos anteriores são renderizadas
+        arquivo, relatorio = criacao.gerar_etiquetas_incremental(
+            df, io.BytesIO(logo_bytes), championship, stage, self.paginas, destino=PDFTemporario(),
+            layout=LAYOUTS[layout], capacidade_envelope=capacidade_envelope, qualidade_logo=qualidade_logo
+        )
+        return arquivo, {
+            'X-Escolas': df['NOME ESCOLA'].nunique(),
+            'X-Paginas': relatorio['total_paginas'],
+            'X-Paginas-Renderizadas': len(relatorio['paginas_renderizadas']),
+        }
+
+
+def parametro(consulta, nome, padrao=None, converter=str, opcoes=None, minimo=None):
+    """Valor de um parâmetro da URL, convertido e validado (ErroPedido 400 se inválido)"""
+    valores = consulta.get(nome)
+    if not valores or not valores[0].strip():
+        if padrao is None:
+            raise ErroPedido(400, f"Parâmetro obrigatório ausente: {nome}")
+        return padrao
+    try:
+        valor = converter(valores[0].strip())
+    except ValueError:
+        raise ErroPedido(400, f"Valor inválido para {nome}: {valores[0]}")
+    if opcoes is not None and valor not in opcoes:
+        raise ErroPedido(400, f"Valor inválido para {nome}: {valor} (opções: {', '.join(map(str, opcoes))})")
+    if minimo is not None and valor < minimo:
+        raise ErroPedido(400, f"Valor inválido para {nome}: {valor} (mínimo: {minimo})")
+    return valor
+
+
+class ManipuladorEtiquetas(BaseHTTPRequestHandler):
+    """Rotas do serviço. "servico" é definido em criar_servidor."""
+
+    servico = None
+    protocol_version = 'HTTP/1.1'
+    server_version = 'EtiquetasProvas/1.0'
+
+    def do_GET(self):
+        if urlsplit(self.path).path != '/saude':
+            self._responder_erro(ErroPedido(404, "Rota não encontrada."))
+            return
+        self._responder_json(200, {'status': 'ok', **self.servico.situacao()})
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        rotas = {
+            '/logos': self._logos,
+            '/detectar': self._detectar,
+            '/processar': self._processar,
+            '/etiquetas': self._etiquetas,
+        }
+        try:
+            if url.path not in rotas:
+                raise ErroPedido(404, "Rota não encontrada.")
+            rotas[url.path](parse_qs(url.query), self._ler_corpo())
+        except ErroPedido as e:
+            self._responder_erro(e)
+        except Exception as e:
+            self._responder_erro(ErroPedido(500, f"Erro ao processar o pedido: {e}"))
+
+    # --- Rotas ---
+
+    def _logos(self, consulta, corpo):
+        chave, tempos = self.servico.executar(self.servico.guardar_logo, corpo)
+        self._responder_json(200, {'logo': chave}, tempos)
+
+    def _detectar(self, consulta, corpo):
+        mapeamento, tempos = self.servico.executar(self.servico.detectar, *self._planilha(consulta), corpo)
+        self._responder_json(200, {'mapeamento': mapeamento}, tempos)
+
+    def _processar(self, consulta, corpo):
+        def processar_csv(tipo, nome_arquivo, conteudo):
+            return self.servico.processar(tipo, nome_arquivo, conteudo).to_csv(index=False).encode('utf-8')
+
+        csv, tempos = self.servico.executar(processar_csv, *self._planilha(consulta), corpo)
+        self._responder(200, 'text/csv; charset=utf-8', csv, tempos)
+
+    def _etiquetas(self, consulta, corpo):
+        tipo, nome_arquivo = self._planilha(consulta)
+        formato = parametro(consulta, 'formato', 'pdf', opcoes=FORMATOS_SAIDA)
+        argumentos = (
+            tipo, nome_arquivo, corpo,
+            parametro(consulta, 'logo'),
+            parametro(consulta, 'campeonato').upper(),
+            parametro(consulta, 'etapa').upper(),
+            parametro(consulta, 'layout', 'padrao', opcoes=LAYOUTS),
+            parametro(consulta, 'envelope', 0, int, minimo=0),
+            formato,
+            parametro(consulta, 'qualidade_logo', QUALIDADE_LOGO, int, opcoes=range(1, 96)),
+            parametro(consulta, 'dpi', DPI_ZPL, int, opcoes=RESOLUCOES_ZPL),
+        )
+        (arquivo, extras), tempos = self.servico.executar(self.servico.gerar, *argumentos)
+        try:
+            self._responder_arquivo(arquivo, TIPOS_CONTEUDO[formato], f"etiquetas.{formato}", tempos, extras)
+        finally:
+            arquivo.close()
+
+    # --- Entrada e saída ---
+
+    def _planilha(self, consulta):
+        tipo = parametro(consulta, 'tipo', opcoes=TIPOS)
+        nome_arquivo = parametro(consulta, 'arquivo')
+        if not nome_arquivo.lower().endswith(EXTENSOES_ACEITAS):
+            raise ErroPedido(400, f"A planilha deve ser {' ou '.join(EXTENSOES_ACEITAS)}.")
+        return tipo, nome_arquivo
+
+    def _ler_corpo(self):
+        try:
+            tamanho = int(self.headers.get('Content-Length', 0))
+        except ValueError:
+            raise ErroPedido(400, "Content-Length inválido.")
+        if tamanho <= 0:
+            raise ErroPedido(400, "O corpo do pedido deve conter o arquivo.")
+        if tamanho > MAX_TAMANHO_CORPO:
+            raise ErroPedido(413, f"Arquivo maior que {MAX_TAMANHO_CORPO // (1024 * 1024)} MB.")
+        return self.rfile.read(tamanho)
+
+    def _enviar_cabecalhos(self, status, tipo_conteudo, tamanho, tempos=None, extras=None):
+        self.send_response(status)
+        self.send_header('Content-Type', tipo_conteudo)
+        self.send_header('Content-Length', str(tamanho))
+        if tempos:
+            self.send_header('Server-Timing', server_timing(tempos))
+        for nome, valor in (extras or {}).items():
+            self.send_header(nome, str(valor))
+        self.end_headers()
+
+    def _responder(self, status, tipo_conteudo, conteudo, tempos=None, extras=None):
+        self._enviar_cabecalhos(status, tipo_conteudo, len(conteudo), tempos, extras)
+        self.wfile.write(conteudo)
+
+    def _responder_json(self, status, dados, tempos=None):
+        self._responder(status, 'application/json; charset=utf-8',
+                        json.dumps(dados, ensure_ascii=False, default=str).encode('utf-8'), tempos)
+
+    def _responder_erro(self, erro):
+        extras = {'Retry-After': 5} if erro.status == 503 else None
+        conteudo = json.dumps({'erro': str(erro)}, ensure_ascii=False).encode('utf-8')
+        # O corpo de um pedido recusado pode não ter sido lido: a conexão não é reaproveitada
+        self.close_connection = True
+        self._enviar_cabecalhos(erro.status, 'application/json; charset=utf-8', len(conteudo),
+                                extras={**(extras or {}), 'Connection': 'close'})
+        self.wfile.write(conteudo)
+
+    def _responder_arquivo(self, arquivo, tipo_conteudo, nome, tempos, extras):
+        """Envia o arquivo em blocos, sem montá-lo inteiro em bytes"""
+        extras = {'Content-Disposition': f'attachment; filename="{nome}"', **extras}
+        self._enviar_cabecalhos(200, tipo_conteudo, arquivo.tamanho, tempos, extras)
+        try:
+            for bloco in arquivo.blocos():
+                self.wfile.write(bloco)
+        except ConnectionError:
+            self.close_connection = True  # o cliente desistiu do download
+
+
+def criar_servidor(host='127.0.0.1', porta=8502, workers=MAX_TAREFAS_SIMULTANEAS, max_fila=MAX_FILA,
+                   caminho_cache=None):
+    """Servidor HTTP (uma thread por conexão) ligado a um ServicoEtiquetas novo"""
+    manipulador = type('Manipulador', (ManipuladorEtiquetas,), {
+        'servico': ServicoEtiquetas(workers, max_fila, caminho_cache)
+    })
+    return ThreadingHTTPServer((host, porta), manipulador)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serviço HTTP local para gerar etiquetas de provas.")
+    parser.add_argument('--host', default='127.0.0.1', help="Endereço de escuta (padrão: só a máquina local)")
+    parser.add_argument('--porta', type=int, default=8502, help="Porta HTTP")
+    parser.add_argument('--workers', type=int, default=MAX_TAREFAS_SIMULTANEAS,
+                        help="Pedidos processados ao mesmo tempo")
+    parser.add_argument('--fila', type=int, default=MAX_FILA,
+                        help="Pedidos que podem esperar por um worker (os demais recebem 503)")
+    parser.add_argument('--cache-nomes', nargs='?', const=CAMINHO_PADRAO, default=None, metavar='ARQUIVO',
+                        help="Usa o cache persistente de nomes/anos padronizados (e as correções manuais) "
+                             f"[padrão: {CAMINHO_PADRAO}]")
+    args = parser.parse_args(argv)
+
+    servidor = criar_servidor(args.host, args.porta, max(1, args.workers), max(0, args.fila), args.cache_nomes)
+    print(f"Serviço de etiquetas em http://{args.host}:{args.porta} "
+          f"({args.workers} worker(s), fila de {args.fila})")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+        servidor.RequestHandlerClass.servico.executor.shutdown(cancel_futures=True)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
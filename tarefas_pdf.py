@@ -0,0 +1,143 @@
+import contextvars
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from diagnostico import coletar, medindo_memoria
+
+# Quantidade de PDFs gerados ao mesmo tempo (os demais esperam na fila) no servidor HTTP
+MAX_TAREFAS_SIMULTANEAS = 2
+
+# Na interface, uma thread só: a renderização é Python puro e segura o GIL, então uma segunda
+# thread não gera mais PDFs por segundo e só tira tempo das execuções do script das sessões
+# (que ficam lentas para responder). A vazão total é a mesma; a interface continua responsiva.
+THREADS_INTERFACE = 1
+
+# Quantidade de tarefas terminadas mantidas para reaproveitar o resultado
+MAX_TAREFAS_CONCLUIDAS = 16
+
+NA_FILA = 'na_fila'
+EXECUTANDO = 'executando'
+CONCLUIDA = 'concluida'
+CANCELADA = 'cancelada'
+ERRO = 'erro'
+
+
+class RenderizacaoCancelada(Exception):
+    """Interrompe a renderização de uma tarefa cancelada"""
+
+
+class TarefaPDF:
+    """Geração de um PDF em segundo plano, com progresso (etiquetas feitas / total) e cancelamento"""
+
+    def __init__(self, chave):
+        self.chave = chave
+        self.status = NA_FILA
+        self.feitas = 0
+        self.total = 0
+        self.resultado = None
+        self.erro = None
+        self.registros = []  # etapas medidas durante a geração (painel de diagnóstico)
+        self.sessoes = set()  # sessões interessadas no resultado (ver FilaTarefas.sair)
+        self._cancelar = threading.Event()
+        self.futuro = None
+
+    @property
+    def terminada(self):
+        return self.status in (CONCLUIDA, CANCELADA, ERRO)
+
+    @property
+    def fracao(self):
+        return self.feitas / self.total if self.total else 0.0
+
+    def progresso(self, feitas, total):
+        """Chamado pela renderização a cada página; interrompe a tarefa se ela foi cancelada"""
+        if self._cancelar.is_set():
+            raise RenderizacaoCancelada()
+        self.feitas, self.total = feitas, total
+
+    def cancelar(self):
+        self._cancelar.set()
+        if self.futuro is not None and self.futuro.cancel():
+            self.status = CANCELADA
+
+    def executar(self, funcao, args, kwargs):
+        if self._cancelar.is_set():
+            self.status = CANCELADA
+            return
+        self.status = EXECUTANDO
+        try:
+            with coletar(memoria=medindo_memoria()) as self.registros:
+                self.resultado = funcao(*args, progresso=self.progresso, **kwargs)
+            self.status = CONCLUIDA
+        except RenderizacaoCancelada:
+            self.status = CANCELADA
+        except Exception as e:
+            self.erro = str(e)
+            self.status = ERRO
+
+
+class FilaTarefas:
+    """Fila de geração de PDFs em threads, compartilhada entre as sessões do Streamlit.
+
+    Cada tarefa é identificada por uma chave (dados, logo, campeonato, etapa, folha):
+    pedidos com a mesma chave reaproveitam a tarefa em andamento ou o resultado pronto.
+    Cada sessão que pede uma tarefa fica inscrita nela; uma sessão que cancela ou muda os
+    dados só sai da tarefa, que é interrompida quando a última sessão inscrita sai.
+    As tarefas terminadas mais antigas são descartadas além de MAX_TAREFAS_CONCLUIDAS.
+    """
+
+    def __init__(self, workers=THREADS_INTERFACE, max_concluidas=MAX_TAREFAS_CONCLUIDAS):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='tarefa-pdf')
+        self.max_concluidas = max_concluidas
+        self._tarefas = OrderedDict()
+        self._lock = threading.Lock()
+
+    def enviar(self, sessao, chave, funcao, *args, **kwargs):
+        """Inscreve "sessao" na tarefa com essa chave, agendando funcao(*args, progresso=..., **kwargs)
+        se ainda não houver uma"""
+        with self._lock:
+            tarefa = self._tarefas.get(chave)
+            if tarefa is not None:
+                tarefa.sessoes.add(sessao)
+                self._tarefas.move_to_end(chave)
+                return tarefa
+            tarefa = TarefaPDF(chave)
+            tarefa.sessoes.add(sessao)
+            self._tarefas[chave] = tarefa
+            self._descartar_antigas()
+        # A tarefa roda com uma cópia do contexto de quem a enviou (coleta de diagnóstico ativa,
+        # medição de memória); as etapas medidas ficam em tarefa.registros
+        contexto = contextvars.copy_context()
+        tarefa.futuro = self.executor.submit(contexto.run, tarefa.executar, funcao, args, kwargs)
+        return tarefa
+
+    def obter(self, chave):
+        with self._lock:
+            return self._tarefas.get(chave)
+
+    def sair(self, chave, sessao):
+        """Tira "sessao" da tarefa. Se era a última sessão inscrita e a tarefa não terminou, ela é
+        cancelada e removida (um novo pedido com a mesma chave recomeça). Retorna True nesse caso."""
+        with self._lock:
+            tarefa = self._tarefas.get(chave)
+            if tarefa is None:
+                return False
+            tarefa.sessoes.discard(sessao)
+            if tarefa.sessoes or tarefa.terminada:
+                return False
+            del self._tarefas[chave]
+        tarefa.cancelar()
+        return True
+
+    def descartar(self, chave):
+        """Remove a tarefa (ex.: cancelada) para que um novo pedido com a mesma chave recomece"""
+        with self._lock:
+            tarefa = self._tarefas.pop(chave, None)
+        if tarefa is not None:
+            tarefa.cancelar()
+
+    def _descartar_antigas(self):
+        terminadas = [chave for chave, tarefa in self._tarefas.items() if tarefa.terminada]
+        for chave in terminadas[:max(0, len(terminadas) - self.max_concluidas)]:
+            del self._tarefas[chave]
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Os módulos do app ficam na raiz do repositório (sem pacote); os geradores de planilhas e
+# nomes sintéticos, em benchmarks/
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.join(RAIZ, 'benchmarks'))
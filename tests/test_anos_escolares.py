@@ -0,0 +1,67 @@
+import random
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from processamento import ajustar_nome_ano_escolar, normalizar_anos_escolares
+
+
+def anos_escolares_loop_antigo(df_mapeado):
+    """Laço original de processar_adaptadas (iterrows + df.loc), mantido como referência"""
+    df_mapeado = df_mapeado.copy()
+    df_mapeado['ANO ESCOLAR'] = df_mapeado['ANO ESCOLAR'].astype(str).str.strip()
+
+    for idx, row in df_mapeado.iterrows():
+        ano_escolar = str(row['ANO ESCOLAR']).upper().strip()
+
+        # EJAI: adicionar ª e ETAPA
+        if 'EJAI' in ano_escolar:
+            if 'ETAPA' not in ano_escolar:
+                if re.search(r'\b\d+\b', ano_escolar) and not re.search(r'\d+[ªº°]', ano_escolar):
+                    ano_escolar = re.sub(r'\b(\d+)\b', r'\1ª', ano_escolar)
+                ano_escolar = ano_escolar + ' ETAPA'
+            df_mapeado.loc[idx, 'ANO ESCOLAR'] = ano_escolar
+
+        # EJA (sem I): manter exatamente como está
+        elif 'EJA' in ano_escolar:
+            df_mapeado.loc[idx, 'ANO ESCOLAR'] = ano_escolar
+
+        # Anos normais: garantir º no número e ANO no final
+        else:
+            # Adicionar º se o número estiver sem ele
+            if re.search(r'\b\d+\b', ano_escolar) and not re.search(r'\d+[ªº°]', ano_escolar):
+                ano_escolar = re.sub(r'\b(\d+)\b', r'\1º', ano_escolar)
+            # Adicionar ANO se não tiver
+            if 'ANO' not in ano_escolar:
+                ano_escolar = ano_escolar + ' ANO'
+            df_mapeado.loc[idx, 'ANO ESCOLAR'] = ano_escolar
+    return df_mapeado['ANO ESCOLAR']
+
+VALORES = [
+    "1", "2º", "3º ANO", "4", "5º", "6 ano", " 7º ", "8", "9º ANO", "ano 10", "1° ano", "EJAI 1", "EJAI 2ª",
+    "ejai 3 etapa", "EJAI", "EJA 1ª ETAPA", "eja 2", "EJA", "", "  ", "PRÉ", "multisseriada 1 e 2",
+    "1ª", "EJAI 12", "5ºANO", "٣", "EJAI ٢", "1,5", 3, 4.0, None, np.nan,
+]
+
+def valores_aleatorios(quantidade, semente):
+    rng = random.Random(semente)
+    pedacos = ["EJAI", "EJA", "ETAPA", "ANO", "ano", "ª", "º", "°", " ", "-", "1", "2", "10", "٣", "PRÉ", "x"]
+    return ["".join(rng.choice(pedacos) for _ in range(rng.randint(0, 5))) for _ in range(quantidade)]
+
+@pytest.mark.parametrize('valores', [VALORES, valores_aleatorios(2000, 0), valores_aleatorios(2000, 1)])
+def test_adaptadas_igual_ao_laco_antigo(valores):
+    anos = pd.Series(valores, dtype=object, name='ANO ESCOLAR')
+    esperado = anos_escolares_loop_antigo(pd.DataFrame({'ANO ESCOLAR': anos}))
+    # Mesma entrada de processar_adaptadas
+    obtido = normalizar_anos_escolares(anos.astype(str), adaptadas=True)
+    assert obtido.tolist() == esperado.tolist()
+
+@pytest.mark.parametrize('valores', [VALORES, valores_aleatorios(2000, 2)])
+def test_nao_adaptadas_igual_ao_apply(valores):
+    anos = pd.Series(valores, dtype=object, name='ANO ESCOLAR')
+    esperado = anos.apply(ajustar_nome_ano_escolar)
+    obtido = normalizar_anos_escolares(anos)
+    assert obtido.isna().tolist() == esperado.isna().tolist()
+    assert obtido[obtido.notna()].tolist() == esperado[esperado.notna()].tolist()
@@ -0,0 +1,42 @@
+import sqlite3
+
+import pandas as pd
+
+from cache_normalizacao import ESCOLA, CacheNormalizacao
+from processamento import limpar_nomes_escolas
+
+
+def test_chaves_sem_diferenciar_maiusculas_e_espacos(tmp_path):
+    cache = CacheNormalizacao(str(tmp_path / 'cache.sqlite3'))
+    cache.corrigir(ESCOLA, "Escola Peixe-Boi", "ESCOLA MUNICIPAL PEIXE-BOI")
+    valores = pd.Series(["ESCOLA PEIXE-BOI", "  escola peixe-boi ", "Escola Peixe-Boi", "OUTRA ESCOLA"])
+    resultado = cache.normalizar(valores, ESCOLA, limpar_nomes_escolas)
+    assert resultado.tolist()[:3] == ["ESCOLA MUNICIPAL PEIXE-BOI"] * 3
+
+    cache.remover_correcao(ESCOLA, " ESCOLA PEIXE-BOI")
+    assert cache.correcoes().empty
+
+def test_valores_automaticos_reaproveitados(tmp_path):
+    cache = CacheNormalizacao(str(tmp_path / 'cache.sqlite3'))
+    chamadas = []
+
+    def limpar(valores):
+        chamadas.append(list(valores))
+        return limpar_nomes_escolas(valores)
+
+    cache.normalizar(pd.Series(["Escola A"]), ESCOLA, limpar)
+    resultado = cache.normalizar(pd.Series(["ESCOLA A ", "escola a"]), ESCOLA, limpar)
+    assert chamadas == [["Escola A"]]
+    assert resultado.tolist() == ["ESCOLA A", "ESCOLA A"]
+
+def test_nova_versao_das_regras_mantem_so_as_correcoes(tmp_path):
+    caminho = str(tmp_path / 'cache.sqlite3')
+    cache = CacheNormalizacao(caminho, versao_regras=1)
+    cache.guardar(ESCOLA, {"Escola A": "ESCOLA A"})
+    cache.corrigir(ESCOLA, "Escola B", "ESCOLA BETA")
+    # Correção gravada antes das chaves sem maiúsculas
+    with sqlite3.connect(caminho) as conexao:
+        conexao.execute("UPDATE normalizacoes SET original = 'Escola B' WHERE manual = 1")
+
+    cache = CacheNormalizacao(caminho, versao_regras=2)
+    assert cache.consultar(ESCOLA, ["Escola A", "ESCOLA B"]) == {"ESCOLA B": "ESCOLA BETA"}
@@ -0,0 +1,49 @@
+import threading
+import tracemalloc
+
+import pytest
+
+from diagnostico import coletar, etapa
+
+
+@pytest.fixture
+def desligar_tracemalloc():
+    """O diagnóstico deixa o tracemalloc ligado; desligado depois do teste para não deixar
+    os outros testes lentos"""
+    yield
+    tracemalloc.stop()
+
+def test_etapas_aninhadas_e_simultaneas_com_memoria(desligar_tracemalloc):
+    def medir_em_outra_thread():
+        with coletar(memoria=True) as registros:
+            with etapa('thread'):
+                bytearray(1_000_000)
+        resultados.extend(registros)
+
+    resultados = []
+    with coletar(memoria=True) as registros:
+        with etapa('externa'):
+            dados = bytearray(2_000_000)
+            with etapa('interna'):
+                outros = bytearray(1_000_000)
+            thread = threading.Thread(target=medir_em_outra_thread)
+            thread.start()
+            thread.join()
+            # Nem a etapa interna nem a da outra thread desligam a medição
+            assert tracemalloc.is_tracing()
+
+    interna, externa = registros
+    assert (interna['etapa'], externa['etapa']) == ('interna', 'externa')
+    assert interna['memoria_mb'] >= 0.9
+    assert externa['memoria_mb'] >= interna['memoria_mb'] + 1.9
+    assert externa['pico_processo_mb'] >= externa['memoria_mb']
+    assert resultados[0]['etapa'] == 'thread'
+    assert tracemalloc.is_tracing()
+    del dados, outros
+
+def test_sem_memoria_nao_mede():
+    with coletar() as registros:
+        with etapa('simples', linhas=10):
+            pass
+    assert 'memoria_mb' not in registros[0]
+    assert registros[0]['linhas'] == 10
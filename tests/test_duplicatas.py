@@ -0,0 +1,66 @@
+import time
+from difflib import SequenceMatcher
+
+import pytest
+
+from duplicatas import (
+    PADRAO_NUMEROS, SIMILARIDADE_MINIMA, agrupar_duplicatas, duplicatas_certas, normalizar_para_comparacao
+)
+from planilhas_sinteticas import nomes_com_erros, nomes_escolas_realistas
+
+# A versão com o índice só de trigramas levava de 6 a 14 s com 3.000 nomes realistas
+SEGUNDOS_MAXIMOS = 5
+
+
+def grupo_de(grupos):
+    return {nome: i for i, grupo in enumerate(grupos) for nome in grupo}
+
+def similaridades(nome, outro):
+    """Critério de agrupar_duplicatas aplicado ao par, nas duas ordens (o ratio do difflib não é
+    simétrico); 0 se os números dos nomes forem diferentes"""
+    a, b = normalizar_para_comparacao(nome), normalizar_para_comparacao(outro)
+    if PADRAO_NUMEROS.findall(a) != PADRAO_NUMEROS.findall(b):
+        return 0, 0
+    return SequenceMatcher(None, a, b).ratio(), SequenceMatcher(None, b, a).ratio()
+
+@pytest.mark.parametrize('palavras', [800, 32])
+def test_erros_de_digitacao_em_nomes_realistas(palavras):
+    nomes = nomes_escolas_realistas(3000, palavras)
+    pares = [par for par in nomes_com_erros(nomes, 200) if min(similaridades(*par)) >= SIMILARIDADE_MINIMA]
+
+    inicio = time.perf_counter()
+    grupos = agrupar_duplicatas(nomes + [variante for _, variante in pares])
+    assert time.perf_counter() - inicio < SEGUNDOS_MAXIMOS
+
+    grupos_por_nome = grupo_de(grupos)
+    achados = sum(1 for nome, variante in pares
+                  if nome in grupos_por_nome and grupos_por_nome[nome] == grupos_por_nome.get(variante))
+    assert achados >= 0.95 * len(pares)
+
+def test_grupos_so_tem_nomes_parecidos():
+    nomes = nomes_escolas_realistas(1000, 800)
+    for grupo in agrupar_duplicatas(nomes + [variante for _, variante in nomes_com_erros(nomes, 50)]):
+        # Cada nome do grupo é parecido com pelo menos outro nome do grupo
+        for nome in grupo:
+            assert any(max(similaridades(nome, outro)) >= SIMILARIDADE_MINIMA for outro in grupo if outro != nome)
+
+@pytest.mark.parametrize('nome, variante', [
+    ("ESCOLA ESTADUAL PROFESSORA MARIA JOSÉ DA SILVA", "ESCOLA ESTADUAL PROFESSORA MARIA JOSE DA SILVA"),
+    ("ESCOLA ESTADUAL PROFESSORA MARIA JOSÉ DA SILVA", "ESCOLA ESTADUAL PROFESSORA MARIA JOSÉ SILVA"),
+    ("CENTRO DE EDUCAÇÃO INFANTIL PEIXE-BOI", "CENTRO DE EDUCACAO INFANTIL PEIXE BOI"),
+    ("COLÉGIO ESTADUAL DOM PEDRO II", "COLEGIO ESTADUAL DOM PEDRO LI"),
+    ("CRECHE MUNICIPAL LUIZ ANTÔNIO", "CRECHE MUNICIPAL LUIZA NTONIO"),
+])
+def test_variantes_agrupadas(nome, variante):
+    outros = nomes_escolas_realistas(500, 32, semente=1)
+    grupos_por_nome = grupo_de(agrupar_duplicatas(outros + [nome, variante]))
+    assert grupos_por_nome.get(nome) is not None
+    assert grupos_por_nome[nome] == grupos_por_nome.get(variante)
+
+def test_numeros_diferentes_nao_agrupam():
+    grupos = agrupar_duplicatas(["ESCOLA MUNICIPAL 12 DE OUTUBRO", "ESCOLA MUNICIPAL 13 DE OUTUBRO"])
+    assert grupos == []
+
+def test_duplicatas_certas():
+    assert duplicatas_certas(["PEIXE-BOI", "PEIXE BOI", "Peixe  Boi"])
+    assert not duplicatas_certas(["MARIA JOSÉ DA SILVA", "MARIA JOSÉ SILVA"])
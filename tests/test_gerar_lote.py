@@ -0,0 +1,29 @@
+import io
+
+import pandas as pd
+from PIL import Image
+
+from gerar_lote import main
+
+CSV = (
+    "Qual é o nome da sua escola?,Total de alunos do 1º ano da MANHÃ\n"
+    "EMEF PEIXE-BOI,25\n"
+    "ESCOLA MUNICIPAL JOSÉ,12\n"
+)
+
+
+def test_csv_tratado_nao_sobrescreve_a_planilha(tmp_path):
+    (tmp_path / 'escolas.csv').write_text(CSV, encoding='utf-8')
+    logo = io.BytesIO()
+    Image.new('RGB', (400, 120), (30, 30, 200)).save(logo, 'JPEG')
+    (tmp_path / 'logo.jpg').write_bytes(logo.getvalue())
+
+    # Saída na própria pasta das planilhas
+    codigo = main([str(tmp_path / '*.csv'), '--logo', str(tmp_path / 'logo.jpg'), '--campeonato', 'C',
+                   '--etapa', 'E', '--saida', str(tmp_path), '--workers', '1', '--csv'])
+    assert codigo == 0
+    assert (tmp_path / 'escolas.csv').read_text(encoding='utf-8') == CSV
+    assert (tmp_path / 'escolas.pdf').read_bytes().startswith(b'%PDF')
+    tratada = pd.read_csv(tmp_path / 'escolas_tratada.csv')
+    assert list(tratada.columns) == ['NOME ESCOLA', 'ANO ESCOLAR', 'TOTAL']
+    assert len(tratada) == 2
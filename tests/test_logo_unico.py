@@ -0,0 +1,44 @@
+import io
+import re
+
+import pandas as pd
+from PIL import Image
+from pypdf import PdfReader
+
+import criacao_adaptadas
+import criacao_nao_adaptadas
+from renderizacao import LAYOUT_PADRAO
+
+
+def logo_jpeg():
+    saida = io.BytesIO()
+    Image.new('RGB', (400, 120), (200, 30, 30)).save(saida, 'JPEG')
+    return io.BytesIO(saida.getvalue())
+
+def quantidade_imagens(pdf):
+    return len(re.findall(rb'/Subtype\s*/Image\b', pdf))
+
+def quantidade_paginas(pdf):
+    return len(PdfReader(io.BytesIO(pdf)).pages)
+
+def test_logo_incorporada_uma_vez_nao_adaptadas():
+    etiquetas = 5 * LAYOUT_PADRAO.etiquetas_por_pagina + 3  # seis páginas
+    tabela = pd.DataFrame({
+        'NOME ESCOLA': [f"ESCOLA {i % 7}" for i in range(etiquetas)],
+        'ANO ESCOLAR': ['5º ANO'] * etiquetas,
+        'TOTAL': [10] * etiquetas,
+    })
+    pdf = criacao_nao_adaptadas.gerar_etiquetas(tabela, logo_jpeg(), 'CAMPEONATO', 'ETAPA')
+    assert quantidade_paginas(pdf) == 6
+    assert quantidade_imagens(pdf) == 1
+
+def test_logo_incorporada_uma_vez_adaptadas_com_envelopes():
+    tabela = pd.DataFrame({
+        'NOME ESCOLA': ['ESCOLA A', 'ESCOLA B', 'ESCOLA C'],
+        'CATEGORIA': ['TEA', 'DV', 'DA'],
+        'ANO ESCOLAR': ['5º ANO', '6º ANO', '7º ANO'],
+        'TOTAL': [100, 75, 40],
+    })
+    pdf = criacao_adaptadas.gerar_etiquetas(tabela, logo_jpeg(), 'CAMPEONATO', 'ETAPA', capacidade_envelope=5)
+    assert quantidade_paginas(pdf) == 5  # 20 + 15 + 8 envelopes
+    assert quantidade_imagens(pdf) == 1
@@ -0,0 +1,68 @@
+import random
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from processamento import SIGLAS_PARA_REMOVER, limpar_nome_escola_simples, limpar_nomes_escolas
+
+
+def limpar_nome_escola_antigo(nome):
+    """limpar_nome_escola_simples original (aplicada linha a linha), mantida como referência"""
+    if pd.isna(nome):
+        return nome
+
+    nome = str(nome).upper().strip()
+
+    # Remove códigos INEP em qualquer formato: (INEP: 123), (INEP 123), INEP: 123, INEP 123
+    nome = re.sub(r"\(?\bINEP:?\s*\d+\)?", "", nome).strip()
+
+    # Remover apenas se começar com a sigla E sobrar nome decente
+    nome_original = nome
+    for sigla in SIGLAS_PARA_REMOVER:
+        if nome.startswith(sigla):
+            nome_sem_sigla = nome[len(sigla):].strip()
+            if len(nome_sem_sigla) > 3:  # Só aceita se sobrar um nome
+                nome = nome_sem_sigla
+                break
+
+    # Se deu algo errado, volta pro original
+    if len(nome) < 3:
+        nome = nome_original
+
+    return nome
+
+VALORES = [
+    "EMEF PEIXE-BOI", "emef peixe-boi", "  E.M.E.F. JOSÉ DE ALENCAR  ", "ESCOLA MUNICIPAL MARIA",
+    "ESCOLA MUNICIPAL DE ENSINO FUNDAMENTAL E INFANTIL SÃO JOSÉ", "ESC EST DOM PEDRO II", "ESC MUN ABC",
+    "ESCOLA ABC (INEP: 12345678)", "INEP 123 ESCOLA X", "ESCOLA (INEP 99)", "EMEF", "EMEF ABC", "EMEF ABCD",
+    "ESCOLA ESC ABCD", "E F ", "E F AB", "E M E F I JOAQUIM", "CMEI", "C M E I ANA", "ESCOLA", "ESC",
+    "ABC", "AB", "", "   ", "ESCOLA 1", "escola estadual", "EMEIF RIO", "ESCOLA\tMUNICIPAL X", "ß ESCOLA",
+    12345, 3.5, None, np.nan,
+]
+
+def valores_aleatorios(quantidade, semente):
+    rng = random.Random(semente)
+    pedacos = SIGLAS_PARA_REMOVER + ["INEP: 12", "(INEP 3)", "ABC", "JOSÉ", "A", " ", "escola ", "1", "-"]
+    return ["".join(rng.choice(pedacos) for _ in range(rng.randint(0, 4))) for _ in range(quantidade)]
+
+@pytest.mark.parametrize('valores', [VALORES, valores_aleatorios(3000, 0), valores_aleatorios(3000, 1)])
+def test_igual_a_funcao_por_linha(valores):
+    nomes = pd.Series(valores, dtype=object, name='NOME ESCOLA')
+    obtido = limpar_nomes_escolas(nomes)
+    for referencia in (limpar_nome_escola_antigo, limpar_nome_escola_simples):
+        esperado = nomes.apply(referencia)
+        assert obtido.isna().tolist() == esperado.isna().tolist()
+        assert obtido[obtido.notna()].tolist() == esperado[esperado.notna()].tolist()
+    assert obtido.index.equals(nomes.index)
+    assert obtido.name == 'NOME ESCOLA'
+
+def test_nomes_repetidos_e_indice_preservado():
+    nomes = pd.Series(["EMEF A B C", "ESCOLA X Y", "EMEF A B C", None, "ESCOLA X Y"] * 3,
+                      index=range(100, 115), dtype=object)
+    assert limpar_nomes_escolas(nomes).equals(nomes.apply(limpar_nome_escola_antigo))
+
+def test_coluna_vazia():
+    nomes = pd.Series([], dtype=object)
+    assert limpar_nomes_escolas(nomes).empty
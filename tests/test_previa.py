@@ -0,0 +1,37 @@
+import io
+
+import pandas as pd
+import pytest
+from PIL import Image
+from pypdf import PdfReader
+
+import criacao_nao_adaptadas
+import previa
+from renderizacao import LAYOUT_PADRAO
+
+
+def logo_jpeg():
+    saida = io.BytesIO()
+    Image.new('RGB', (400, 120), (30, 200, 30)).save(saida, 'JPEG')
+    return io.BytesIO(saida.getvalue())
+
+def tabela_escolas(quantidade):
+    return pd.DataFrame({
+        'NOME ESCOLA': [f"ESCOLA {i}" for i in range(quantidade)],
+        'ANO ESCOLAR': ['5º ANO'] * quantidade,
+        'TOTAL': [40] * quantidade,
+    })
+
+def test_previa_em_pdf_sem_pymupdf(monkeypatch):
+    monkeypatch.setattr(previa, 'PYMUPDF_DISPONIVEL', False)
+    tabela = tabela_escolas(LAYOUT_PADRAO.etiquetas_por_pagina)
+    pdf, png = previa.gerar_previa(criacao_nao_adaptadas.gerar_etiquetas, tabela, logo_jpeg(), "C", "E",
+                                   capacidade_envelope=30)
+    assert png is None
+    # Só a primeira página, mesmo com as escolas divididas em envelopes
+    assert len(PdfReader(io.BytesIO(pdf)).pages) == 1
+
+@pytest.mark.skipif(not previa.PYMUPDF_DISPONIVEL, reason="pymupdf não instalado")
+def test_previa_em_png_com_pymupdf():
+    pdf, png = previa.gerar_previa(criacao_nao_adaptadas.gerar_etiquetas, tabela_escolas(3), logo_jpeg(), "C", "E")
+    assert png.startswith(b'\x89PNG')
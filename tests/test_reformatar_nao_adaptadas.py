@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from planilhas_sinteticas import planilha_nao_adaptadas
+from processamento import (
+    colunas_categoricas,
+    detectar_colunas_nao_adaptadas,
+    limpar_nomes_escolas,
+    normalizar_anos_escolares,
+    processar_nao_adaptadas,
+    reformatar_nao_adaptadas,
+)
+
+
+def reformatar_melt_antigo(df, mapeamento):
+    """reformatar_nao_adaptadas original (melt de todas as células), mantida como referência"""
+    df_mapeado = df.rename(columns=mapeamento)
+    colunas_finais = list(mapeamento.values())
+    df_final = df_mapeado[colunas_finais].copy()
+
+    colunas_anos = [col for col in colunas_finais if col != 'NOME ESCOLA']
+    if not colunas_anos:
+        return None, "Nenhuma coluna de alunos foi detectada!"
+
+    df_transformado = df_final.melt(
+        id_vars=['NOME ESCOLA'],
+        value_vars=colunas_anos,
+        var_name='ANO ESCOLAR',
+        value_name='TOTAL'
+    )
+
+    df_transformado = df_transformado.dropna(subset=['NOME ESCOLA'])
+    df_transformado['TOTAL'] = pd.to_numeric(df_transformado['TOTAL'], errors='coerce').fillna(0).astype(int)
+
+    linhas_com_alunos = df_transformado[df_transformado['TOTAL'] > 0].copy()
+
+    escolas_com_alunos = linhas_com_alunos['NOME ESCOLA'].unique()
+    escolas_sem_alunos = df_transformado[~df_transformado['NOME ESCOLA'].isin(escolas_com_alunos)]
+
+    if not escolas_sem_alunos.empty:
+        linhas_sem_alunos = escolas_sem_alunos.groupby('NOME ESCOLA').first().reset_index()
+        return pd.concat([linhas_com_alunos, linhas_sem_alunos], ignore_index=True), None
+    return linhas_com_alunos.copy(), None
+
+MAPEAMENTO = {
+    "Qual é o nome da sua escola?": 'NOME ESCOLA',
+    "Total de alunos do 1º ano da MANHÃ": '1º ANO MANHÃ',
+    "Total de alunos do 1º ano da TARDE": '1º ANO TARDE',
+    "Total de alunos do 2º ano da MANHÃ": '2º ANO MANHÃ',
+}
+
+def planilha(linhas, index=None):
+    return pd.DataFrame(linhas, columns=list(MAPEAMENTO) + ["Observações"], index=index)
+
+PLANILHAS = {
+    'celulas_vazias': planilha([
+        ["ESCOLA A", 10, np.nan, None, "x"],
+        ["ESCOLA B", "", "5", np.nan, ""],
+        ["ESCOLA C", "abc", 3.0, 7, None],
+    ]),
+    'so_zeros': planilha([
+        ["ESCOLA A", 0, 0, 0, ""],
+        ["ESCOLA B", 0, np.nan, "", ""],
+        ["ESCOLA C", 4, 0, 0, ""],
+    ]),
+    'todas_sem_alunos': planilha([
+        ["ESCOLA Z", 0, 0, 0, ""],
+        ["ESCOLA A", np.nan, np.nan, np.nan, ""],
+    ]),
+    'escola_repetida_e_sem_nome': planilha([
+        ["ESCOLA A", 0, 0, 0, ""],
+        [None, 9, 9, 9, ""],
+        ["ESCOLA A", 0, 2, 0, ""],
+        ["ESCOLA B", 0, 0, 0, ""],
+        ["ESCOLA B", np.nan, 0, 0, ""],
+        [np.nan, 1, 0, 0, ""],
+    ]),
+    'indice_qualquer': planilha([
+        ["ESCOLA B", 1, 0, 2, ""],
+        ["ESCOLA A", 0, 0, 0, ""],
+        ["ESCOLA C", 0, 3, 0, ""],
+    ], index=[30, 10, 20]),
+    'vazia': planilha([]),
+}
+
+@pytest.mark.parametrize('nome', sorted(PLANILHAS))
+def test_igual_ao_melt(nome):
+    df = PLANILHAS[nome]
+    esperado, erro_esperado = reformatar_melt_antigo(df, MAPEAMENTO)
+    obtido, erro = reformatar_nao_adaptadas(df, MAPEAMENTO)
+    assert erro == erro_esperado
+    # Mesmas linhas, na mesma ordem e com o mesmo índice
+    pd.testing.assert_frame_equal(obtido, esperado)
+
+@pytest.mark.parametrize('escolas, semente', [(50, 0), (2000, 1)])
+def test_igual_ao_melt_planilha_sintetica(escolas, semente):
+    df = planilha_nao_adaptadas(escolas, colunas_extras=2, semente=semente)
+    # Nomes repetidos, como quando a mesma escola responde o formulário duas vezes
+    df.loc[df.index[::17], "Qual é o nome da sua escola?"] = "ESCOLA REPETIDA"
+    mapeamento, erro = detectar_colunas_nao_adaptadas(df)
+    assert not erro
+    esperado, _ = reformatar_melt_antigo(df, mapeamento)
+    obtido, _ = reformatar_nao_adaptadas(df, mapeamento)
+    pd.testing.assert_frame_equal(obtido, esperado)
+
+def test_sem_colunas_de_alunos():
+    df = planilha([["ESCOLA A", 1, 2, 3, ""]])
+    assert reformatar_nao_adaptadas(df, {"Qual é o nome da sua escola?": 'NOME ESCOLA'}) == (
+        None, "Nenhuma coluna de alunos foi detectada!"
+    )
+
+def test_processar_ordena_pelos_codigos_sem_trocar_os_anos():
+    df = planilha_nao_adaptadas(500, semente=2)
+    mapeamento, _ = detectar_colunas_nao_adaptadas(df)
+    # Referência: ordenação pelo texto, com as colunas convertidas para category só no final
+    esperado, _ = reformatar_nao_adaptadas(df.copy(), mapeamento)
+    esperado['NOME ESCOLA'] = limpar_nomes_escolas(esperado['NOME ESCOLA'])
+    esperado['ANO ESCOLAR'] = normalizar_anos_escolares(esperado['ANO ESCOLAR'])
+    esperado = colunas_categoricas(esperado.sort_values(by='NOME ESCOLA').reset_index(drop=True))
+
+    obtido, erro = processar_nao_adaptadas(df.copy())
+    assert erro is None
+    assert isinstance(obtido['NOME ESCOLA'].dtype, pd.CategoricalDtype)
+    pd.testing.assert_frame_equal(obtido, esperado)
@@ -0,0 +1,100 @@
+import io
+
+import pandas as pd
+from PIL import Image
+from pypdf import PdfReader
+
+import criacao_nao_adaptadas
+from renderizacao import LAYOUT_PADRAO
+from renderizacao_incremental import CachePaginas, escolas_alteradas, montar_pdf
+
+POR_PAGINA = LAYOUT_PADRAO.etiquetas_por_pagina
+
+
+def logo_jpeg():
+    saida = io.BytesIO()
+    Image.new('RGB', (400, 120), (30, 30, 200)).save(saida, 'JPEG')
+    return io.BytesIO(saida.getvalue())
+
+def tabela_paginas(paginas):
+    etiquetas = paginas * POR_PAGINA - 2  # última página incompleta
+    return pd.DataFrame({
+        'NOME ESCOLA': [f"ESCOLA {i // 4:03d}" for i in range(etiquetas)],
+        'ANO ESCOLAR': [f"{i % 4 + 1}º ANO" for i in range(etiquetas)],
+        'TOTAL': [i % 30 + 1 for i in range(etiquetas)],
+    })
+
+def gerar(tabela, cache):
+    return criacao_nao_adaptadas.gerar_etiquetas_incremental(tabela, logo_jpeg(), "CAMPEONATO", "ETAPA", cache)
+
+def textos_paginas(pdf):
+    return [pagina.extract_text() for pagina in PdfReader(io.BytesIO(pdf)).pages]
+
+
+def test_so_a_pagina_alterada_e_renderizada_de_novo():
+    cache = CachePaginas()
+    tabela = tabela_paginas(4)
+    _, relatorio = gerar(tabela, cache)
+    assert relatorio['total_paginas'] == 4
+    assert relatorio['paginas_renderizadas'] == [0, 1, 2, 3]
+
+    # Mesma planilha: nada é renderizado de novo
+    _, relatorio = gerar(tabela, cache)
+    assert relatorio['paginas_renderizadas'] == []
+
+    alterada = tabela.copy()
+    alterada.loc[POR_PAGINA + 3, 'TOTAL'] = 99  # uma etiqueta da segunda página
+    _, relatorio_alterada = gerar(alterada, cache)
+    assert relatorio_alterada['paginas_renderizadas'] == [1]
+    assert escolas_alteradas(relatorio['assinaturas'], relatorio_alterada['assinaturas']) == [
+        alterada.loc[POR_PAGINA + 3, 'NOME ESCOLA']
+    ]
+
+def test_pdf_montado_igual_a_renderizacao_completa():
+    cache = CachePaginas()
+    tabela = tabela_paginas(5)
+    gerar(tabela, cache)
+    alterada = tabela.copy()
+    alterada.loc[[3, 3 * POR_PAGINA + 1], 'TOTAL'] = 77  # primeira e quarta páginas
+
+    pdf, relatorio = gerar(alterada, cache)
+    assert relatorio['paginas_renderizadas'] == [0, 3]
+    completo = criacao_nao_adaptadas.gerar_etiquetas(alterada, logo_jpeg(), "CAMPEONATO", "ETAPA")
+    assert textos_paginas(pdf) == textos_paginas(completo)
+    assert "PROVAS: 77" in textos_paginas(pdf)[3]
+
+def test_montar_pdf_de_um_trecho_completo_copia_os_bytes():
+    pdf = criacao_nao_adaptadas.gerar_etiquetas(tabela_paginas(2), logo_jpeg(), "C", "E")
+    destino = io.BytesIO()
+    montar_pdf([(pdf, 0), (pdf, 1)], destino)
+    assert destino.getvalue() == pdf
+
+    # Páginas fora de ordem passam pelo PdfWriter
+    destino = io.BytesIO()
+    montar_pdf([(pdf, 1), (pdf, 0)], destino)
+    assert textos_paginas(destino.getvalue()) == textos_paginas(pdf)[::-1]
+
+def test_cache_descarta_as_paginas_usadas_ha_mais_tempo():
+    cache = CachePaginas(limite_bytes=100)
+    cache.guardar('a', b'pdf a', 0, 40)
+    cache.guardar('b', b'pdf b', 0, 40)
+    assert cache.obter('a') == (b'pdf a', 0)  # "a" passa a ser a mais recente
+
+    cache.guardar('c', b'pdf c', 0, 40)
+    assert cache.obter('b') is None
+    assert len(cache) == 2 and cache.tamanho == 80
+
+    # Guardar de novo a mesma chave troca o tamanho em vez de somar
+    cache.guardar('c', b'pdf c', 1, 50)
+    assert cache.tamanho == 90 and cache.obter('c') == (b'pdf c', 1)
+
+    # Uma página maior que o limite fica sozinha no cache
+    cache.guardar('d', b'pdf d', 0, 150)
+    assert len(cache) == 1 and cache.tamanho == 150
+    assert cache.obter('d') == (b'pdf d', 0)
+
+def test_escolas_alteradas():
+    anteriores = {'A': '1', 'B': '2', 'C': '3'}
+    atuais = {'A': '1', 'B': 'x', 'D': '4'}
+    assert escolas_alteradas(anteriores, atuais) == ['B', 'C', 'D']
+    assert escolas_alteradas(atuais, atuais) == []
@@ -0,0 +1,91 @@
+import io
+import math
+import re
+
+import pandas as pd
+import pytest
+from PIL import Image
+
+import criacao_adaptadas
+import criacao_nao_adaptadas
+import renderizacao_zpl
+from renderizacao import LAYOUT_PADRAO
+from renderizacao_zpl import campo_texto, grafico_logo, texto_zpl
+
+PADRAO_GRAFICO = re.compile(r'~DG([^,]+),(\d+),(\d+),([0-9A-F]*)\n')
+
+
+def logo_jpeg():
+    saida = io.BytesIO()
+    Image.new('RGB', (400, 120), (200, 30, 30)).save(saida, 'JPEG')
+    return io.BytesIO(saida.getvalue())
+
+def tabela_escolas(quantidade, nome="ESCOLA {}"):
+    return pd.DataFrame({
+        'NOME ESCOLA': [nome.format(i % 7) for i in range(quantidade)],
+        'ANO ESCOLAR': ['5º ANO'] * quantidade,
+        'TOTAL': list(range(1, quantidade + 1)),
+    })
+
+def campos(zpl):
+    return re.findall(r'\^FD(.*?)\^FS', zpl)
+
+@pytest.mark.parametrize('largura_px, altura_px', [(100, 30), (96, 30), (203, 61)])
+def test_grafico_logo_bytes_por_linha(largura_px, altura_px):
+    grafico = grafico_logo(logo_jpeg().getvalue(), largura_px, altura_px)
+    nome, total, por_linha, dados = PADRAO_GRAFICO.fullmatch(grafico).groups()
+    assert nome == renderizacao_zpl.NOME_GRAFICO_LOGO
+    assert int(por_linha) == math.ceil(largura_px / 8)
+    assert int(total) == int(por_linha) * altura_px
+    assert len(dados) == 2 * int(total)
+
+@pytest.mark.parametrize('texto, esperado', [
+    ("ESCOLA A^B", "ESCOLA A\\5EB"),
+    ("ESCOLA ~C", "ESCOLA \\7EC"),
+    ("ESCOLA C:\\D", "ESCOLA C:\\5CD"),
+    ("ESCOLA SEM COMANDOS", "ESCOLA SEM COMANDOS"),
+])
+def test_caracteres_de_comando_em_hexadecimal(texto, esperado):
+    assert texto_zpl(texto) == esperado
+    campo = campo_texto(texto, 0, LAYOUT_PADRAO.largura_etiqueta, 203)
+    assert ("^FH\\" in campo) == (texto != esperado)
+    assert campo.endswith(f"^FD{esperado}^FS")
+
+def test_texto_longo_cortado_em_uma_linha():
+    largura = LAYOUT_PADRAO.largura_etiqueta
+    campo = campo_texto("ESCOLA " + "MUITO " * 40 + "LONGA", 0, largura, 203)
+    # Uma linha só no bloco de texto: o campo não invade a faixa da linha seguinte
+    assert f"^FB{renderizacao_zpl.pontos(largura, 203)},1,0,C" in campo
+    assert campos(campo)[0].endswith("...")
+
+def test_valores_da_tabela_sem_alteracao():
+    nome = "ESCOLA <b>Y</b> & CIA &amp; ^1"
+    tabela = tabela_escolas(2, nome)
+    zpl = criacao_nao_adaptadas.gerar_etiquetas_zpl(tabela, logo_jpeg(), "CAMPEONATO <I>", "ETAPA").decode('utf-8')
+    assert "ESCOLA: ESCOLA <b>Y</b> & CIA &amp; \\5E1" in campos(zpl)
+    assert "CAMPEONATO <I>" in campos(zpl)
+
+def test_gravacao_em_blocos(monkeypatch):
+    monkeypatch.setattr(renderizacao_zpl, 'ETIQUETAS_POR_BLOCO', 4)
+    tabela = tabela_escolas(10)
+    inteiro = criacao_adaptadas.gerar_etiquetas_zpl(tabela.assign(CATEGORIA='TEA'), logo_jpeg(), "C", "E")
+
+    class Destino(io.BytesIO):
+        def __init__(self):
+            super().__init__()
+            self.gravacoes = []
+
+        def write(self, dados):
+            self.gravacoes.append(len(dados))
+            return super().write(dados)
+
+    destino = Destino()
+    avisos = []
+    resultado = criacao_adaptadas.gerar_etiquetas_zpl(tabela.assign(CATEGORIA='TEA'), logo_jpeg(), "C", "E",
+                                                      destino=destino, progresso=lambda *a: avisos.append(a))
+    assert resultado is destino
+    assert destino.getvalue() == inteiro
+    # Cabeçalho + blocos de 4, 4 e 2 etiquetas
+    assert len(destino.gravacoes) == 4
+    assert avisos == [(4, 10), (8, 10), (10, 10)]
+    assert inteiro.decode('utf-8').count("^XF") == 10
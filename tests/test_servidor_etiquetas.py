@@ -0,0 +1,174 @@
+import http.client
+import io
+import json
+import threading
+from urllib.parse import urlencode
+
+import pytest
+from PIL import Image
+
+import servidor_etiquetas
+from arquivos_pdf import PDFTemporario
+from servidor_etiquetas import criar_servidor
+
+CSV = (
+    "Qual é o nome da sua escola?,Total de alunos do 1º ano da MANHÃ,Total de alunos do 2º ano da TARDE\n"
+    "EMEF PEIXE-BOI,25,30\n"
+    "ESCOLA MUNICIPAL JOSÉ,0,12\n"
+    "ESCOLA SÓ ZEROS,0,0\n"
+).encode('utf-8')
+
+
+def logo_jpeg(largura=1600, altura=500):
+    saida = io.BytesIO()
+    Image.new('RGB', (largura, altura), (200, 30, 30)).save(saida, 'JPEG')
+    return saida.getvalue()
+
+@pytest.fixture
+def servidor():
+    servidor = criar_servidor(porta=0, workers=1, max_fila=0)
+    thread = threading.Thread(target=servidor.serve_forever, daemon=True)
+    thread.start()
+    yield servidor
+    servidor.shutdown()
+    servidor.server_close()
+    servidor.RequestHandlerClass.servico.executor.shutdown(cancel_futures=True)
+
+def pedir(servidor, metodo, caminho, corpo=None, cabecalhos=None, **consulta):
+    conexao = http.client.HTTPConnection(*servidor.server_address, timeout=30)
+    if consulta:
+        caminho += '?' + urlencode(consulta)
+    conexao.request(metodo, caminho, body=corpo, headers=cabecalhos or {})
+    resposta = conexao.getresponse()
+    conteudo = resposta.read()
+    conexao.close()
+    return resposta, conteudo
+
+def enviar_logo(servidor, conteudo=None):
+    resposta, conteudo = pedir(servidor, 'POST', '/logos', conteudo or logo_jpeg())
+    assert resposta.status == 200
+    return json.loads(conteudo)['logo']
+
+def pedir_etiquetas(servidor, logo, **consulta):
+    parametros = dict(tipo='nao-adaptadas', arquivo='escolas.csv', logo=logo, campeonato='obm', etapa='1ª fase')
+    return pedir(servidor, 'POST', '/etiquetas', CSV, **{**parametros, **consulta})
+
+
+def test_saude_e_rota_desconhecida(servidor):
+    resposta, conteudo = pedir(servidor, 'GET', '/saude')
+    assert resposta.status == 200
+    situacao = json.loads(conteudo)
+    assert situacao['status'] == 'ok'
+    assert (situacao['workers'], situacao['max_fila']) == (1, 0)
+
+    resposta, _ = pedir(servidor, 'GET', '/nada')
+    assert resposta.status == 404
+    resposta, _ = pedir(servidor, 'POST', '/nada', b'x')
+    assert resposta.status == 404
+
+def test_logo_precisa_ser_jpeg(servidor):
+    resposta, conteudo = pedir(servidor, 'POST', '/logos', b'nao e imagem')
+    assert resposta.status == 400
+    assert 'JPEG' in json.loads(conteudo)['erro']
+
+def test_detectar_e_processar(servidor):
+    resposta, conteudo = pedir(servidor, 'POST', '/detectar', CSV, tipo='nao-adaptadas', arquivo='escolas.csv')
+    assert resposta.status == 200
+    assert json.loads(conteudo)['mapeamento']["Qual é o nome da sua escola?"] == 'NOME ESCOLA'
+
+    resposta, conteudo = pedir(servidor, 'POST', '/processar', CSV, tipo='nao-adaptadas', arquivo='escolas.csv')
+    assert resposta.status == 200
+    assert resposta.getheader('Content-Type').startswith('text/csv')
+    assert 'Server-Timing' in resposta.headers
+    linhas = conteudo.decode('utf-8').splitlines()
+    assert linhas[0] == 'NOME ESCOLA,ANO ESCOLAR,TOTAL'
+    assert len(linhas) == 1 + 4  # três turmas com alunos e a escola só com zeros
+
+    resposta, _ = pedir(servidor, 'POST', '/processar', CSV, tipo='outro', arquivo='escolas.csv')
+    assert resposta.status == 400
+    resposta, _ = pedir(servidor, 'POST', '/processar', CSV, tipo='nao-adaptadas', arquivo='escolas.txt')
+    assert resposta.status == 400
+
+def test_etiquetas_pdf_e_zpl(servidor):
+    logo = enviar_logo(servidor)
+    resposta, pdf = pedir_etiquetas(servidor, logo)
+    assert resposta.status == 200
+    assert resposta.getheader('Content-Type') == 'application/pdf'
+    assert pdf.startswith(b'%PDF')
+    assert int(resposta.getheader('Content-Length')) == len(pdf)
+    assert resposta.getheader('X-Escolas') == '3'
+    assert resposta.getheader('X-Paginas-Renderizadas') == '1'
+
+    # Mesmo pedido: páginas e logo reduzida reaproveitadas
+    resposta, _ = pedir_etiquetas(servidor, logo)
+    assert resposta.getheader('X-Paginas-Renderizadas') == '0'
+    assert len(servidor.RequestHandlerClass.servico.logos_reduzidas) == 1
+
+    resposta, zpl = pedir_etiquetas(servidor, logo, formato='zpl', dpi=300)
+    assert resposta.status == 200
+    assert zpl.startswith(b'~DG')
+    assert zpl.count(b'^XF') == 4
+
+def test_parametros_invalidos(servidor):
+    logo = enviar_logo(servidor)
+    for consulta in ({'envelope': -1}, {'envelope': 'x'}, {'layout': 'nao-existe'}, {'dpi': 150},
+                     {'qualidade_logo': 0}, {'campeonato': ''}):
+        resposta, conteudo = pedir_etiquetas(servidor, logo, **consulta)
+        assert resposta.status == 400, consulta
+        assert 'erro' in json.loads(conteudo)
+
+    resposta, _ = pedir_etiquetas(servidor, logo, envelope=0)
+    assert resposta.status == 200
+    resposta, _ = pedir_etiquetas(servidor, 'nao-existe')
+    assert resposta.status == 404
+
+def test_corpo_grande_demais(servidor, monkeypatch):
+    monkeypatch.setattr(servidor_etiquetas, 'MAX_TAMANHO_CORPO', 1024)
+    resposta, conteudo = pedir(servidor, 'POST', '/logos', b'x' * 2048)
+    assert resposta.status == 413
+    assert resposta.getheader('Connection') == 'close'
+
+    resposta, _ = pedir(servidor, 'POST', '/logos', b'')
+    assert resposta.status == 400
+
+def test_fila_cheia(servidor):
+    servico = servidor.RequestHandlerClass.servico
+    ocupado = threading.Event()
+    liberar = threading.Event()
+
+    def bloquear():
+        ocupado.set()
+        liberar.wait(30)
+
+    # O único worker fica ocupado e a fila não tem vagas
+    pedido = threading.Thread(target=servico.executar, args=(bloquear,))
+    pedido.start()
+    try:
+        assert ocupado.wait(30)
+        resposta, conteudo = pedir(servidor, 'POST', '/logos', logo_jpeg())
+        assert resposta.status == 503
+        assert resposta.getheader('Retry-After') == '5'
+        assert 'ocupado' in json.loads(conteudo)['erro']
+        _, conteudo = pedir(servidor, 'GET', '/saude')
+        assert json.loads(conteudo)['executando'] == 1
+    finally:
+        liberar.set()
+        pedido.join()
+    enviar_logo(servidor)
+
+def test_resposta_enviada_em_blocos(servidor, monkeypatch):
+    blocos = []
+    original = PDFTemporario.blocos
+
+    def blocos_pequenos(self, tamanho_bloco=None):
+        for bloco in original(self, 1024):
+            blocos.append(len(bloco))
+            yield bloco
+
+    monkeypatch.setattr(PDFTemporario, 'blocos', blocos_pequenos)
+    logo = enviar_logo(servidor)
+    resposta, pdf = pedir_etiquetas(servidor, logo)
+    assert resposta.status == 200
+    assert len(blocos) > 1
+    assert sum(blocos) == len(pdf) == int(resposta.getheader('Content-Length'))
+    assert pdf.startswith(b'%PDF') and pdf.rstrip().endswith(b'%%EOF')
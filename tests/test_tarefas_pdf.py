@@ -0,0 +1,136 @@
+import threading
+import time
+
+import pytest
+
+from tarefas_pdf import CANCELADA, CONCLUIDA, ERRO, FilaTarefas
+
+ESPERA_MAXIMA = 5
+
+
+def esperar(condicao):
+    limite = time.monotonic() + ESPERA_MAXIMA
+    while not condicao():
+        assert time.monotonic() < limite, "tempo esgotado"
+        time.sleep(0.01)
+
+class Renderizacao:
+    """Função de geração controlada pelo teste: avança uma "página" a cada liberar()"""
+
+    def __init__(self, paginas=3):
+        self.paginas = paginas
+        self.chamadas = 0
+        self.iniciada = threading.Event()
+        self._passo = threading.Semaphore(0)
+
+    def liberar(self, paginas=1):
+        for _ in range(paginas):
+            self._passo.release()
+
+    def __call__(self, valor, progresso):
+        self.chamadas += 1
+        self.iniciada.set()
+        for pagina in range(self.paginas):
+            progresso(pagina, self.paginas)
+            assert self._passo.acquire(timeout=ESPERA_MAXIMA)
+        progresso(self.paginas, self.paginas)
+        return valor * 2
+
+@pytest.fixture
+def fila():
+    fila = FilaTarefas()
+    yield fila
+    fila.executor.shutdown(wait=True, cancel_futures=True)
+
+
+def test_progresso_e_resultado(fila):
+    funcao = Renderizacao(paginas=3)
+    tarefa = fila.enviar('sessao-1', 'chave', funcao, 21)
+    funcao.liberar()
+    esperar(lambda: tarefa.feitas == 1)
+    assert (tarefa.feitas, tarefa.total) == (1, 3)
+    assert tarefa.fracao == pytest.approx(1 / 3)
+
+    funcao.liberar(2)
+    esperar(lambda: tarefa.terminada)
+    assert tarefa.status == CONCLUIDA
+    assert tarefa.resultado == 42
+    assert tarefa.fracao == 1.0
+
+def test_mesma_chave_reaproveita_a_tarefa(fila):
+    funcao = Renderizacao(paginas=1)
+    tarefa = fila.enviar('sessao-1', 'chave', funcao, 1)
+    assert fila.enviar('sessao-2', 'chave', funcao, 1) is tarefa
+    funcao.liberar()
+    esperar(lambda: tarefa.terminada)
+
+    # Resultado pronto também é reaproveitado por uma sessão que chega depois
+    assert fila.enviar('sessao-3', 'chave', funcao, 1) is tarefa
+    assert funcao.chamadas == 1
+    assert tarefa.sessoes == {'sessao-1', 'sessao-2', 'sessao-3'}
+
+def test_sessao_que_sai_nao_interrompe_as_outras(fila):
+    funcao = Renderizacao(paginas=2)
+    tarefa = fila.enviar('sessao-1', 'chave', funcao, 5)
+    fila.enviar('sessao-2', 'chave', funcao, 5)
+    funcao.iniciada.wait(ESPERA_MAXIMA)
+
+    assert not fila.sair('chave', 'sessao-1')
+    assert fila.obter('chave') is tarefa
+    funcao.liberar(2)
+    esperar(lambda: tarefa.terminada)
+    assert tarefa.status == CONCLUIDA
+    assert tarefa.resultado == 10
+
+def test_ultima_sessao_que_sai_cancela(fila):
+    funcao = Renderizacao(paginas=3)
+    tarefa = fila.enviar('sessao-1', 'chave', funcao, 1)
+    fila.enviar('sessao-2', 'chave', funcao, 1)
+    funcao.iniciada.wait(ESPERA_MAXIMA)
+
+    assert not fila.sair('chave', 'sessao-2')
+    assert fila.sair('chave', 'sessao-1')
+    assert fila.obter('chave') is None
+    funcao.liberar()
+    esperar(lambda: tarefa.terminada)
+    assert tarefa.status == CANCELADA
+    assert tarefa.resultado is None
+
+    # Um novo pedido com a mesma chave recomeça do zero
+    nova = fila.enviar('sessao-1', 'chave', funcao, 1)
+    assert nova is not tarefa
+    funcao.liberar(3)
+    esperar(lambda: nova.terminada)
+    assert nova.status == CONCLUIDA
+
+def test_cancelada_antes_de_comecar(fila):
+    ocupada = Renderizacao(paginas=1)
+    fila.enviar('sessao-1', 'ocupada', ocupada, 1)
+    ocupada.iniciada.wait(ESPERA_MAXIMA)
+
+    # Com a única thread ocupada, a segunda tarefa fica na fila e nem chega a rodar
+    funcao = Renderizacao(paginas=1)
+    tarefa = fila.enviar('sessao-2', 'chave', funcao, 1)
+    assert fila.sair('chave', 'sessao-2')
+    ocupada.liberar()
+    esperar(lambda: tarefa.terminada)
+    assert tarefa.status == CANCELADA
+    assert funcao.chamadas == 0
+
+def test_sair_de_tarefa_terminada_mantem_o_resultado(fila):
+    funcao = Renderizacao(paginas=1)
+    tarefa = fila.enviar('sessao-1', 'chave', funcao, 3)
+    funcao.liberar()
+    esperar(lambda: tarefa.terminada)
+    assert not fila.sair('chave', 'sessao-1')
+    assert fila.obter('chave') is tarefa
+    assert tarefa.resultado == 6
+
+def test_erro(fila):
+    def falha(progresso):
+        raise ValueError("logo inválida")
+
+    tarefa = fila.enviar('sessao-1', 'chave', falha)
+    esperar(lambda: tarefa.terminada)
+    assert tarefa.status == ERRO
+    assert tarefa.erro == "logo inválida"